@@ -0,0 +1,415 @@
+"""
+Server lokal pengganti SSH bastion dan MySQL untuk benchmark
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+FakeSSHServer adalah server paramiko yang hanya menerima autentikasi
+password dan channel direct-tcpip (yang dipakai sshtunnel), lalu meneruskan
+byte ke tujuan. FakeMySQLServer berbicara protokol MySQL secukupnya
+(handshake mysql_native_password, COM_QUERY dengan result set teks, OK,
+COM_PING, COM_QUIT) sehingga pymysql asli bisa dipakai tanpa server MySQL.
+Isi result set dibangkitkan dari klausa LIMIT sehingga hasil benchmark
+bisa diulang di mesin mana pun. FakeSSHServer menerima kompresi zlib jika
+client memintanya dan bisa membatasi bandwidth ke client untuk meniru link
+WAN yang sempit.
+"""
+
+import re
+import select
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import paramiko
+
+# Capability yang diiklankan fake server (tanpa SSL, CONNECT_ATTRS, DEPRECATE_EOF)
+_CAPABILITIES = (
+    0x00000001    # CLIENT_LONG_PASSWORD
+    | 0x00000002  # CLIENT_FOUND_ROWS
+    | 0x00000004  # CLIENT_LONG_FLAG
+    | 0x00000008  # CLIENT_CONNECT_WITH_DB
+    | 0x00000200  # CLIENT_PROTOCOL_41
+    | 0x00002000  # CLIENT_TRANSACTIONS
+    | 0x00008000  # CLIENT_SECURE_CONNECTION
+    | 0x00010000  # CLIENT_MULTI_STATEMENTS
+    | 0x00020000  # CLIENT_MULTI_RESULTS
+    | 0x00080000  # CLIENT_PLUGIN_AUTH
+    | 0x00200000  # CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA
+)
+_STATUS_AUTOCOMMIT = 0x0002
+
+_COM_QUIT = 0x01
+_COM_INIT_DB = 0x02
+_COM_QUERY = 0x03
+_COM_PING = 0x0e
+
+_TYPE_NEWDECIMAL = 0xf6
+_TYPE_LONGLONG = 0x08
+_TYPE_DATETIME = 0x0c
+_TYPE_VAR_STRING = 0xfd
+
+_CHARSET_BINARY = 63
+_CHARSET_UTF8MB4 = 45
+
+# Kolom tabel sintetis 'bench' (nama, tipe, charset, panjang)
+BENCH_COLUMNS = (
+    ('id', _TYPE_LONGLONG, _CHARSET_BINARY, 20),
+    ('name', _TYPE_VAR_STRING, _CHARSET_UTF8MB4, 255),
+    ('amount', _TYPE_NEWDECIMAL, _CHARSET_BINARY, 12),
+    ('created_at', _TYPE_DATETIME, _CHARSET_BINARY, 19),
+)
+
+_LIMIT_RE = re.compile(r'\blimit\s+(\d+)(?:\s*,\s*(\d+))?\s*$')
+
+def _lenenc_int(value):
+    if value < 251:
+        return bytes((value,))
+    if value < 1 << 16:
+        return b'\xfc' + struct.pack('<H', value)
+    if value < 1 << 24:
+        return b'\xfd' + struct.pack('<I', value)[:3]
+    return b'\xfe' + struct.pack('<Q', value)
+
+def _lenenc_str(value):
+    if isinstance(value, str):
+        value = value.encode('utf8')
+    return _lenenc_int(len(value)) + value
+
+def _packet(payload, seq):
+    return struct.pack('<I', len(payload))[:3] + bytes((seq & 0xff,)) + payload
+
+def _column_definition(name, column_type, charset, length):
+    return (
+        _lenenc_str('def') + _lenenc_str('bench') + _lenenc_str('bench') + _lenenc_str('bench')
+        + _lenenc_str(name) + _lenenc_str(name) + b'\x0c'
+        + struct.pack('<HIBHB', charset, length, column_type, 0, 0) + b'\x00\x00'
+    )
+
+def _bench_row(number):
+    """Satu baris tabel sintetis dalam text protocol"""
+    return (
+        _lenenc_str(str(number))
+        + _lenenc_str(f'user-{number:08d}@example.com')
+        + _lenenc_str(f'{number % 100000}.{number % 100:02d}')
+        + _lenenc_str(f'2025-01-{number % 28 + 1:02d} 12:{number % 60:02d}:00')
+    )
+
+class FakeMySQLServer:
+    def __init__(self, host='127.0.0.1', port=0, max_allowed_packet=4 * 1024 * 1024):
+        """
+        Inisialisasi server protokol MySQL palsu
+
+        Args:
+            host (str): Alamat bind
+            port (int): Port bind (0 = dipilih OS)
+            max_allowed_packet (int): Nilai yang dijawab untuk SELECT @@max_allowed_packet
+        """
+        self.max_allowed_packet = max_allowed_packet
+        self.queries = 0
+        self.inserted_rows = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._socket.listen(128)
+        self.address = self._socket.getsockname()
+        self._connection_ids = iter(range(1, 1 << 31))
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Mulai menerima koneksi di thread latar"""
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, name='fake-mysql', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Berhenti menerima koneksi baru"""
+        self._running = False
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        reader = client.makefile('rb')
+        state = {'status': _STATUS_AUTOCOMMIT}
+        try:
+            client.sendall(_packet(self._handshake(), 0))
+            if self._read_packet(reader) is None:
+                return
+            client.sendall(_packet(self._ok(state), 2))
+
+            while True:
+                payload = self._read_packet(reader)
+                if not payload or payload[0] == _COM_QUIT:
+                    return
+                command = payload[0]
+                if command == _COM_QUERY:
+                    client.sendall(self._query(payload[1:].decode('utf8', 'replace'), state))
+                elif command in (_COM_PING, _COM_INIT_DB):
+                    client.sendall(_packet(self._ok(state), 1))
+                else:
+                    client.sendall(_packet(self._error(1047, 'Unknown command'), 1))
+        except (OSError, ValueError):
+            pass
+        finally:
+            reader.close()
+            client.close()
+
+    @staticmethod
+    def _read_packet(reader):
+        header = reader.read(4)
+        if len(header) < 4:
+            return None
+        length = int.from_bytes(header[:3], 'little')
+        return reader.read(length)
+
+    def _handshake(self):
+        salt = b'abcdefghijklmnopqrst'
+        return (
+            b'\x0a' + b'8.0.36-bench\x00'
+            + struct.pack('<I', next(self._connection_ids))
+            + salt[:8] + b'\x00'
+            + struct.pack('<H', _CAPABILITIES & 0xffff)
+            + bytes((_CHARSET_UTF8MB4,))
+            + struct.pack('<H', _STATUS_AUTOCOMMIT)
+            + struct.pack('<H', _CAPABILITIES >> 16)
+            + bytes((len(salt) + 1,)) + b'\x00' * 10
+            + salt[8:] + b'\x00'
+            + b'mysql_native_password\x00'
+        )
+
+    @staticmethod
+    def _ok(state, affected_rows=0):
+        return b'\x00' + _lenenc_int(affected_rows) + b'\x00' + struct.pack('<HH', state['status'], 0)
+
+    @staticmethod
+    def _error(code, message):
+        return b'\xff' + struct.pack('<H', code) + b'#HY000' + message.encode('utf8')
+
+    @staticmethod
+    def _eof(state):
+        return b'\xfe' + struct.pack('<HH', 0, state['status'])
+
+    def _query(self, sql, state):
+        with self._lock:
+            self.queries += 1
+        text = sql.strip().rstrip(';').strip().lower()
+
+        if text.startswith('select @@max_allowed_packet'):
+            return self._result_set([('@@max_allowed_packet', _TYPE_LONGLONG, _CHARSET_BINARY, 21)],
+                                    [_lenenc_str(str(self.max_allowed_packet))], state)
+        if text.startswith(('select', 'with')):
+            match = _LIMIT_RE.search(text)
+            if match is None and ' from ' not in text:
+                return self._result_set([('1', _TYPE_LONGLONG, _CHARSET_BINARY, 1)], [_lenenc_str('1')], state)
+            count = int(match.group(2) or match.group(1)) if match else 1
+            return self._bench_result(count, state)
+        if text.startswith(('insert', 'replace')):
+            rows = text.count('),(') + 1 if ' values' in text else 1
+            with self._lock:
+                self.inserted_rows += rows
+            return _packet(self._ok(state, rows), 1)
+        if text.startswith('set autocommit'):
+            if text.endswith('0'):
+                state['status'] &= ~_STATUS_AUTOCOMMIT
+            else:
+                state['status'] |= _STATUS_AUTOCOMMIT
+        return _packet(self._ok(state), 1)
+
+    def _result_set(self, columns, rows, state):
+        parts = [_packet(_lenenc_int(len(columns)), 1)]
+        seq = 2
+        for column in columns:
+            parts.append(_packet(_column_definition(*column), seq))
+            seq += 1
+        parts.append(_packet(self._eof(state), seq))
+        seq += 1
+        for row in rows:
+            parts.append(_packet(row, seq))
+            seq += 1
+        parts.append(_packet(self._eof(state), seq))
+        return b''.join(parts)
+
+    def _bench_result(self, count, state):
+        """Result set tabel sintetis; beberapa ukuran terakhir di-cache agar server bukan bottleneck"""
+        key = (count, state['status'])
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return response
+        response = self._result_set(BENCH_COLUMNS, (_bench_row(number) for number in range(1, count + 1)), state)
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > 4:
+                self._responses.popitem(last=False)
+        return response
+
+class _SSHServerInterface(paramiko.ServerInterface):
+    """Autentikasi password dan channel direct-tcpip saja"""
+
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.destinations = {}
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        if username == self.username and password == self.password:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        self.destinations[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+class _ThrottledSocket:
+    """Socket yang membatasi laju kirim (byte terenkripsi/terkompresi) ke client"""
+
+    def __init__(self, sock, bandwidth):
+        self._sock = sock
+        self._bandwidth = bandwidth
+
+    def send(self, data):
+        sent = self._sock.send(data[:16384])
+        time.sleep(sent / self._bandwidth)
+        return sent
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+class FakeSSHServer:
+    def __init__(self, username='bench', password='bench', host='127.0.0.1', port=0, latency=0.0,
+                 bandwidth=None):
+        """
+        Inisialisasi SSH server pengganti bastion
+
+        Args:
+            username (str): Username yang diterima
+            password (str): Password yang diterima
+            host (str): Alamat bind
+            port (int): Port bind (0 = dipilih OS)
+            latency (float): Detik jeda tambahan sekali per pengiriman dari client
+                ke server (meniru RTT WAN; 0 = tanpa jeda)
+            bandwidth (float): Batas byte per detik dari server ke client, diukur
+                setelah kompresi SSH (None = tanpa batas)
+        """
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._socket.listen(32)
+        self.address = self._socket.getsockname()
+        self._transports = []
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        """Mulai menerima koneksi SSH di thread latar"""
+        self._running = True
+        threading.Thread(target=self._accept_loop, name='fake-ssh', daemon=True).start()
+        return self
+
+    def stop(self):
+        """Berhenti menerima koneksi dan tutup semua sesi SSH"""
+        self._running = False
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+        with self._lock:
+            transports, self._transports = self._transports, []
+        for transport in transports:
+            transport.close()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client):
+        if self.bandwidth:
+            client = _ThrottledSocket(client, self.bandwidth)
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        # Seperti sshd: zlib ditawarkan, dipakai hanya jika client memintanya
+        transport.use_compression(True)
+        interface = _SSHServerInterface(self.username, self.password)
+        with self._lock:
+            self._transports.append(transport)
+        try:
+            transport.start_server(server=interface)
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+        while transport.is_active():
+            channel = transport.accept(1.0)
+            if channel is None:
+                continue
+            destination = interface.destinations.pop(channel.get_id(), None)
+            if destination is None:
+                channel.close()
+                continue
+            threading.Thread(target=self._forward, args=(channel, destination), daemon=True).start()
+
+    def _forward(self, channel, destination):
+        """Teruskan byte dua arah antara channel SSH dan tujuan"""
+        try:
+            target = socket.create_connection(destination)
+        except OSError:
+            channel.close()
+            return
+        target.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                readable, _, _ = select.select([channel, target], [], [])
+                if channel in readable:
+                    data = channel.recv(65536)
+                    if not data:
+                        break
+                    if self.latency:
+                        time.sleep(self.latency)
+                    target.sendall(data)
+                if target in readable:
+                    data = target.recv(65536)
+                    if not data:
+                        break
+                    channel.sendall(data)
+        except (OSError, EOFError):
+            pass
+        finally:
+            target.close()
+            channel.close()
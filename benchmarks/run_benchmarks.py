@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Benchmark koneksi MySQL via SSH tunnel terhadap server lokal pengganti
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Mengukur setup SSH tunnel, handshake MySQL, round trip query kecil, fetch
+hasil besar (buffered dan streaming), bulk insert dan throughput connection
+pool, lalu menulis hasil sebagai JSON untuk dibandingkan antar commit:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+
+Benchmark *_compressed dan large_result_adaptive mengulang query yang sama
+dengan kompresi SSH menyala dan mode 'auto'; bandingkan dengan small_query
+dan large_result pada bandwidth terbatas:
+
+    python benchmarks/run_benchmarks.py --bandwidth-mbps 20 \
+        --only small_query,small_query_compressed,large_result,large_result_compressed,large_result_adaptive
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.mysql_ssh_connection import MySQLSSHConnection, _connect_mysql
+from database.connection_pool import MySQLSSHConnectionPool
+from database.tunnel_manager import acquire_tunnel, release_tunnel
+from fake_servers import FakeMySQLServer, FakeSSHServer
+
+# Ukuran beban: (default, --quick)
+SIZES = {
+    'tunnel_setup_iterations': (5, 2),
+    'mysql_connect_iterations': (20, 5),
+    'small_query_iterations': (500, 50),
+    'large_result_rows': (100000, 5000),
+    'bulk_insert_rows': (50000, 5000),
+    'pool_workers': (8, 4),
+    'pool_queries_per_worker': (200, 25),
+}
+
+BENCHMARKS = ('tunnel_setup', 'mysql_connect', 'small_query', 'large_result',
+              'large_result_stream', 'bulk_insert', 'pool_throughput',
+              'small_query_compressed', 'large_result_compressed', 'large_result_adaptive')
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(samples):
+    """Statistik latensi (detik) dari daftar sampel"""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min': ordered[0],
+        'mean': statistics.fmean(ordered),
+        'p50': _percentile(ordered, 0.50),
+        'p95': _percentile(ordered, 0.95),
+        'p99': _percentile(ordered, 0.99),
+        'max': ordered[-1],
+    }
+
+def _result(value, unit, higher_is_better, **details):
+    """Satu hasil benchmark: metrik utama untuk perbandingan plus detail"""
+    return dict({'value': value, 'unit': unit, 'higher_is_better': higher_is_better}, **details)
+
+class BenchmarkEnvironment:
+    def __init__(self, latency=0.0, bandwidth=None):
+        """Jalankan fake MySQL dan fake SSH server lalu siapkan konfigurasi koneksi"""
+        self.mysql_server = FakeMySQLServer().start()
+        self.ssh_server = FakeSSHServer(latency=latency, bandwidth=bandwidth).start()
+        self.ssh_config = {
+            'host': self.ssh_server.address[0],
+            'port': self.ssh_server.address[1],
+            'username': self.ssh_server.username,
+            'password': self.ssh_server.password,
+        }
+        self.mysql_config = {
+            'host': self.mysql_server.address[0],
+            'port': self.mysql_server.address[1],
+            'username': 'bench',
+            'password': 'bench',
+            'database': 'bench',
+        }
+
+    def connection(self, compression=False):
+        """MySQLSSHConnection yang sudah terhubung (compression: True, False atau 'auto')"""
+        ssh_config = dict(self.ssh_config, compression=compression)
+        mysql_ssh = MySQLSSHConnection(ssh_config, self.mysql_config, share_tunnel=False)
+        if not mysql_ssh.connect():
+            raise RuntimeError("Gagal connect ke server benchmark")
+        return mysql_ssh
+
+    def close(self):
+        self.ssh_server.stop()
+        self.mysql_server.stop()
+
+def bench_tunnel_setup(env, sizes):
+    """Waktu membuat SSH tunnel baru (handshake SSH + auth + listener lokal)"""
+    samples = []
+    for _ in range(sizes['tunnel_setup_iterations']):
+        start = time.perf_counter()
+        tunnel = acquire_tunnel(env.ssh_config, env.mysql_config, shared=False)
+        samples.append(time.perf_counter() - start)
+        release_tunnel(tunnel, shared=False)
+    stats = summarize(samples)
+    return _result(stats['p50'], 's', False, latency=stats)
+
+def bench_mysql_connect(env, sizes):
+    """Waktu handshake MySQL lewat tunnel yang sudah ada"""
+    tunnel = acquire_tunnel(env.ssh_config, env.mysql_config, shared=False)
+    samples = []
+    try:
+        for _ in range(sizes['mysql_connect_iterations']):
+            start = time.perf_counter()
+            connection = _connect_mysql(env.mysql_config, tunnel.local_bind_port)
+            samples.append(time.perf_counter() - start)
+            connection.close()
+    finally:
+        release_tunnel(tunnel, shared=False)
+    stats = summarize(samples)
+    return _result(stats['p50'], 's', False, latency=stats)
+
+def bench_small_query(env, sizes, compression=False):
+    """Round trip SELECT 1 lewat execute_query"""
+    mysql_ssh = env.connection(compression)
+    samples = []
+    try:
+        mysql_ssh.execute_query("SELECT 1")
+        for _ in range(sizes['small_query_iterations']):
+            start = time.perf_counter()
+            mysql_ssh.execute_query("SELECT 1")
+            samples.append(time.perf_counter() - start)
+    finally:
+        mysql_ssh.close()
+    stats = summarize(samples)
+    return _result(stats['p50'], 's', False, latency=stats)
+
+def bench_large_result(env, sizes, compression=False):
+    """Fetch hasil besar sekaligus (buffered) lewat execute_query"""
+    rows = sizes['large_result_rows']
+    query = f"SELECT id, name, amount, created_at FROM bench LIMIT {rows}"
+    mysql_ssh = env.connection(compression)
+    try:
+        # Panaskan cache respons fake server agar yang diukur sisi client
+        # (mode 'auto' menyala setelah 3 hasil besar dan pindah tunnel di query ke-4)
+        for _ in range(4 if compression == 'auto' else 1):
+            mysql_ssh.execute_query(query)
+        start = time.perf_counter()
+        result = mysql_ssh.execute_query(query)
+        elapsed = time.perf_counter() - start
+        compressed = mysql_ssh.compressed
+    finally:
+        mysql_ssh.close()
+    if result is None or len(result) != rows:
+        raise RuntimeError("Hasil large_result tidak lengkap")
+    return _result(rows / elapsed, 'rows/s', True, rows=rows, seconds=elapsed, compressed=compressed)
+
+def bench_large_result_stream(env, sizes):
+    """Fetch hasil besar lewat server-side cursor (execute_query_stream)"""
+    rows = sizes['large_result_rows']
+    query = f"SELECT id, name, amount, created_at FROM bench LIMIT {rows}"
+    mysql_ssh = env.connection()
+    try:
+        mysql_ssh.execute_query(query)
+        start = time.perf_counter()
+        count = sum(len(chunk) for chunk in mysql_ssh.execute_query_stream(query, chunk_size=5000,
+                                                                            chunked=True))
+        elapsed = time.perf_counter() - start
+    finally:
+        mysql_ssh.close()
+    if count != rows:
+        raise RuntimeError("Hasil large_result_stream tidak lengkap")
+    return _result(rows / elapsed, 'rows/s', True, rows=rows, seconds=elapsed)
+
+def bench_bulk_insert(env, sizes):
+    """Multi-row INSERT lewat bulk_insert (dipecah sesuai max_allowed_packet)"""
+    rows = sizes['bulk_insert_rows']
+    data = [(number, f'user-{number:08d}@example.com', number % 1000, '2025-01-01 00:00:00')
+            for number in range(rows)]
+    mysql_ssh = env.connection()
+    try:
+        start = time.perf_counter()
+        written = mysql_ssh.bulk_insert('bench', ['id', 'name', 'amount', 'created_at'], data)
+        elapsed = time.perf_counter() - start
+    finally:
+        mysql_ssh.close()
+    if written != rows:
+        raise RuntimeError(f"bulk_insert menulis {written} dari {rows} baris")
+    return _result(rows / elapsed, 'rows/s', True, rows=rows, seconds=elapsed)
+
+def bench_pool_throughput(env, sizes):
+    """Query kecil paralel dari banyak thread lewat MySQLSSHConnectionPool"""
+    workers = sizes['pool_workers']
+    per_worker = sizes['pool_queries_per_worker']
+    pool = MySQLSSHConnectionPool(env.ssh_config, env.mysql_config, min_size=workers,
+                                  max_size=workers, share_tunnel=False)
+    if not pool.connect():
+        raise RuntimeError("Gagal membuka connection pool benchmark")
+    errors = []
+    barrier = threading.Barrier(workers + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(per_worker):
+            if pool.execute_query("SELECT 1") is None:
+                errors.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    try:
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+    total = workers * per_worker
+    return _result(total / elapsed, 'queries/s', True, workers=workers, queries=total,
+                   seconds=elapsed, errors=len(errors))
+
+def bench_small_query_compressed(env, sizes):
+    """small_query lewat SSH tunnel terkompresi (biaya zlib di hasil kecil)"""
+    return bench_small_query(env, sizes, compression=True)
+
+def bench_large_result_compressed(env, sizes):
+    """large_result lewat SSH tunnel terkompresi"""
+    return bench_large_result(env, sizes, compression=True)
+
+def bench_large_result_adaptive(env, sizes):
+    """large_result dengan kompresi mode 'auto' (menyala setelah beberapa hasil besar)"""
+    return bench_large_result(env, sizes, compression='auto')
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def run(names=BENCHMARKS, quick=False, latency=0.0, bandwidth=None):
+    """
+    Jalankan benchmark terpilih
+
+    Returns:
+        dict: {'meta': {...}, 'results': {nama: hasil}}
+    """
+    sizes = {name: values[1 if quick else 0] for name, values in SIZES.items()}
+    env = BenchmarkEnvironment(latency=latency, bandwidth=bandwidth)
+    results = {}
+    try:
+        for name in names:
+            results[name] = globals()['bench_' + name](env, sizes)
+    finally:
+        env.close()
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+            'latency_ms': latency * 1000,
+            'bandwidth_mbps': bandwidth * 8 / 10 ** 6 if bandwidth else None,
+            'sizes': sizes,
+        },
+        'results': results,
+    }
+
+def compare(baseline, current, tolerance=0.10):
+    """
+    Bandingkan metrik utama dua hasil benchmark
+
+    Returns:
+        tuple: (baris laporan, daftar nama benchmark yang regresi melebihi tolerance)
+    """
+    lines, regressions = [], []
+    for name, result in current['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if old is None or not old.get('value'):
+            lines.append(f"{name:<22} {result['value']:>14.6g} {result['unit']:<10} (baru)")
+            continue
+        change = (result['value'] - old['value']) / old['value']
+        worse = -change if result['higher_is_better'] else change
+        marker = '  REGRESI' if worse > tolerance else ''
+        if marker:
+            regressions.append(name)
+        lines.append(f"{name:<22} {old['value']:>14.6g} -> {result['value']:<14.6g} "
+                     f"{result['unit']:<10} {change:+.1%}{marker}")
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MySQL via SSH tunnel (server lokal pengganti)")
+    parser.add_argument('--quick', action='store_true', help='Beban kecil untuk pengecekan cepat')
+    parser.add_argument('--only', help='Daftar benchmark dipisah koma: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Jeda tambahan per pengiriman client->server di SSH server (meniru RTT)')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0.0,
+                        help='Batas bandwidth SSH server ke client dalam Mbit/s (0 = tanpa batas)')
+    parser.add_argument('--output', help='Tulis hasil JSON ke file ini (default: stdout)')
+    parser.add_argument('--compare', help='File JSON hasil sebelumnya untuk dibandingkan')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Batas regresi relatif untuk --compare (default 0.10)')
+    args = parser.parse_args(argv)
+
+    names = BENCHMARKS
+    if args.only:
+        names = tuple(name.strip() for name in args.only.split(',') if name.strip())
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            parser.error(f"Benchmark tidak dikenal: {', '.join(sorted(unknown))}")
+
+    # Log per query/connect ikut terukur jika dibiarkan di level INFO
+    logging.getLogger('database').setLevel(logging.WARNING)
+    logging.getLogger('paramiko').setLevel(logging.WARNING)
+
+    report = run(names, quick=args.quick, latency=args.latency_ms / 1000,
+                 bandwidth=args.bandwidth_mbps * 10 ** 6 / 8 or None)
+    document = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as handle:
+            handle.write(document + '\n')
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare, encoding='utf8') as handle:
+            baseline = json.load(handle)
+        lines, regressions = compare(baseline, report, args.tolerance)
+        print('\n'.join(lines), file=sys.stderr)
+        if regressions:
+            print(f"Regresi melebihi {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
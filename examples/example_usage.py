@@ -132,11 +132,13 @@ def example_crud_operations():
         mysql_ssh.execute_query(create_table_query)
         logger.info("Tabel 'users' sudah siap")
         
-        # INSERT: Tambah data
-        insert_query = "INSERT INTO users (name, email) VALUES (%s, %s)"
-        mysql_ssh.execute_query(insert_query, ('John Doe', 'john@example.com'))
-        mysql_ssh.execute_query(insert_query, ('Jane Smith', 'jane@example.com'))
-        logger.info("Data berhasil ditambahkan")
+        # INSERT: Tambah data (multi-row INSERT, satu round trip per batch)
+        rows = [
+            ('John Doe', 'john@example.com'),
+            ('Jane Smith', 'jane@example.com'),
+        ]
+        inserted = mysql_ssh.bulk_insert('users', ['name', 'email'], rows)
+        logger.info(f"{inserted} data berhasil ditambahkan")
         
         # SELECT: Baca data
         select_query = "SELECT * FROM users ORDER BY id DESC LIMIT 5"
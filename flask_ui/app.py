@@ -13,14 +13,70 @@ dengan antarmuka yang user-friendly dan secure.
 import os
 import sys
 from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
-from flask import session
+from flask import session, Response, stream_with_context
 import json
+import uuid
+from contextlib import ExitStack
 from datetime import datetime
 import traceback
 
 # Import core MySQL SSH Connection
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-from database.mysql_ssh_connection import MySQLSSHConnection
+from database.connection_manager import ConnectionManager
+from database.statements import is_read_statement, statement_type
+from database.pagination import QueryPager
+from database.schema_cache import SchemaCache
+from database.result_encoder import dumps
+from database.table_export import encode_csv, encode_jsonl
+from database.metrics import get_metrics_registry
+from database.slow_query_log import SlowQueryLog
+
+# Format download hasil query: (encoder, mimetype)
+EXPORT_FORMATS = {
+    'csv': (encode_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (encode_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
+
+# Jumlah baris per fetch server-side cursor saat download
+EXPORT_CHUNK_SIZE = 5000
+
+# Statement yang mengubah skema: cache metadata dibuang setelah dijalankan
+DDL_STATEMENTS = frozenset(['CREATE', 'ALTER', 'DROP', 'RENAME', 'TRUNCATE'])
+
+# Umur cache metadata skema (detik)
+SCHEMA_CACHE_TTL = 300
+
+# Paginasi hasil di halaman query: baris per halaman dan batas total baris
+PAGE_SIZE = 500
+MAX_RESULT_ROWS = 10000
+
+# Slow-query log per koneksi: batas durasi (detik) dan jumlah entry yang disimpan
+SLOW_QUERY_THRESHOLD = float(os.environ.get('SLOW_QUERY_THRESHOLD', 1.0))
+SLOW_QUERY_CAPACITY = 200
+
+# Batas waktu eksekusi query dari halaman query (detik, 0 = tanpa batas)
+QUERY_TIMEOUT = float(os.environ.get('QUERY_TIMEOUT', 60)) or None
+
+# Koneksi aktif semua pengguna: batas global, batas per session dan umur idle (detik)
+MAX_CONNECTIONS = int(os.environ.get('MAX_CONNECTIONS', 50))
+MAX_CONNECTIONS_PER_SESSION = 1
+CONNECTION_IDLE_TIMEOUT = float(os.environ.get('CONNECTION_IDLE_TIMEOUT', 1800))
+
+# Detik menunggu request lain dari session yang sama selesai memakai koneksi
+CONNECTION_BUSY_TIMEOUT = 5
+CONNECTION_BUSY_MESSAGE = 'Koneksi sedang menjalankan query lain. Tunggu atau batalkan query tersebut.'
+
+QUERY_FAILED_MESSAGE = ('Query gagal dijalankan, dibatalkan atau melewati batas waktu. '
+                        'Periksa syntax SQL atau koneksi database.')
+
+def _json_response(payload, status=200):
+    """
+    Response JSON lewat result encoder (orjson jika terpasang)
+    
+    Menangani datetime, DECIMAL, TIME, BLOB dll. dalam satu kali jalan tanpa
+    mengubah baris hasil query, menggantikan jsonify untuk payload berisi hasil.
+    """
+    return Response(dumps(payload), status=status, mimetype='application/json')
 
 class MySQLSSHFlaskApp:
     def __init__(self):
@@ -30,8 +86,14 @@ class MySQLSSHFlaskApp:
         # Setup routes
         self.setup_routes()
         
-        # Active connections storage
-        self.active_connections = {}
+        # State paginasi hasil query (cursor token -> halaman berikutnya)
+        self.pager = QueryPager(page_size=PAGE_SIZE, max_rows=MAX_RESULT_ROWS)
+        
+        # Koneksi aktif semua session: ID acak per pemilik, lock per koneksi, reaper idle
+        self.connections = ConnectionManager(max_connections=MAX_CONNECTIONS,
+                                             max_per_owner=MAX_CONNECTIONS_PER_SESSION,
+                                             idle_timeout=CONNECTION_IDLE_TIMEOUT)
+        self.connections.add_close_listener(self._on_connection_closed)
     
     def setup_routes(self):
         """Setup all Flask routes"""
@@ -61,21 +123,21 @@ class MySQLSSHFlaskApp:
                     'database': request.form.get('mysql_database'),
                 }
                 
+                # Koneksi lama session ini ditutup agar tunnel tidak menumpuk saat connect ulang
+                owner = self._session_owner()
+                self.connections.close(session.pop('current_connection', None), owner=owner)
+                
                 # Buat koneksi
-                connection_id = f"conn_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                mysql_ssh = MySQLSSHConnection(ssh_config, mysql_config)
+                entry = self.connections.open(ssh_config, mysql_config, owner=owner)
                 
-                if mysql_ssh.connect():
-                    # Simpan koneksi aktif
-                    self.active_connections[connection_id] = {
-                        'connection': mysql_ssh,
-                        'ssh_config': ssh_config,
-                        'mysql_config': mysql_config,
-                        'created_at': datetime.now(),
-                        'status': 'connected'
-                    }
+                if entry is not None:
+                    mysql_ssh = entry.connection
+                    slow_log = SlowQueryLog(threshold=SLOW_QUERY_THRESHOLD, capacity=SLOW_QUERY_CAPACITY)
+                    slow_log.attach(mysql_ssh)
+                    entry.data['schema'] = SchemaCache(mysql_ssh, ttl=SCHEMA_CACHE_TTL)
+                    entry.data['slow_log'] = slow_log
                     
-                    session['current_connection'] = connection_id
+                    session['current_connection'] = entry.id
                     flash('Koneksi berhasil dibuat!', 'success')
                     return redirect(url_for('dashboard'))
                 else:
@@ -89,21 +151,19 @@ class MySQLSSHFlaskApp:
         @self.app.route('/dashboard')
         def dashboard():
             """Dashboard utama dengan informasi koneksi"""
-            connection_id = session.get('current_connection')
-            if not connection_id or connection_id not in self.active_connections:
+            entry = self._current_connection()
+            if entry is None:
                 flash('Tidak ada koneksi aktif. Silakan buat koneksi baru.', 'warning')
                 return redirect(url_for('index'))
             
-            connection_info = self.active_connections[connection_id]
             return render_template('dashboard.html', 
-                                 connection_id=connection_id,
-                                 connection_info=connection_info)
+                                 connection_id=entry.id,
+                                 connection_info=entry)
         
         @self.app.route('/query', methods=['GET', 'POST'])
         def query():
             """Halaman untuk menjalankan query SQL"""
-            connection_id = session.get('current_connection')
-            if not connection_id or connection_id not in self.active_connections:
+            if self._current_connection() is None:
                 return redirect(url_for('index'))
             
             if request.method == 'POST':
@@ -115,32 +175,32 @@ class MySQLSSHFlaskApp:
         def execute_query():
             """API endpoint untuk menjalankan query"""
             try:
-                connection_id = session.get('current_connection')
-                if not connection_id or connection_id not in self.active_connections:
+                entry = self._current_connection()
+                if entry is None:
                     return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
                 
                 query_text = request.json.get('query', '').strip()
                 if not query_text:
                     return jsonify({'error': 'Query tidak boleh kosong'}), 400
                 
-                mysql_ssh = self.active_connections[connection_id]['connection']
-                result = mysql_ssh.execute_query(query_text)
+                with entry.use(CONNECTION_BUSY_TIMEOUT) as mysql_ssh:
+                    if statement_type(query_text) == 'SELECT':
+                        # Halaman pertama saja; sisanya lewat /api/query_page
+                        self.pager.close_for(mysql_ssh)
+                        page = self.pager.start(mysql_ssh, query_text, timeout=QUERY_TIMEOUT)
+                        if page is None:
+                            return jsonify({'error': QUERY_FAILED_MESSAGE}), 500
+                        return _json_response(self._page_response(page))
+                    
+                    result = mysql_ssh.execute_query(query_text, timeout=QUERY_TIMEOUT)
+                if statement_type(query_text) in DDL_STATEMENTS:
+                    entry.data['schema'].invalidate()
                 
                 if result is None:
-                    return jsonify({
-                        'error': 'Query gagal dijalankan. Periksa syntax SQL atau koneksi database.'
-                    }), 500
+                    return jsonify({'error': QUERY_FAILED_MESSAGE}), 500
                 
                 if result is not None:
-                    # Convert datetime objects untuk JSON serialization
-                    if isinstance(result, list):
-                        for row in result:
-                            if isinstance(row, dict):
-                                for key, value in row.items():
-                                    if isinstance(value, datetime):
-                                        row[key] = value.isoformat()
-                    
-                    return jsonify({
+                    return _json_response({
                         'success': True,
                         'data': result,
                         'row_count': len(result) if isinstance(result, list) else result,
@@ -154,29 +214,124 @@ class MySQLSSHFlaskApp:
                         'message': 'Query berhasil dijalankan tanpa hasil.'
                     })
                     
+            except TimeoutError:
+                return jsonify({'error': CONNECTION_BUSY_MESSAGE}), 409
             except Exception as e:
                 return jsonify({
                     'error': f'Error: {str(e)}',
                     'traceback': traceback.format_exc()
                 }), 500
         
+        @self.app.route('/api/cancel_query', methods=['POST'])
+        def cancel_query():
+            """Hentikan query yang sedang berjalan di koneksi aktif (KILL QUERY)"""
+            entry = self._current_connection()
+            if entry is None:
+                return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+            
+            # Tanpa lock koneksi: query yang dibatalkan justru sedang memegangnya
+            cancelled = entry.connection.cancel()
+            return jsonify({'success': True, 'cancelled': cancelled})
+        
+        @self.app.route('/api/query_page', methods=['POST'])
+        def query_page():
+            """API endpoint untuk halaman hasil query berikutnya"""
+            try:
+                entry = self._current_connection()
+                if entry is None:
+                    return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+                
+                token = (request.json or {}).get('cursor')
+                with entry.use(CONNECTION_BUSY_TIMEOUT) as mysql_ssh:
+                    # Token hanya berlaku untuk koneksi session yang membuatnya
+                    page = self.pager.next_page(token, owner=mysql_ssh) if token else None
+                if page is None:
+                    return jsonify({
+                        'error': 'Cursor hasil sudah kedaluwarsa. Jalankan ulang query.'
+                    }), 410
+                return _json_response(self._page_response(page))
+                
+            except TimeoutError:
+                return jsonify({'error': CONNECTION_BUSY_MESSAGE}), 409
+            except Exception as e:
+                return jsonify({'error': f'Error: {str(e)}'}), 500
+        
+        @self.app.route('/api/export_query', methods=['POST'])
+        def export_query():
+            """Download hasil query sebagai CSV/JSONL yang di-stream dari server-side cursor"""
+            entry = self._current_connection()
+            if entry is None:
+                return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+            
+            # Form biasa agar browser langsung menyimpan file tanpa buffer di JavaScript
+            data = request.get_json(silent=True) or request.form
+            query_text = (data.get('query') or '').strip()
+            export_format = data.get('format', 'csv')
+            if not query_text:
+                return jsonify({'error': 'Query tidak boleh kosong'}), 400
+            if export_format not in EXPORT_FORMATS:
+                return jsonify({'error': f'Format tidak didukung: {export_format}'}), 400
+            if not is_read_statement(query_text):
+                return jsonify({'error': 'Hanya query yang mengembalikan hasil yang bisa di-download'}), 400
+            
+            # Koneksi dipegang sampai download selesai, bukan hanya sampai response dikembalikan
+            stack = ExitStack()
+            try:
+                mysql_ssh = stack.enter_context(entry.use(CONNECTION_BUSY_TIMEOUT))
+            except TimeoutError:
+                return jsonify({'error': CONNECTION_BUSY_MESSAGE}), 409
+            except ConnectionError:
+                return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+            
+            batches = mysql_ssh.execute_query_stream(
+                query_text, chunk_size=EXPORT_CHUNK_SIZE, as_dict=False, chunked=True, with_header=True
+            )
+            stack.callback(batches.close)
+            try:
+                # Jalankan query sebelum header response dikirim agar error masih bisa dilaporkan
+                columns = next(batches)
+            except StopIteration:
+                stack.close()
+                return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+            except Exception as e:
+                stack.close()
+                return jsonify({'error': f'Error: {str(e)}'}), 500
+            
+            encoder, mimetype = EXPORT_FORMATS[export_format]
+            
+            def generate():
+                with stack:
+                    # Client memutus download: sisa hasil di-drain dan koneksi bisa dipakai lagi
+                    yield from encoder(columns, batches)
+            
+            filename = f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+            return Response(
+                stream_with_context(generate()),
+                mimetype=mimetype,
+                headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+            )
+        
         @self.app.route('/api/get_databases')
         def get_databases():
             """API untuk mendapatkan daftar database"""
             try:
-                connection_id = session.get('current_connection')
-                if not connection_id or connection_id not in self.active_connections:
+                entry = self._current_connection()
+                if entry is None:
                     return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
                 
-                mysql_ssh = self.active_connections[connection_id]['connection']
-                result = mysql_ssh.execute_query("SHOW DATABASES")
+                schema = entry.data['schema']
+                if request.args.get('refresh'):
+                    schema.invalidate()
+                with entry.use(CONNECTION_BUSY_TIMEOUT):
+                    databases = schema.databases()
                 
-                if result is None:
+                if databases is None:
                     return jsonify({'error': 'Gagal mengambil daftar database. Periksa koneksi Anda.'}), 500
                 
-                databases = [row['Database'] for row in result] if result else []
                 return jsonify({'databases': databases})
                 
+            except TimeoutError:
+                return jsonify({'error': CONNECTION_BUSY_MESSAGE}), 409
             except Exception as e:
                 return jsonify({'error': f'Error: {str(e)}'}), 500
         
@@ -184,19 +339,55 @@ class MySQLSSHFlaskApp:
         def get_tables():
             """API untuk mendapatkan daftar tabel"""
             try:
-                connection_id = session.get('current_connection')
-                if not connection_id or connection_id not in self.active_connections:
+                entry = self._current_connection()
+                if entry is None:
                     return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
                 
-                mysql_ssh = self.active_connections[connection_id]['connection']
-                result = mysql_ssh.execute_query("SHOW TABLES")
+                schema = entry.data['schema']
+                database = request.args.get('database')
+                if request.args.get('refresh'):
+                    schema.invalidate(database or schema.mysql_ssh.mysql_config['database'])
+                with entry.use(CONNECTION_BUSY_TIMEOUT):
+                    tables = schema.tables(database)
                 
-                if result is None:
+                if tables is None:
                     return jsonify({'error': 'Gagal mengambil daftar tabel. Periksa koneksi database Anda.'}), 500
                 
-                tables = [list(row.values())[0] for row in result] if result else []
                 return jsonify({'tables': tables})
                 
+            except TimeoutError:
+                return jsonify({'error': CONNECTION_BUSY_MESSAGE}), 409
+            except Exception as e:
+                return jsonify({'error': f'Error: {str(e)}'}), 500
+        
+        @self.app.route('/api/schema')
+        def get_schema():
+            """API untuk metadata lengkap (kolom, index, perkiraan ukuran) semua tabel satu database"""
+            try:
+                entry = self._current_connection()
+                if entry is None:
+                    return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+                
+                schema = entry.data['schema']
+                database = request.args.get('database')
+                table_name = request.args.get('table')
+                with entry.use(CONNECTION_BUSY_TIMEOUT):
+                    if request.args.get('refresh') and not schema.refresh(database):
+                        return jsonify({'error': 'Gagal memuat ulang metadata skema.'}), 500
+                    
+                    if table_name:
+                        table = schema.table(table_name, database)
+                        if table is None:
+                            return jsonify({'error': f'Tabel {table_name} tidak ditemukan'}), 404
+                        return _json_response({'table': table})
+                    
+                    tables = schema.tables(database, details=True)
+                if tables is None:
+                    return jsonify({'error': 'Gagal mengambil metadata skema. Periksa koneksi database Anda.'}), 500
+                return _json_response({'tables': tables})
+                
+            except TimeoutError:
+                return jsonify({'error': CONNECTION_BUSY_MESSAGE}), 409
             except Exception as e:
                 return jsonify({'error': f'Error: {str(e)}'}), 500
         
@@ -204,35 +395,84 @@ class MySQLSSHFlaskApp:
         def status():
             """API untuk mendapatkan status koneksi"""
             try:
-                connection_id = session.get('current_connection')
-                if not connection_id or connection_id not in self.active_connections:
+                entry = self._current_connection()
+                if entry is None:
                     return jsonify({
                         'connected': False,
                         'message': 'Tidak ada koneksi aktif'
                     })
                 
-                connection_info = self.active_connections[connection_id]
                 return jsonify({
                     'connected': True,
-                    'connection_id': connection_id,
-                    'ssh_host': connection_info.get('ssh_host', 'Unknown'),
-                    'mysql_host': connection_info.get('mysql_host', 'Unknown'),
-                    'mysql_database': connection_info.get('mysql_database', 'Unknown'),
-                    'connected_at': connection_info.get('connected_at', 'Unknown')
+                    'connection_id': entry.id,
+                    'ssh_host': entry.ssh_config['host'],
+                    'mysql_host': entry.mysql_config['host'],
+                    'mysql_database': entry.mysql_config['database'],
+                    'connected_at': entry.created_at.isoformat(),
+                    'busy': entry.busy
                 })
                 
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
+        @self.app.route('/slow_queries')
+        def slow_queries():
+            """Halaman query lambat koneksi aktif"""
+            entry = self._current_connection()
+            if entry is None:
+                flash('Tidak ada koneksi aktif. Silakan buat koneksi baru.', 'warning')
+                return redirect(url_for('index'))
+            
+            slow_log = entry.data['slow_log']
+            entries = [
+                dict(entry, recorded_at=datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S'))
+                for entry in slow_log.entries()
+            ]
+            return render_template('slow_queries.html',
+                                 entries=entries,
+                                 summary=slow_log.summary(),
+                                 stats=slow_log.stats())
+        
+        @self.app.route('/api/slow_queries', methods=['GET', 'DELETE'])
+        def api_slow_queries():
+            """API entry dan ringkasan query lambat (DELETE untuk mengosongkan)"""
+            entry = self._current_connection()
+            if entry is None:
+                return jsonify({'error': 'Tidak ada koneksi aktif'}), 400
+            
+            slow_log = entry.data['slow_log']
+            if request.method == 'DELETE':
+                slow_log.clear()
+                return jsonify({'success': True})
+            limit = request.args.get('limit', type=int)
+            return _json_response({
+                'entries': slow_log.entries(limit),
+                'summary': slow_log.summary(),
+                'stats': slow_log.stats(),
+            })
+        
+        @self.app.route('/metrics')
+        def metrics():
+            """Metrik latensi/throughput koneksi (teks Prometheus, atau ?format=json)"""
+            registry = get_metrics_registry()
+            if request.args.get('format') == 'json':
+                return _json_response(registry.snapshot())
+            return Response(registry.export('prometheus'),
+                            content_type='text/plain; version=0.0.4; charset=utf-8')
+        
+        @self.app.route('/api/connections')
+        def api_connections():
+            """Jumlah koneksi, tunnel dan memori proses; detail hanya untuk koneksi session ini"""
+            stats = self.connections.stats()
+            owned = {entry.id for entry in [self._current_connection()] if entry is not None}
+            stats['details'] = [detail for detail in stats['details'] if detail['id'] in owned]
+            return jsonify(stats)
+        
         @self.app.route('/disconnect')
         def disconnect():
             """Disconnect dari SSH dan MySQL"""
-            connection_id = session.get('current_connection')
-            if connection_id and connection_id in self.active_connections:
-                mysql_ssh = self.active_connections[connection_id]['connection']
-                mysql_ssh.close()
-                del self.active_connections[connection_id]
-                session.pop('current_connection', None)
+            connection_id = session.pop('current_connection', None)
+            if self.connections.close(connection_id, owner=session.get('owner')):
                 flash('Koneksi berhasil ditutup.', 'info')
             
             return redirect(url_for('index'))
@@ -249,6 +489,42 @@ class MySQLSSHFlaskApp:
                                  error_code=500, 
                                  error_message="Terjadi kesalahan internal"), 500
     
+    def _session_owner(self):
+        """Token pemilik koneksi untuk session browser ini (dibuat saat pertama dipakai)"""
+        if 'owner' not in session:
+            session['owner'] = uuid.uuid4().hex
+        return session['owner']
+    
+    def _current_connection(self):
+        """Koneksi aktif session ini, None jika tidak ada atau sudah ditutup reaper"""
+        return self.connections.get(session.get('current_connection'), owner=session.get('owner'))
+    
+    def _on_connection_closed(self, entry):
+        """Lepas state paginasi dan slow-query log sebelum koneksi ditutup"""
+        self.pager.close_for(entry.connection)
+        slow_log = entry.data.get('slow_log')
+        if slow_log is not None:
+            slow_log.detach(entry.connection)
+    
+    def _page_response(self, page):
+        """Body JSON untuk satu halaman hasil dari QueryPager"""
+        if page['truncated']:
+            message = f"Menampilkan {page['row_count']} baris pertama (batas {MAX_RESULT_ROWS} baris)."
+        elif page['has_more']:
+            message = f"{page['row_count']} baris pertama dimuat. Klik Load more untuk halaman berikutnya."
+        else:
+            message = f"Query berhasil dijalankan. {page['row_count']} baris dikembalikan."
+        return {
+            'success': True,
+            'data': page['rows'],
+            'columns': page['columns'],
+            'cursor': page['cursor'],
+            'has_more': page['has_more'],
+            'truncated': page['truncated'],
+            'row_count': page['row_count'],
+            'message': message,
+        }
+    
     def run(self, host='127.0.0.1', port=5000, debug=True):
         """Menjalankan Flask app"""
         print(f"🚀 MySQL SSH Web UI starting...")
@@ -342,6 +342,7 @@ class MySQLSSHUI {
 
         const resultsContainer = document.getElementById('queryResults');
         resultsContainer.innerHTML = '<div class="text-center"><i class="fas fa-spinner fa-spin"></i> Executing query...</div>';
+        this.currentQuery = queryText;
 
         fetch('/api/execute_query', {
             method: 'POST',
@@ -353,7 +354,7 @@ class MySQLSSHUI {
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                this.displayQueryResults(data.data, data.message);
+                this.displayQueryResults(data.data, data.message, data);
             } else {
                 this.showAlert(data.error || 'Query execution failed', 'danger');
                 resultsContainer.innerHTML = `<div class="text-danger">Error: ${data.error}</div>`;
@@ -365,7 +366,7 @@ class MySQLSSHUI {
         });
     }
 
-    displayQueryResults(data, message) {
+    displayQueryResults(data, message, page) {
         const resultsContainer = document.getElementById('queryResults');
         
         if (!data || data.length === 0) {
@@ -383,11 +384,15 @@ class MySQLSSHUI {
                 <div>
                     <i class="fas fa-check-circle me-2 text-success"></i>
                     <span class="row-count">${data.length}</span> row(s) returned
+                    <span class="results-message text-muted ms-2"></span>
                 </div>
                 <div class="export-options">
                     <button class="btn btn-outline-secondary btn-sm" onclick="app.exportToCSV()" title="Export to CSV">
                         <i class="fas fa-download"></i> CSV
                     </button>
+                    <button class="btn btn-outline-secondary btn-sm" onclick="app.exportQuery('jsonl')" title="Export to JSON Lines">
+                        <i class="fas fa-download"></i> JSONL
+                    </button>
                 </div>
             </div>
         `;
@@ -402,14 +407,28 @@ class MySQLSSHUI {
         `;
 
         // Table headers
-        const headers = Object.keys(data[0]);
+        const headers = (page && page.columns && page.columns.length) ? page.columns : Object.keys(data[0]);
         headers.forEach(header => {
             html += `<th>${header}</th>`;
         });
         html += '</tr></thead><tbody>';
 
         // Table rows with compact data
-        data.forEach((row, rowIndex) => {
+        html += this.renderResultRows(headers, data);
+
+        html += '</tbody></table></div></div>';
+        html += '<div class="load-more text-center mt-2"></div>';
+        resultsContainer.innerHTML = html;
+        
+        // Store data for export
+        this.currentResultData = data;
+        this.currentHeaders = headers;
+        this.updatePagination(page);
+    }
+
+    renderResultRows(headers, rows) {
+        let html = '';
+        rows.forEach(row => {
             html += '<tr>';
             headers.forEach(header => {
                 const value = row[header];
@@ -430,12 +449,58 @@ class MySQLSSHUI {
             });
             html += '</tr>';
         });
+        return html;
+    }
 
-        html += '</tbody></table></div></div>';
-        resultsContainer.innerHTML = html;
-        
-        // Store data for export
-        this.currentResultData = data;
+    updatePagination(page) {
+        const resultsContainer = document.getElementById('queryResults');
+        const loadMore = resultsContainer.querySelector('.load-more');
+        const messageEl = resultsContainer.querySelector('.results-message');
+        this.currentCursor = page ? page.cursor : null;
+
+        if (messageEl && page && (page.has_more || page.truncated)) {
+            messageEl.textContent = page.message;
+        } else if (messageEl) {
+            messageEl.textContent = '';
+        }
+        if (!loadMore) return;
+        loadMore.innerHTML = this.currentCursor ? `
+            <button class="btn btn-outline-primary btn-sm" onclick="app.loadMoreResults()">
+                <i class="fas fa-angle-double-down me-1"></i> Load more
+            </button>
+        ` : '';
+    }
+
+    loadMoreResults() {
+        if (!this.currentCursor) return;
+
+        const resultsContainer = document.getElementById('queryResults');
+        const loadMore = resultsContainer.querySelector('.load-more');
+        loadMore.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Loading...';
+
+        fetch('/api/query_page', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ cursor: this.currentCursor })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                this.currentCursor = null;
+                loadMore.innerHTML = `<div class="text-danger">${data.error}</div>`;
+                return;
+            }
+            const tbody = resultsContainer.querySelector('tbody');
+            tbody.insertAdjacentHTML('beforeend', this.renderResultRows(this.currentHeaders, data.data));
+            this.currentResultData = this.currentResultData.concat(data.data);
+            resultsContainer.querySelector('.row-count').textContent = data.row_count;
+            this.updatePagination(data);
+        })
+        .catch(error => {
+            loadMore.innerHTML = `<div class="text-danger">Network Error: ${error}</div>`;
+        });
     }
 
     toggleCellExpansion(element) {
@@ -456,38 +521,34 @@ class MySQLSSHUI {
     }
 
     exportToCSV() {
-        if (!this.currentResultData || this.currentResultData.length === 0) {
-            alert('No data to export');
+        this.exportQuery('csv');
+    }
+
+    exportQuery(format) {
+        const queryText = this.currentQuery || document.getElementById('queryText').value.trim();
+        if (!queryText) {
+            alert('No query to export');
             return;
         }
 
-        const headers = Object.keys(this.currentResultData[0]);
-        let csvContent = headers.join(',') + '\n';
-
-        this.currentResultData.forEach(row => {
-            const values = headers.map(header => {
-                const value = row[header];
-                if (value === null || value === undefined) return '';
-                // Escape commas and quotes for CSV
-                const strValue = String(value);
-                if (strValue.includes(',') || strValue.includes('"') || strValue.includes('\n')) {
-                    return '"' + strValue.replace(/"/g, '""') + '"';
-                }
-                return strValue;
-            });
-            csvContent += values.join(',') + '\n';
+        // Submit form biasa: server men-stream file langsung ke download browser,
+        // tanpa membangun seluruh isi file di memori JavaScript
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = '/api/export_query';
+        form.style.display = 'none';
+
+        [['query', queryText], ['format', format]].forEach(([name, value]) => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = name;
+            input.value = value;
+            form.appendChild(input);
         });
 
-        // Download CSV file
-        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-        const link = document.createElement('a');
-        const url = URL.createObjectURL(blob);
-        link.setAttribute('href', url);
-        link.setAttribute('download', `query_results_${new Date().toISOString().slice(0, 19).replace(/:/g, '-')}.csv`);
-        link.style.visibility = 'hidden';
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
+        document.body.appendChild(form);
+        form.submit();
+        document.body.removeChild(form);
     }
 
     checkConnectionStatus() {
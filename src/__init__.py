@@ -4,8 +4,28 @@ Package untuk koneksi MySQL melalui SSH tunnel
 """
 
 from .database.mysql_ssh_connection import MySQLSSHConnection
+from .database.connection_pool import MySQLSSHConnectionPool
+from .database.async_connection import AsyncMySQLSSHConnection, AsyncMySQLSSHConnectionPool
+from .database.query_cache import QueryCache
+from .database.table_export import TableExporter
+from .database.fanout import QueryFanout
+from .database.read_write_router import ReadWriteRouter
+from .database.connection_manager import ConnectionManager
+from .database.tunnel_manager import TunnelManager, get_tunnel_manager
 
 __version__ = "1.0.0"
 __author__ = "Your Name"
 
-__all__ = ["MySQLSSHConnection"]
+__all__ = [
+    "MySQLSSHConnection",
+    "MySQLSSHConnectionPool",
+    "AsyncMySQLSSHConnection",
+    "AsyncMySQLSSHConnectionPool",
+    "QueryCache",
+    "TableExporter",
+    "QueryFanout",
+    "ReadWriteRouter",
+    "ConnectionManager",
+    "TunnelManager",
+    "get_tunnel_manager",
+]
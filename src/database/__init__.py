@@ -3,5 +3,25 @@ Database module untuk MySQL SSH Connection
 """
 
 from .mysql_ssh_connection import MySQLSSHConnection
+from .connection_pool import MySQLSSHConnectionPool
+from .async_connection import AsyncMySQLSSHConnection, AsyncMySQLSSHConnectionPool
+from .query_cache import QueryCache
+from .table_export import TableExporter
+from .fanout import QueryFanout
+from .read_write_router import ReadWriteRouter
+from .connection_manager import ConnectionManager
+from .tunnel_manager import TunnelManager, get_tunnel_manager
 
-__all__ = ["MySQLSSHConnection"]
+__all__ = [
+    "MySQLSSHConnection",
+    "MySQLSSHConnectionPool",
+    "AsyncMySQLSSHConnection",
+    "AsyncMySQLSSHConnectionPool",
+    "QueryCache",
+    "TableExporter",
+    "QueryFanout",
+    "ReadWriteRouter",
+    "ConnectionManager",
+    "TunnelManager",
+    "get_tunnel_manager",
+]
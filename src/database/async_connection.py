@@ -0,0 +1,230 @@
+"""
+Client asyncio untuk MySQL via SSH tunnel
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Setup SSH dan protokol MySQL (pymysql) dijalankan di thread executor
+sehingga event loop tidak pernah terblokir. Forwarding SSH sendiri sudah
+berjalan di thread latar milik sshtunnel.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .mysql_ssh_connection import MySQLSSHConnection
+from .connection_pool import MySQLSSHConnectionPool
+
+logger = logging.getLogger(__name__)
+
+class _AsyncExecutorWrapper:
+    """Basis untuk menjalankan method blocking di executor tanpa memblokir loop"""
+
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='mysql-ssh-async')
+
+    async def _run(self, func, *args, **kwargs):
+        """Jalankan fungsi blocking di executor dan tunggu hasilnya"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _iterate(self, generator):
+        """Ubah generator blocking (yield list baris) menjadi async iterator per baris"""
+        try:
+            while True:
+                rows = await self._run(next, generator, None)
+                if rows is None:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            # Tutup generator di executor: cursor di-drain dan koneksi dilepas
+            await self._run(generator.close)
+
+class AsyncMySQLSSHConnection(_AsyncExecutorWrapper):
+    def __init__(self, ssh_config, mysql_config, **options):
+        """
+        Inisialisasi koneksi async MySQL via SSH
+
+        Satu koneksi MySQL hanya bisa menjalankan satu query dalam satu waktu,
+        sehingga semua operasi diserialisasi. Untuk query paralel gunakan
+        AsyncMySQLSSHConnectionPool.
+
+        Args:
+            ssh_config (dict): Konfigurasi SSH server
+            mysql_config (dict): Konfigurasi MySQL database
+            **options: Argumen tambahan untuk MySQLSSHConnection (mis. ping_interval)
+        """
+        self.sync_connection = MySQLSSHConnection(ssh_config, mysql_config, **options)
+        super().__init__(max_workers=1)
+        self._lock = None
+
+    def _get_lock(self):
+        # Lock dibuat di dalam loop yang sedang berjalan (kompatibel Python 3.8)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def connect(self):
+        """Membuat koneksi SSH tunnel dan MySQL tanpa memblokir event loop"""
+        async with self._get_lock():
+            return await self._run(self.sync_connection.connect)
+
+    async def execute(self, query, params=None, result_format='dict', timeout=None):
+        """
+        Eksekusi query SQL
+
+        Returns:
+            list/int: Hasil query atau jumlah baris terpengaruh, None jika gagal
+        """
+        async with self._get_lock():
+            return await self._run(self.sync_connection.execute_query, query, params,
+                                   result_format=result_format, timeout=timeout)
+
+    async def cancel(self):
+        """Hentikan query yang sedang berjalan (lihat MySQLSSHConnection.cancel)"""
+        # Executor koneksi sedang dipakai query yang mau dihentikan: pakai executor default
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.sync_connection.cancel)
+
+    async def execute_many(self, query, params_seq, batch_size=1000):
+        """Versi async dari MySQLSSHConnection.execute_many"""
+        async with self._get_lock():
+            return await self._run(self.sync_connection.execute_many, query, params_seq, batch_size)
+
+    async def bulk_insert(self, table, columns, rows, batch_size=None):
+        """Versi async dari MySQLSSHConnection.bulk_insert"""
+        async with self._get_lock():
+            return await self._run(self.sync_connection.bulk_insert, table, columns, rows, batch_size)
+
+    async def execute_script(self, script, max_statements=500, stop_on_error=True):
+        """Versi async dari MySQLSSHConnection.execute_script"""
+        # Script berjalan di koneksi tambahan sendiri, tidak perlu lock koneksi utama
+        return await self._run(self.sync_connection.execute_script, script, max_statements, stop_on_error)
+
+    async def stream(self, query, params=None, chunk_size=1000, as_dict=True):
+        """
+        Streaming hasil query sebagai async iterator (server-side cursor)
+
+        Koneksi dikunci sampai iterasi selesai. Jika berhenti lebih awal,
+        gunakan contextlib.aclosing agar koneksi langsung dilepas.
+
+        Yields:
+            dict/tuple: Baris hasil query
+        """
+        async with self._get_lock():
+            generator = self.sync_connection.execute_query_stream(
+                query, params, chunk_size=chunk_size, as_dict=as_dict, chunked=True
+            )
+            rows = self._iterate(generator)
+            try:
+                async for row in rows:
+                    yield row
+            finally:
+                # Cursor di-drain sebelum lock dilepas, bukan menunggu finalizer asyncio
+                await rows.aclose()
+
+    async def close(self):
+        """Menutup koneksi MySQL, SSH tunnel dan executor"""
+        async with self._get_lock():
+            await self._run(self.sync_connection.close)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError("Gagal membuat koneksi MySQL via SSH")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+class AsyncMySQLSSHConnectionPool(_AsyncExecutorWrapper):
+    def __init__(self, ssh_config, mysql_config, **options):
+        """
+        Inisialisasi pool async: banyak koneksi MySQL lewat satu SSH tunnel
+
+        Jumlah query dan stream yang berjalan paralel dibatasi max_size pool;
+        sisanya menunggu slot di event loop (bukan di thread executor) tanpa
+        memblokir loop.
+
+        Args:
+            ssh_config (dict): Konfigurasi SSH server
+            mysql_config (dict): Konfigurasi MySQL database
+            **options: Argumen MySQLSSHConnectionPool (min_size, max_size, dst.)
+        """
+        self.pool = MySQLSSHConnectionPool(ssh_config, mysql_config, **options)
+        # Satu thread per koneksi; checkout dibatasi slot async agar stream yang
+        # menahan koneksi tidak kehabisan thread untuk fetch berikutnya
+        super().__init__(max_workers=self.pool.max_size)
+        self._slots = None
+
+    def _get_slots(self):
+        # Semaphore dibuat di dalam loop yang sedang berjalan (kompatibel Python 3.8)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool.max_size)
+        return self._slots
+
+    async def connect(self):
+        """Membuat SSH tunnel bersama dan koneksi awal pool"""
+        return await self._run(self.pool.connect)
+
+    async def execute(self, query, params=None, result_format='dict', timeout=None):
+        """
+        Eksekusi query memakai satu koneksi pinjaman dari pool
+
+        Returns:
+            list/int: Hasil query atau jumlah baris terpengaruh, None jika gagal
+        """
+        async with self._get_slots():
+            return await self._run(self.pool.execute_query, query, params, result_format, timeout)
+
+    async def cancel(self):
+        """Hentikan semua query pool yang sedang berjalan"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.pool.cancel)
+
+    async def stream(self, query, params=None, chunk_size=1000, as_dict=True):
+        """
+        Streaming hasil query sebagai async iterator memakai satu koneksi pool
+
+        Yields:
+            dict/tuple: Baris hasil query
+        """
+        # Slot ditahan selama stream terbuka karena koneksinya juga ditahan
+        async with self._get_slots():
+            generator = self.pool.execute_query_stream(
+                query, params, chunk_size=chunk_size, as_dict=as_dict, chunked=True
+            )
+            rows = self._iterate(generator)
+            try:
+                async for row in rows:
+                    yield row
+            finally:
+                # Koneksi kembali ke pool saat stream ditutup, bukan menunggu finalizer asyncio
+                await rows.aclose()
+
+    def stats(self):
+        """Statistik pool saat ini"""
+        return self.pool.stats()
+
+    async def close(self):
+        """Menutup semua koneksi pool, SSH tunnel dan executor"""
+        await self._run(self.pool.close)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError("Gagal membuat connection pool")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
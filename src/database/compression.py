@@ -0,0 +1,97 @@
+"""
+Kompresi transport SSH untuk hasil query besar lewat tunnel
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Kompresi dipasang di transport SSH (zlib, dinegosiasikan dengan server)
+lewat ssh_config['compression']: True, False, atau 'auto'. Mode 'auto'
+mulai tanpa kompresi dan mengukur byte protokol MySQL yang diterima per
+query; jika rata-ratanya melewati ambang, koneksi pindah ke tunnel
+terkompresi. Kompresi protokol MySQL sendiri (zlib/zstd) tidak didukung
+pymysql sehingga tidak ditawarkan di sini.
+"""
+
+# Rata-rata byte hasil per query yang membuat mode 'auto' menyalakan kompresi
+COMPRESSION_THRESHOLD = 64 * 1024
+
+COMPRESSION_MODES = (False, True, 'auto')
+
+def compression_mode(ssh_config):
+    """
+    Mode kompresi dari ssh_config['compression']
+
+    Returns:
+        bool/str: None (tidak diatur), False, True atau 'auto'
+
+    Raises:
+        ValueError: Jika nilai tidak dikenal
+    """
+    mode = ssh_config.get('compression')
+    # Cek identitas, bukan `in`: 0 dan 1 dianggap sama dengan False dan True
+    if not (mode is None or mode is True or mode is False or mode == 'auto'):
+        raise ValueError(f"compression harus True, False atau 'auto', bukan {mode!r}")
+    return mode
+
+def tunnel_compression(ssh_config):
+    """
+    Nilai compression untuk SSHTunnelForwarder sesuai ssh_config
+
+    Returns:
+        bool: True/False jika diatur ('auto' mulai tanpa kompresi), None jika
+            tidak diatur sehingga opsi Compression di ~/.ssh/config berlaku
+    """
+    mode = compression_mode(ssh_config)
+    if mode is None:
+        return None
+    return mode is True
+
+class AdaptiveCompression:
+    """Keputusan mode 'auto': rata-rata bergerak byte hasil per query"""
+
+    def __init__(self, threshold=COMPRESSION_THRESHOLD, min_samples=3, weight=0.3):
+        """
+        Args:
+            threshold (int): Rata-rata byte per query yang menyalakan kompresi
+            min_samples (int): Jumlah query minimal sebelum keputusan diambil
+            weight (float): Bobot query terbaru di rata-rata bergerak (0-1]
+
+        Raises:
+            ValueError: Jika parameter tidak valid
+        """
+        if threshold <= 0:
+            raise ValueError("compression_threshold harus lebih dari 0")
+        if not 0 < weight <= 1:
+            raise ValueError("weight harus di antara 0 dan 1")
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.weight = weight
+        self.average = None
+        self.samples = 0
+        # Sekali menyala tidak dimatikan lagi agar koneksi tidak bolak-balik pindah tunnel
+        self.enabled = False
+
+    def observe(self, received):
+        """
+        Catat byte yang diterima satu query
+
+        Returns:
+            bool: True tepat sekali, saat rata-rata pertama kali melewati ambang
+        """
+        if self.enabled:
+            return False
+        self.samples += 1
+        if self.average is None:
+            self.average = float(received)
+        else:
+            self.average += self.weight * (received - self.average)
+        if self.samples >= self.min_samples and self.average >= self.threshold:
+            self.enabled = True
+            return True
+        return False
@@ -0,0 +1,358 @@
+"""
+Pengelola koneksi MySQL via SSH per pemilik (session) untuk aplikasi multi-user
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Setiap koneksi mendapat ID acak (uuid4) yang terikat ke pemiliknya dan lock
+sendiri sehingga request paralel dari session yang sama tidak memakai satu
+koneksi pymysql bersamaan. Jumlah koneksi dan SSH tunnel dibatasi secara
+global (dan per pemilik), koneksi idle ditutup oleh thread reaper, dan
+stats() melaporkan jumlah koneksi, tunnel dan memori proses.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from .mysql_ssh_connection import MySQLSSHConnection, _validate_configs
+from .tunnel_manager import TunnelManager, get_tunnel_manager
+
+logger = logging.getLogger(__name__)
+
+def _process_rss():
+    """Resident set size proses dalam byte (None jika tidak tersedia di platform ini)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class ManagedConnection:
+    """Satu koneksi terkelola beserta pemilik, lock dan data pendampingnya"""
+
+    def __init__(self, connection_id, owner, connection):
+        self.id = connection_id
+        self.owner = owner
+        self.connection = connection
+        self.ssh_config = connection.ssh_config
+        self.mysql_config = connection.mysql_config
+        # Objek pendamping milik aplikasi (mis. cache skema, slow-query log)
+        self.data = {}
+        self.created_at = datetime.now()
+        self.last_used = time.monotonic()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    @property
+    def busy(self):
+        """True jika ada request yang sedang memakai koneksi"""
+        return self.lock.locked()
+
+    def idle_seconds(self, now=None):
+        return (now if now is not None else time.monotonic()) - self.last_used
+
+    @contextmanager
+    def use(self, timeout=None):
+        """
+        Context manager: pakai koneksi secara eksklusif
+
+        Args:
+            timeout (float): Detik menunggu request lain selesai (None = tunggu terus)
+
+        Raises:
+            TimeoutError: Jika koneksi masih dipakai setelah timeout
+            ConnectionError: Jika koneksi sudah ditutup
+        """
+        if not self.lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError("Koneksi sedang dipakai request lain")
+        try:
+            if self.closed:
+                raise ConnectionError("Koneksi sudah ditutup")
+            self.last_used = time.monotonic()
+            yield self.connection
+        finally:
+            self.last_used = time.monotonic()
+            self.lock.release()
+
+class ConnectionManager:
+    def __init__(self, max_connections=50, max_tunnels=None, max_per_owner=None, idle_timeout=1800,
+                 reap_interval=60, close_timeout=10, **connection_options):
+        """
+        Inisialisasi pengelola koneksi
+
+        Args:
+            max_connections (int): Batas koneksi terbuka untuk seluruh proses
+            max_tunnels (int): Batas SSH tunnel berbeda (None = sama dengan max_connections);
+                koneksi ke endpoint yang sama berbagi satu tunnel
+            max_per_owner (int): Batas koneksi per pemilik (None = tidak dibatasi)
+            idle_timeout (float): Koneksi yang tidak dipakai sekian detik ditutup
+                reaper (None = tidak pernah)
+            reap_interval (float): Jeda pemeriksaan koneksi idle (detik)
+            close_timeout (float): Detik menunggu request yang sedang berjalan
+                selesai (setelah dibatalkan) sebelum koneksi ditutup paksa
+            **connection_options: Argumen tambahan MySQLSSHConnection
+
+        Raises:
+            ValueError: Jika batas tidak valid
+        """
+        if max_connections < 1:
+            raise ValueError("max_connections minimal 1")
+        if max_tunnels is not None and max_tunnels < 1:
+            raise ValueError("max_tunnels minimal 1")
+        if max_per_owner is not None and max_per_owner < 1:
+            raise ValueError("max_per_owner minimal 1")
+        if reap_interval <= 0:
+            raise ValueError("reap_interval harus lebih dari 0")
+
+        self.max_connections = max_connections
+        self.max_tunnels = max_tunnels
+        self.max_per_owner = max_per_owner
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.close_timeout = close_timeout
+        self.connection_options = connection_options
+        self.reaped = 0
+        self._connections = {}
+        # Slot yang dipesan selama connect berjalan: (pemilik, key tunnel)
+        self._opening = []
+        self._close_listeners = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._reaper = None
+
+    def _tunnel_keys(self):
+        """Key tunnel yang sedang dipakai atau sedang dibuka (dipanggil di bawah lock)"""
+        keys = {TunnelManager.make_key(entry.ssh_config, entry.mysql_config)
+                for entry in self._connections.values()}
+        keys.update(key for _, key in self._opening)
+        return keys
+
+    def _reserve(self, owner, key):
+        """Pesan slot koneksi atau lempar RuntimeError jika batas tercapai"""
+        with self._lock:
+            if len(self._connections) + len(self._opening) >= self.max_connections:
+                raise RuntimeError(f"Batas {self.max_connections} koneksi tercapai, coba lagi nanti")
+            if self.max_per_owner is not None:
+                owned = sum(1 for entry in self._connections.values() if entry.owner == owner)
+                owned += sum(1 for opening_owner, _ in self._opening if opening_owner == owner)
+                if owned >= self.max_per_owner:
+                    raise RuntimeError(f"Batas {self.max_per_owner} koneksi per pengguna tercapai")
+            tunnel_keys = self._tunnel_keys()
+            max_tunnels = self.max_tunnels or self.max_connections
+            if key not in tunnel_keys and len(tunnel_keys) >= max_tunnels:
+                raise RuntimeError(f"Batas {max_tunnels} SSH tunnel tercapai, coba lagi nanti")
+            slot = (owner, key)
+            self._opening.append(slot)
+            return slot
+
+    def open(self, ssh_config, mysql_config, owner=None):
+        """
+        Buat koneksi baru untuk pemilik
+
+        Args:
+            ssh_config (dict): Konfigurasi SSH server
+            mysql_config (dict): Konfigurasi MySQL database
+            owner (str): Pemilik koneksi (mis. ID session)
+
+        Returns:
+            ManagedConnection: Koneksi terhubung, None jika connect gagal
+
+        Raises:
+            TypeError/ValueError: Jika konfigurasi tidak valid
+            RuntimeError: Jika batas koneksi, tunnel atau per pemilik tercapai
+        """
+        _validate_configs(ssh_config, mysql_config)
+        self.reap()
+        slot = self._reserve(owner, TunnelManager.make_key(ssh_config, mysql_config))
+        entry = None
+        try:
+            connection = MySQLSSHConnection(ssh_config, mysql_config, **self.connection_options)
+            if connection.connect():
+                entry = ManagedConnection(uuid.uuid4().hex, owner, connection)
+        finally:
+            with self._lock:
+                self._opening.remove(slot)
+                if entry is not None:
+                    self._connections[entry.id] = entry
+        if entry is None:
+            return None
+
+        self._start_reaper()
+        logger.info(f"Koneksi {entry.id} dibuka ({len(self)} koneksi aktif)")
+        return entry
+
+    def get(self, connection_id, owner=None):
+        """
+        Koneksi dengan ID tersebut milik owner
+
+        Returns:
+            ManagedConnection: None jika tidak ada, sudah ditutup atau milik pemilik lain
+        """
+        if connection_id is None:
+            return None
+        with self._lock:
+            entry = self._connections.get(connection_id)
+        if entry is None or entry.owner != owner:
+            return None
+        return entry
+
+    def add_close_listener(self, callback):
+        """Daftarkan callback(entry) yang dipanggil sebelum koneksi ditutup"""
+        self._close_listeners.append(callback)
+
+    def _close_entry(self, entry, locked=False):
+        """Tutup koneksi yang sudah dikeluarkan dari registry"""
+        acquired = locked
+        if not locked:
+            # Query yang masih berjalan dihentikan agar lock cepat dilepas
+            entry.connection.cancel()
+            acquired = entry.lock.acquire(timeout=self.close_timeout)
+        try:
+            entry.closed = True
+            for callback in list(self._close_listeners):
+                try:
+                    callback(entry)
+                except Exception as e:
+                    logger.error(f"Error di listener penutupan koneksi: {str(e)}")
+            entry.connection.close()
+        finally:
+            if acquired:
+                entry.lock.release()
+
+    def close(self, connection_id, owner=None):
+        """
+        Tutup koneksi milik owner
+
+        Returns:
+            bool: True jika koneksi ditemukan dan ditutup
+        """
+        with self._lock:
+            entry = self._connections.get(connection_id)
+            if entry is None or entry.owner != owner:
+                return False
+            del self._connections[connection_id]
+        self._close_entry(entry)
+        logger.info(f"Koneksi {connection_id} ditutup")
+        return True
+
+    def close_owner(self, owner):
+        """Tutup semua koneksi milik owner, kembalikan jumlahnya"""
+        with self._lock:
+            entries = [entry for entry in self._connections.values() if entry.owner == owner]
+            for entry in entries:
+                del self._connections[entry.id]
+        for entry in entries:
+            self._close_entry(entry)
+        return len(entries)
+
+    def reap(self, now=None):
+        """
+        Tutup koneksi yang idle lebih lama dari idle_timeout
+
+        Koneksi yang sedang dipakai request tidak pernah ditutup reaper.
+
+        Returns:
+            int: Jumlah koneksi yang ditutup
+        """
+        if self.idle_timeout is None:
+            return 0
+        now = now if now is not None else time.monotonic()
+        expired = []
+        with self._lock:
+            for entry in list(self._connections.values()):
+                if entry.idle_seconds(now) <= self.idle_timeout:
+                    continue
+                # Lock diambil di sini agar request yang baru masuk tidak memakai koneksi yang ditutup
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                del self._connections[entry.id]
+                expired.append(entry)
+            self.reaped += len(expired)
+        for entry in expired:
+            logger.info(f"Koneksi {entry.id} idle {entry.idle_seconds(now):.0f} detik, ditutup")
+            self._close_entry(entry, locked=True)
+        return len(expired)
+
+    def _run_reaper(self):
+        while not self._stop_event.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Error di reaper koneksi: {str(e)}")
+
+    def _start_reaper(self):
+        """Jalankan thread reaper (daemon) saat koneksi pertama dibuka"""
+        if self.idle_timeout is None:
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._stop_event.clear()
+            self._reaper = threading.Thread(target=self._run_reaper, name='mysql-ssh-reaper', daemon=True)
+            self._reaper.start()
+
+    def stats(self):
+        """
+        Status koneksi terkelola
+
+        Returns:
+            dict: Jumlah koneksi dan batasnya, jumlah tunnel, koneksi per
+                pemilik, RSS proses (byte) dan detail per koneksi
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._connections.values())
+            tunnels = len(self._tunnel_keys())
+            opening = len(self._opening)
+        owners = {}
+        for entry in entries:
+            owners[entry.owner] = owners.get(entry.owner, 0) + 1
+        return {
+            'connections': len(entries),
+            'opening': opening,
+            'max_connections': self.max_connections,
+            'tunnels': tunnels,
+            'max_tunnels': self.max_tunnels or self.max_connections,
+            # Termasuk tunnel milik pool/koneksi lain di proses yang sama
+            'process_tunnels': sum(1 for tunnel in get_tunnel_manager().stats() if tunnel['active']),
+            'owners': len(owners),
+            'busy': sum(1 for entry in entries if entry.busy),
+            'reaped': self.reaped,
+            'process_rss': _process_rss(),
+            'details': [
+                {
+                    'id': entry.id,
+                    'ssh_host': entry.ssh_config['host'],
+                    'mysql_host': entry.mysql_config['host'],
+                    'database': entry.mysql_config['database'],
+                    'created_at': entry.created_at.isoformat(),
+                    'idle_seconds': round(entry.idle_seconds(now), 1),
+                    'busy': entry.busy,
+                }
+                for entry in entries
+            ],
+        }
+
+    def close_all(self):
+        """Tutup semua koneksi dan hentikan reaper (mis. saat shutdown)"""
+        self._stop_event.set()
+        with self._lock:
+            entries = list(self._connections.values())
+            self._connections.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
@@ -0,0 +1,392 @@
+"""
+Connection pool MySQL melalui satu SSH tunnel bersama
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .mysql_ssh_connection import _validate_configs, _connect_mysql, _execute, _stream_query
+from .result_formats import validate_result_format
+from .statements import statement_type
+from .query_timeout import RunningQueries, add_max_execution_time, is_interrupted_error, MAX_EXECUTION_TIME_ERROR
+from . import metrics
+from .tunnel_manager import acquire_tunnel, release_tunnel, watch_tunnel, unwatch_tunnel
+
+logger = logging.getLogger(__name__)
+
+class _PooledConnection:
+    """Pembungkus koneksi pymysql beserta metadata umur dan waktu pemakaian"""
+
+    __slots__ = ('connection', 'created_at', 'last_used', 'generation')
+
+    def __init__(self, connection, generation=0):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Generasi tunnel saat koneksi dibuat; berubah jika tunnel dibangun ulang
+        self.generation = generation
+
+    def is_expired(self, now, idle_timeout, max_lifetime):
+        """Cek apakah koneksi sudah melewati idle timeout atau max lifetime"""
+        if max_lifetime is not None and now - self.created_at > max_lifetime:
+            return True
+        if idle_timeout is not None and now - self.last_used > idle_timeout:
+            return True
+        return False
+
+class MySQLSSHConnectionPool:
+    def __init__(self, ssh_config, mysql_config, min_size=1, max_size=10,
+                 checkout_timeout=30, idle_timeout=300, max_lifetime=3600, share_tunnel=True,
+                 health_check_interval=None):
+        """
+        Inisialisasi pool koneksi MySQL yang berbagi satu SSH tunnel
+
+        Args:
+            ssh_config (dict): Konfigurasi SSH server
+            mysql_config (dict): Konfigurasi MySQL database
+            min_size (int): Jumlah koneksi minimum yang dijaga tetap terbuka
+            max_size (int): Jumlah koneksi maksimum (idle + sedang dipakai)
+            checkout_timeout (float): Detik menunggu koneksi bebas sebelum TimeoutError
+            idle_timeout (float): Detik koneksi idle sebelum ditutup (None = tidak pernah)
+            max_lifetime (float): Umur maksimum koneksi dalam detik (None = tidak dibatasi)
+            share_tunnel (bool): Pakai ulang SSH tunnel ke endpoint yang sama
+                lewat registry tunnel bersama
+            health_check_interval (float): Interval (detik) monitor latar yang
+                membangun ulang SSH tunnel jika putus (None = tanpa monitor)
+
+        Raises:
+            TypeError: Jika ssh_config atau mysql_config bukan dict atau None
+            ValueError: Jika konfigurasi tidak lengkap atau ukuran pool tidak valid
+        """
+        _validate_configs(ssh_config, mysql_config)
+
+        if max_size < 1:
+            raise ValueError("max_size minimal 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size harus di antara 0 dan max_size")
+
+        self.ssh_config = ssh_config
+        self.mysql_config = mysql_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.share_tunnel = share_tunnel
+        self.health_check_interval = health_check_interval
+        self.tunnel = None
+        self._monitor = None
+        self._generation = 0
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = True
+        self._cond = threading.Condition()
+        self._running = RunningQueries(self._open_kill_connection)
+
+    def connect(self):
+        """Membuat SSH tunnel bersama dan membuka min_size koneksi MySQL"""
+        try:
+            logger.info("Membuat SSH tunnel untuk connection pool...")
+            self.tunnel = acquire_tunnel(self.ssh_config, self.mysql_config, shared=self.share_tunnel)
+            logger.info(f"SSH tunnel pool berhasil dibuat di port lokal: {self.tunnel.local_bind_port}")
+
+            if self.health_check_interval:
+                self._monitor = watch_tunnel(self.tunnel, self.health_check_interval, shared=self.share_tunnel)
+                self._monitor.add_listener(self._on_tunnel_restarted)
+
+            with self._cond:
+                self._closed = False
+
+            for _ in range(self.min_size):
+                pooled = self._open_connection()
+                with self._cond:
+                    self._size += 1
+                    self._idle.append(pooled)
+
+            logger.info(f"Connection pool siap dengan {self.min_size} koneksi")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saat membuat connection pool: {str(e)}")
+            self.close()
+            return False
+
+    def _open_connection(self):
+        """Membuka satu koneksi MySQL baru melalui tunnel bersama"""
+        generation = self._generation
+        return _PooledConnection(_connect_mysql(self.mysql_config, self.tunnel.local_bind_port), generation)
+
+    def _open_kill_connection(self):
+        """Koneksi di luar hitungan pool untuk KILL QUERY"""
+        if not self.tunnel:
+            return None
+        return _connect_mysql(self.mysql_config, self.tunnel.local_bind_port)
+
+    def _on_tunnel_restarted(self):
+        """Listener monitor: koneksi lama menunjuk port tunnel yang sudah mati"""
+        with self._cond:
+            self._generation += 1
+            stale = list(self._idle)
+            self._idle.clear()
+            self._size -= len(stale)
+            self._cond.notify_all()
+        for pooled in stale:
+            self._close_quietly(pooled)
+        logger.info(f"SSH tunnel dibangun ulang, {len(stale)} koneksi idle pool diganti")
+
+    def _close_quietly(self, pooled):
+        """Menutup koneksi tanpa melempar exception"""
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+
+    def _evict_expired(self, now):
+        """Keluarkan koneksi idle yang kadaluarsa (dipanggil dengan lock dipegang)"""
+        expired = []
+        for pooled in list(self._idle):
+            if (pooled.generation != self._generation
+                    or pooled.is_expired(now, None, self.max_lifetime)):
+                self._idle.remove(pooled)
+                expired.append(pooled)
+            elif (self._size - len(expired) > self.min_size
+                  and pooled.is_expired(now, self.idle_timeout, None)):
+                self._idle.remove(pooled)
+                expired.append(pooled)
+        self._size -= len(expired)
+        return expired
+
+    def acquire(self, timeout=None):
+        """
+        Ambil koneksi dari pool
+
+        Args:
+            timeout (float): Detik menunggu koneksi bebas (default: checkout_timeout)
+
+        Returns:
+            pymysql.connections.Connection: Koneksi yang siap dipakai
+
+        Raises:
+            RuntimeError: Jika pool belum dibuka atau sudah ditutup
+            TimeoutError: Jika tidak ada koneksi bebas dalam batas waktu
+        """
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool belum dibuka atau sudah ditutup")
+
+                expired = self._evict_expired(time.monotonic())
+                pooled = None
+
+                if self._idle:
+                    # LIFO: koneksi yang baru dipakai tetap hangat, sisanya bisa idle-evict
+                    pooled = self._idle.pop()
+                    self._in_use[id(pooled.connection)] = pooled
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f"Tidak ada koneksi bebas dalam {timeout} detik "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            for item in expired:
+                self._close_quietly(item)
+
+            if pooled is not None:
+                return pooled.connection
+
+            # Slot sudah dipesan di atas, buka koneksi baru di luar lock
+            try:
+                pooled = self._open_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._in_use[id(pooled.connection)] = pooled
+            return pooled.connection
+
+    def release(self, connection, discard=False):
+        """
+        Kembalikan koneksi ke pool
+
+        Transaksi yang belum di-commit di-rollback lebih dulu agar tulis,
+        snapshot dan row lock peminjam tidak terbawa ke peminjam berikutnya.
+        Koneksi yang gagal di-rollback ditutup.
+
+        Args:
+            connection: Koneksi yang sebelumnya diambil lewat acquire()
+            discard (bool): Tutup koneksi alih-alih mengembalikannya ke pool
+        """
+        with self._cond:
+            pooled = self._in_use.pop(id(connection), None)
+            if pooled is None:
+                logger.warning("Koneksi yang dikembalikan bukan milik pool ini")
+                return
+            metrics.record_transfer(connection)
+
+        # Round trip rollback di luar lock; slot koneksi tetap terhitung di _size
+        if not discard and connection.open:
+            try:
+                connection.rollback()
+            except Exception as e:
+                logger.warning(f"Rollback saat koneksi dikembalikan gagal, koneksi ditutup: {str(e)}")
+                discard = True
+
+        with self._cond:
+            now = time.monotonic()
+            pooled.last_used = now
+            if (discard or self._closed or not connection.open
+                    or pooled.generation != self._generation
+                    or pooled.is_expired(now, None, self.max_lifetime)):
+                self._size -= 1
+                self._cond.notify()
+            else:
+                self._idle.append(pooled)
+                self._cond.notify()
+                return
+
+        self._close_quietly(pooled)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Context manager untuk meminjam koneksi dari pool
+
+        Transaksi yang belum di-commit di-rollback saat koneksi dikembalikan
+        (commit sendiri di dalam blok untuk menyimpan tulis).
+
+        Args:
+            timeout (float): Detik menunggu koneksi bebas (default: checkout_timeout)
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            # release() me-rollback apa pun yang belum di-commit
+            self.release(conn)
+
+    def execute_query(self, query, params=None, result_format='dict', timeout=None):
+        """
+        Eksekusi query memakai satu koneksi pinjaman dari pool
+
+        Args:
+            query (str): Query SQL
+            params (tuple): Parameter untuk query (optional)
+            result_format (str): 'dict', 'tuple', 'columnar', 'numpy' atau 'pandas'
+            timeout (float): Batas waktu eksekusi di server (detik), lihat
+                MySQLSSHConnection.execute_query
+
+        Returns:
+            list/int: Hasil query atau jumlah baris terpengaruh, None jika gagal
+        """
+        validate_result_format(result_format)
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout harus lebih dari 0")
+        sent_query, kill_timeout = query, timeout
+        if timeout is not None:
+            hinted = add_max_execution_time(query, timeout)
+            if hinted is not None:
+                sent_query, kill_timeout = hinted, None
+        start = time.perf_counter()
+        result = None
+        try:
+            with self.connection() as conn:
+                with self._running.track(conn, kill_timeout):
+                    result = _execute(conn, sent_query, params, result_format)
+                return result
+        except Exception as e:
+            logger.error(f"Error saat eksekusi query di pool: {str(e)}")
+            if is_interrupted_error(e) and e.args[0] == MAX_EXECUTION_TIME_ERROR:
+                metrics.QUERY_CANCELS_TOTAL.inc(reason='timeout')
+            return None
+        finally:
+            metrics.record_query(statement_type(query), time.perf_counter() - start, result)
+
+    def execute_query_stream(self, query, params=None, chunk_size=1000, as_dict=True, chunked=False,
+                             with_header=False):
+        """
+        Streaming hasil query dengan server-side cursor memakai satu koneksi pool
+
+        Koneksi dipinjam selama generator berjalan dan dikembalikan ke pool
+        saat generator selesai atau ditutup lebih awal.
+
+        Yields:
+            dict/tuple: Baris hasil query (atau list baris jika chunked=True)
+        """
+        with self.connection() as conn:
+            yield from _stream_query(conn, query, params, chunk_size, as_dict, chunked, with_header)
+
+    def cancel(self):
+        """
+        Hentikan semua query pool yang sedang berjalan (KILL QUERY)
+
+        Returns:
+            int: Jumlah query yang dihentikan
+        """
+        return self._running.cancel()
+
+    def stats(self):
+        """Statistik pool saat ini"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'max_size': self.max_size,
+            }
+
+    def close(self):
+        """Menutup semua koneksi idle dan SSH tunnel bersama"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for pooled in idle:
+            self._close_quietly(pooled)
+        if idle:
+            logger.info(f"{len(idle)} koneksi pool ditutup")
+
+        if self._monitor is not None:
+            unwatch_tunnel(self._monitor, self._on_tunnel_restarted)
+            self._monitor = None
+
+        if self.tunnel:
+            release_tunnel(self.tunnel, shared=self.share_tunnel)
+            self.tunnel = None
+            logger.info("SSH tunnel pool dilepas")
+
+    def __enter__(self):
+        if not self.connect():
+            raise ConnectionError("Gagal membuat connection pool")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
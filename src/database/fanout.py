@@ -0,0 +1,216 @@
+"""
+Fan-out query paralel ke banyak host MySQL, masing-masing lewat SSH tunnel sendiri
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Handshake SSH, connect MySQL dan query setiap target berjalan paralel
+(dibatasi max_workers) sehingga total waktu mendekati host paling lambat,
+bukan jumlah semuanya. Setiap target punya batas waktu sendiri; target
+yang gagal atau timeout dilaporkan tanpa menggagalkan target lain.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .mysql_ssh_connection import _validate_configs, _connect_mysql, _execute
+from .result_formats import validate_result_format
+from .statements import statement_type
+from .tunnel_manager import acquire_tunnel, release_tunnel
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Interval cek deadline selama masih ada target yang belum mulai (detik)
+_POLL_INTERVAL = 0.05
+
+def _target_name(ssh_config, mysql_config):
+    """Nama default target: host SSH dan database"""
+    return f"{ssh_config['host']}:{ssh_config['port']}/{mysql_config['database']}"
+
+class _Target:
+    __slots__ = ('index', 'name', 'ssh_config', 'mysql_config', 'started', 'abandoned')
+
+    def __init__(self, index, name, ssh_config, mysql_config):
+        self.index = index
+        self.name = name
+        self.ssh_config = ssh_config
+        self.mysql_config = mysql_config
+        # Diisi worker saat target mulai dikerjakan (bukan saat masuk antrean)
+        self.started = None
+        self.abandoned = False
+
+class QueryFanout:
+    def __init__(self, targets, max_workers=10, timeout=30.0, share_tunnel=True):
+        """
+        Inisialisasi fan-out ke sekumpulan target
+
+        Args:
+            targets (list): Tuple (ssh_config, mysql_config) atau
+                (nama, ssh_config, mysql_config) per target
+            max_workers (int): Jumlah target yang dikerjakan bersamaan
+            timeout (float): Batas waktu per target (detik) dihitung sejak target
+                mulai dikerjakan: handshake SSH, connect MySQL dan query
+            share_tunnel (bool): Pakai ulang SSH tunnel untuk target dengan
+                bastion dan tujuan yang sama
+
+        Raises:
+            TypeError: Jika konfigurasi target bukan dict
+            ValueError: Jika targets kosong, konfigurasi tidak lengkap atau
+                max_workers/timeout tidak valid
+        """
+        if not targets:
+            raise ValueError("targets tidak boleh kosong")
+        if max_workers < 1:
+            raise ValueError("max_workers minimal 1")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout harus lebih dari 0")
+
+        self.targets = []
+        for index, target in enumerate(targets):
+            if len(target) == 3:
+                name, ssh_config, mysql_config = target
+            elif len(target) == 2:
+                ssh_config, mysql_config = target
+                name = None
+            else:
+                raise ValueError("Target harus (ssh_config, mysql_config) atau (nama, ssh_config, mysql_config)")
+            _validate_configs(ssh_config, mysql_config)
+            self.targets.append(_Target(index, name or _target_name(ssh_config, mysql_config),
+                                        ssh_config, mysql_config))
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.share_tunnel = share_tunnel
+
+    def _run_target(self, target, query, params, result_format):
+        """Kerjakan satu target di thread worker"""
+        target.started = time.monotonic()
+        if target.abandoned:
+            return None
+        tunnel = connection = None
+        options = {}
+        if self.timeout is not None:
+            # Timeout socket MySQL agar worker yang menunggu host lambat ikut berhenti
+            options = {'connect_timeout': max(1, int(self.timeout)),
+                       'read_timeout': self.timeout, 'write_timeout': self.timeout}
+        try:
+            tunnel = acquire_tunnel(target.ssh_config, target.mysql_config, shared=self.share_tunnel)
+            connection = _connect_mysql(target.mysql_config, tunnel.local_bind_port, **options)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = _execute(connection, query, params, result_format)
+                return result
+            finally:
+                metrics.record_query(statement_type(query), time.perf_counter() - start, result, connection)
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            if tunnel is not None:
+                release_tunnel(tunnel, shared=self.share_tunnel)
+
+    @staticmethod
+    def _outcome(target, result=None, error=None, timed_out=False):
+        elapsed = time.monotonic() - target.started if target.started is not None else 0.0
+        return {
+            'target': target.name,
+            'index': target.index,
+            'success': error is None,
+            'result': result,
+            'error': error,
+            'timed_out': timed_out,
+            'elapsed': elapsed,
+        }
+
+    def iter_execute(self, query, params=None, result_format='dict'):
+        """
+        Jalankan query di semua target, yield hasil per target begitu selesai
+
+        Yields:
+            dict: target, index, success, result, error, timed_out, elapsed
+
+        Raises:
+            ValueError: Jika result_format tidak dikenal
+        """
+        validate_result_format(result_format)
+        # State per pemanggilan agar execute() paralel pada objek yang sama tidak saling timpa
+        targets = [_Target(t.index, t.name, t.ssh_config, t.mysql_config) for t in self.targets]
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets)),
+                                      thread_name_prefix='fanout')
+        futures = {
+            executor.submit(self._run_target, target, query, params, result_format): target
+            for target in targets
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                wait_time = None
+                if self.timeout is not None:
+                    deadlines = [futures[f].started + self.timeout for f in pending
+                                 if futures[f].started is not None]
+                    wait_time = max(0.0, min(deadlines) - now) if deadlines else _POLL_INTERVAL
+                    if len(deadlines) < len(pending):
+                        wait_time = min(wait_time, _POLL_INTERVAL)
+
+                done, _ = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    target = futures[future]
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"Fan-out ke {target.name} gagal: {str(error)}")
+                        yield self._outcome(target, error=str(error))
+                    else:
+                        yield self._outcome(target, result=future.result())
+
+                if self.timeout is None:
+                    continue
+                now = time.monotonic()
+                for future in list(pending):
+                    target = futures[future]
+                    if target.started is not None and now - target.started >= self.timeout:
+                        # Worker tidak bisa dihentikan paksa; hasilnya diabaikan dan
+                        # koneksinya ditutup sendiri saat selesai/timeout socket
+                        pending.discard(future)
+                        target.abandoned = True
+                        logger.error(f"Fan-out ke {target.name} timeout setelah {self.timeout} detik")
+                        yield self._outcome(target, error=f"Timeout setelah {self.timeout} detik",
+                                            timed_out=True)
+        finally:
+            for future in pending:
+                futures[future].abandoned = True
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def execute(self, query, params=None, result_format='dict'):
+        """
+        Jalankan query di semua target dan kumpulkan hasilnya
+
+        Returns:
+            dict: 'results' (per target, urutan sesuai targets), 'succeeded',
+                'failed', 'timed_out' dan 'elapsed' (detik total)
+        """
+        start = time.monotonic()
+        outcomes = sorted(self.iter_execute(query, params, result_format), key=lambda item: item['index'])
+        failed = [item for item in outcomes if not item['success']]
+        if failed:
+            logger.warning(f"Fan-out: {len(failed)} dari {len(outcomes)} target gagal")
+        return {
+            'results': outcomes,
+            'succeeded': len(outcomes) - len(failed),
+            'failed': len(failed),
+            'timed_out': sum(1 for item in failed if item['timed_out']),
+            'elapsed': time.monotonic() - start,
+        }
@@ -0,0 +1,331 @@
+"""
+Metrik latensi dan throughput (counter, histogram) dengan exporter pluggable
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Registry in-process tanpa dependency tambahan. Isinya bisa diambil sebagai
+snapshot dict atau dirender lewat exporter (bawaan: format teks Prometheus
+dan JSON); exporter lain bisa didaftarkan dengan register_exporter.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+
+from .result_formats import row_count
+
+# Batas bucket histogram latensi (detik)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_key(labelnames, labels):
+    """Tuple nilai label sesuai urutan labelnames"""
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Label harus tepat: {', '.join(labelnames) or '(tanpa label)'}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+class Counter:
+    """Counter monoton naik, opsional per kombinasi label"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Tambah counter (amount tidak boleh negatif)"""
+        if amount < 0:
+            raise ValueError("Counter hanya bisa bertambah")
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Nilai counter untuk satu kombinasi label"""
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        """Daftar (label dict, nilai)"""
+        with self._lock:
+            items = list(self._values.items())
+        return [(dict(zip(self.labelnames, key)), value) for key, value in items]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self, size):
+        self.buckets = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+class Histogram:
+    """Histogram dengan bucket tetap (kumulatif saat diekspor), opsional per label"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Catat satu observasi"""
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = _HistogramValue(len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry.buckets[index] += 1
+                    break
+            entry.sum += value
+            entry.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager yang mencatat durasi blok dalam detik"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        """Daftar (label dict, {'buckets': [(batas, kumulatif)], 'sum', 'count'})"""
+        with self._lock:
+            items = [(key, list(entry.buckets), entry.sum, entry.count)
+                     for key, entry in self._values.items()]
+        result = []
+        for key, buckets, total, count in items:
+            cumulative, running = [], 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                running += bucket_count
+                cumulative.append((bound, running))
+            cumulative.append((math.inf, count))
+            result.append((dict(zip(self.labelnames, key)),
+                           {'buckets': cumulative, 'sum': total, 'count': count}))
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in items) + '}'
+
+def _format_number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+def render_prometheus(registry):
+    """Exporter format teks Prometheus (exposition format 0.0.4)"""
+    lines = []
+    for metric in registry.metrics():
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in metric.samples():
+            if metric.kind == 'counter':
+                lines.append(f"{metric.name}{_format_labels(labels)} {_format_number(value)}")
+                continue
+            for bound, count in value['buckets']:
+                lines.append(f"{metric.name}_bucket{_format_labels(labels, {'le': _format_number(bound)})} {count}")
+            lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+            lines.append(f"{metric.name}_count{_format_labels(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+def render_json(registry):
+    """Exporter JSON dari snapshot registry"""
+    return json.dumps(registry.snapshot(), default=str)
+
+class MetricsRegistry:
+    def __init__(self):
+        """Inisialisasi registry kosong dengan exporter bawaan"""
+        self._metrics = {}
+        self._exporters = {'prometheus': render_prometheus, 'json': render_json}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metrik {name} sudah terdaftar dengan tipe/label berbeda")
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        """Ambil atau daftarkan Counter"""
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Ambil atau daftarkan Histogram"""
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def metrics(self):
+        """Semua metrik terurut berdasarkan nama"""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def snapshot(self):
+        """
+        Nilai semua metrik saat ini
+
+        Returns:
+            dict: {nama: {'type', 'help', 'samples': [{'labels', 'value'}]}}
+        """
+        result = {}
+        for metric in self.metrics():
+            result[metric.name] = {
+                'type': metric.kind,
+                'help': metric.help,
+                'samples': [{'labels': labels, 'value': value} for labels, value in metric.samples()],
+            }
+        return result
+
+    def register_exporter(self, name, exporter):
+        """Daftarkan exporter: callable(registry) -> str"""
+        with self._lock:
+            self._exporters[name] = exporter
+
+    def export(self, name='prometheus'):
+        """
+        Render registry dengan exporter terdaftar
+
+        Raises:
+            ValueError: Jika exporter tidak dikenal
+        """
+        with self._lock:
+            exporter = self._exporters.get(name)
+        if exporter is None:
+            raise ValueError(f"Exporter metrik tidak dikenal: {name}")
+        return exporter(self)
+
+    def reset(self):
+        """Nol-kan semua nilai (metrik tetap terdaftar)"""
+        for metric in self.metrics():
+            metric.reset()
+
+_default_registry = MetricsRegistry()
+
+def get_metrics_registry():
+    """Registry metrik default untuk seluruh proses"""
+    return _default_registry
+
+# Metrik bawaan koneksi MySQL via SSH
+TUNNEL_SETUP_SECONDS = _default_registry.histogram(
+    'mysql_ssh_tunnel_setup_seconds', 'Waktu mengambil/membuat SSH tunnel saat connect')
+CONNECT_SECONDS = _default_registry.histogram(
+    'mysql_ssh_connect_seconds', 'Waktu handshake MySQL lewat tunnel')
+CONNECTS_TOTAL = _default_registry.counter(
+    'mysql_ssh_connects_total', 'Jumlah percobaan connect', ('status',))
+QUERY_SECONDS = _default_registry.histogram(
+    'mysql_ssh_query_seconds', 'Latensi eksekusi query termasuk fetch hasil', ('statement',))
+QUERIES_TOTAL = _default_registry.counter(
+    'mysql_ssh_queries_total', 'Jumlah query', ('statement', 'status'))
+ROWS_TOTAL = _default_registry.counter(
+    'mysql_ssh_rows_total', 'Baris yang di-fetch atau terpengaruh', ('kind',))
+BYTES_TOTAL = _default_registry.counter(
+    'mysql_ssh_bytes_total', 'Byte protokol MySQL yang melewati tunnel', ('direction',))
+RETRIES_TOTAL = _default_registry.counter(
+    'mysql_ssh_retries_total', 'Query yang diulang setelah koneksi terputus')
+RECONNECTS_TOTAL = _default_registry.counter(
+    'mysql_ssh_reconnects_total', 'Jumlah reconnect', ('status',))
+RECONNECT_SECONDS = _default_registry.histogram(
+    'mysql_ssh_reconnect_seconds', 'Waktu reconnect (termasuk rebuild tunnel jika perlu)')
+QUERY_CANCELS_TOTAL = _default_registry.counter(
+    'mysql_ssh_query_cancels_total', 'Query yang dihentikan karena timeout atau dibatalkan', ('reason',))
+
+# Label statement dibatasi agar kardinalitas metrik tidak meledak
+_STATEMENT_LABELS = frozenset([
+    'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN',
+    'WITH', 'CREATE', 'ALTER', 'DROP', 'TRUNCATE', 'RENAME', 'CALL', 'SET', 'USE',
+    'BEGIN', 'START', 'COMMIT', 'ROLLBACK', 'LOAD',
+])
+
+def statement_label(statement):
+    """Label statement untuk metrik: keyword yang dikenal atau 'OTHER'"""
+    return statement if statement in _STATEMENT_LABELS else 'OTHER'
+
+class MeteredConnection(pymysql.connections.Connection):
+    """
+    Koneksi pymysql yang menghitung byte protokol yang dibaca/ditulis
+
+    Counter per koneksi berupa int biasa (koneksi hanya dipakai satu thread
+    sekaligus) dan dipindahkan ke registry lewat record_transfer, sehingga
+    tidak ada lock di jalur baca per paket.
+    """
+
+    bytes_received = 0
+    bytes_sent = 0
+
+    def _read_bytes(self, num_bytes):
+        data = super()._read_bytes(num_bytes)
+        self.bytes_received += len(data)
+        return data
+
+    def _write_bytes(self, data):
+        super()._write_bytes(data)
+        self.bytes_sent += len(data)
+
+def record_transfer(connection):
+    """Pindahkan hitungan byte koneksi ke BYTES_TOTAL lalu nol-kan"""
+    received = getattr(connection, 'bytes_received', 0)
+    sent = getattr(connection, 'bytes_sent', 0)
+    if isinstance(received, int) and received:
+        BYTES_TOTAL.inc(received, direction='received')
+        connection.bytes_received = 0
+    if isinstance(sent, int) and sent:
+        BYTES_TOTAL.inc(sent, direction='sent')
+        connection.bytes_sent = 0
+
+def record_query(statement, seconds, result, connection=None):
+    """
+    Catat satu eksekusi query: latensi, status, jumlah baris dan byte
+
+    Args:
+        statement (str): Keyword statement (lihat statement_label)
+        seconds (float): Durasi eksekusi termasuk fetch
+        result: Hasil eksekusi; None berarti gagal, int berarti baris terpengaruh
+        connection: Koneksi yang hitungan bytenya ikut dipindahkan (optional)
+    """
+    statement = statement_label(statement)
+    QUERY_SECONDS.observe(seconds, statement=statement)
+    QUERIES_TOTAL.inc(statement=statement, status='error' if result is None else 'success')
+    if isinstance(result, int):
+        ROWS_TOTAL.inc(max(result, 0), kind='affected')
+    elif result is not None:
+        ROWS_TOTAL.inc(row_count(result), kind='fetched')
+    if connection is not None:
+        record_transfer(connection)
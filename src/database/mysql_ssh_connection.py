@@ -13,171 +13,1040 @@ Copyright (c) 2025 Julian Sukrisna. All rights reserved.
 """
 
 import pymysql
-import sshtunnel
-from sshtunnel import SSHTunnelForwarder
 import logging
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pymysql.constants import CR, CLIENT
+
+from .tunnel_manager import acquire_tunnel, release_tunnel, watch_tunnel, unwatch_tunnel
+from .compression import AdaptiveCompression, COMPRESSION_THRESHOLD, compression_mode
+from .tunnel_monitor import is_tunnel_healthy, restart_tunnel
+from .statements import READ_COMMANDS, is_read_statement, statement_type
+from .query_cache import is_cacheable
+from .result_formats import cursor_class_for, fetch_result, validate_result_format, row_count
+from .sql_script import iter_script_lines, run_script, split_statements
+from .query_timeout import (RunningQueries, add_max_execution_time, is_interrupted_error,
+                            MAX_EXECUTION_TIME_ERROR)
+from . import metrics
 
 # Konfigurasi logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _validate_configs(ssh_config, mysql_config):
+    """
+    Validasi konfigurasi SSH dan MySQL
+    
+    Raises:
+        TypeError: Jika ssh_config atau mysql_config bukan dict atau None
+        ValueError: Jika konfigurasi tidak lengkap
+    """
+    # Validasi input
+    if ssh_config is None or mysql_config is None:
+        raise TypeError("ssh_config dan mysql_config tidak boleh None")
+        
+    if not isinstance(ssh_config, dict) or not isinstance(mysql_config, dict):
+        raise TypeError("ssh_config dan mysql_config harus berupa dictionary")
+        
+    # Validasi field yang wajib ada
+    required_ssh_fields = ['host', 'port', 'username']
+    required_mysql_fields = ['host', 'port', 'username', 'password', 'database']
+    
+    for field in required_ssh_fields:
+        if field not in ssh_config:
+            raise ValueError(f"Field '{field}' wajib ada di ssh_config")
+            
+    for field in required_mysql_fields:
+        if field not in mysql_config:
+            raise ValueError(f"Field '{field}' wajib ada di mysql_config")
+    
+    compression_mode(ssh_config)
+    if mysql_config.get('compression'):
+        raise ValueError("Kompresi protokol MySQL tidak didukung pymysql; "
+                         "pakai ssh_config['compression'] untuk kompresi di SSH tunnel")
+
+def _connect_mysql(mysql_config, local_port, **options):
+    """
+    Membuat koneksi pymysql ke ujung lokal SSH tunnel
+    
+    Args:
+        mysql_config (dict): Konfigurasi MySQL database
+        local_port (int): Port lokal SSH tunnel
+        **options: Override argumen pymysql.connect
+    """
+    params = dict(
+        host='127.0.0.1',
+        port=local_port,
+        user=mysql_config['username'],
+        password=mysql_config['password'],
+        database=mysql_config['database'],
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=False
+    )
+    params.update(options)
+    # Subclass Connection yang menghitung byte protokol untuk metrik
+    return metrics.MeteredConnection(**params)
+
+def _execute(connection, query, params=None, result_format='dict', commit=True):
+    """
+    Eksekusi satu query pada koneksi pymysql
+    
+    Query yang mengembalikan hasil di-fetch semua, query lain di-commit
+    (kecuali commit=False, mis. di dalam transaksi eksplisit).
+    
+    Returns:
+        list/dict/ndarray/DataFrame: Hasil query untuk SELECT/SHOW/DESCRIBE/EXPLAIN
+            sesuai result_format
+        int: Jumlah baris terpengaruh untuk query lainnya
+    """
+    with connection.cursor(cursor_class_for(result_format)) as cursor:
+        cursor.execute(query, params)
+        # Check if query returns results (SELECT, SHOW, DESCRIBE, EXPLAIN, etc.)
+        if is_read_statement(query):
+            return fetch_result(cursor, result_format)
+        if commit:
+            connection.commit()
+        return cursor.rowcount
+
+def _stream_query(connection, query, params=None, chunk_size=1000, as_dict=True, chunked=False,
+                  with_header=False):
+    """
+    Generator baris hasil query memakai server-side cursor (SSCursor/SSDictCursor)
+    
+    Baris dibaca dari server per chunk sehingga memori tetap konstan. Jika
+    konsumen berhenti lebih awal, sisa hasil dibuang (drain) saat cursor
+    ditutup agar koneksi tetap bisa dipakai. Dengan with_header=True, item
+    pertama adalah tuple nama kolom.
+    """
+    cursor_class = pymysql.cursors.SSDictCursor if as_dict else pymysql.cursors.SSCursor
+    cursor = connection.cursor(cursor_class)
+    try:
+        cursor.execute(query, params)
+        if with_header:
+            yield tuple(column[0] for column in cursor.description or ())
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if chunked:
+                yield rows
+            else:
+                yield from rows
+    finally:
+        cursor.close()
+
+# Isolation level yang diterima transaction()
+ISOLATION_LEVELS = frozenset(['READ UNCOMMITTED', 'READ COMMITTED', 'REPEATABLE READ', 'SERIALIZABLE'])
+
+class _CommitBatch:
+    """State mode batched commit: tulis di-commit per size statement atau per max_delay detik"""
+    
+    __slots__ = ('size', 'max_delay', 'pending', 'first_pending', 'commits')
+    
+    def __init__(self, size, max_delay):
+        self.size = size
+        self.max_delay = max_delay
+        self.pending = 0
+        self.first_pending = None
+        self.commits = 0
+    
+    def is_due(self, now):
+        if self.pending >= self.size:
+            return True
+        return self.max_delay is not None and now - self.first_pending >= self.max_delay
+
+# Error code client pymysql yang menandakan koneksi ke server terputus
+_CONNECTION_LOST_ERRORS = (
+    CR.CR_CONNECTION_ERROR,
+    CR.CR_CONN_HOST_ERROR,
+    CR.CR_SERVER_GONE_ERROR,
+    CR.CR_SERVER_LOST,
+    CR.CR_COMMANDS_OUT_OF_SYNC,
+)
+
+def _is_connection_error(error):
+    """Cek apakah exception disebabkan koneksi MySQL yang terputus"""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    if isinstance(error, pymysql.err.OperationalError):
+        return bool(error.args) and error.args[0] in _CONNECTION_LOST_ERRORS
+    return isinstance(error, (ConnectionError, BrokenPipeError))
+
+def _quote_identifier(name):
+    """Quote identifier MySQL dengan backtick (mendukung format db.table)"""
+    return '.'.join('`' + part.replace('`', '``') + '`' for part in name.split('.'))
+
+def _split_table_name(table):
+    """Pisahkan 'db.table' menjadi (schema atau None, table) tanpa backtick"""
+    parts = [part.strip('`') for part in table.split('.')]
+    if len(parts) == 1:
+        return None, parts[0]
+    return parts[-2], parts[-1]
+
+def _primary_key_columns(connection, table):
+    """
+    Kolom primary key tabel beserta tipe datanya, berurutan sesuai index
+    
+    Returns:
+        list: Tuple (nama kolom, DATA_TYPE), kosong jika tabel tanpa primary key
+    """
+    schema, name = _split_table_name(table)
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(
+            "SELECT k.COLUMN_NAME, c.DATA_TYPE "
+            "FROM information_schema.KEY_COLUMN_USAGE k "
+            "JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = k.TABLE_SCHEMA "
+            "AND c.TABLE_NAME = k.TABLE_NAME AND c.COLUMN_NAME = k.COLUMN_NAME "
+            "WHERE k.TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND k.TABLE_NAME = %s "
+            "AND k.CONSTRAINT_NAME = 'PRIMARY' ORDER BY k.ORDINAL_POSITION",
+            (schema, name)
+        )
+        return [(row[0], row[1].lower()) for row in cursor.fetchall()]
+
+def _max_packet_size(connection):
+    """Batas ukuran statement (byte) berdasarkan max_allowed_packet server dan client"""
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("SELECT @@max_allowed_packet")
+        server_limit = int(cursor.fetchone()[0])
+    # Sisakan ruang untuk header packet dan overhead protokol
+    return min(server_limit, connection.max_allowed_packet) - 1024
+
+def _iter_batches(iterable, size):
+    """Pecah iterable (termasuk generator) menjadi list berukuran maksimal size"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
 class MySQLSSHConnection:
-    def __init__(self, ssh_config, mysql_config):
+    def __init__(self, ssh_config, mysql_config, ping_interval=30, query_cache=None,
+                 share_tunnel=True, health_check_interval=None):
         """
         Inisialisasi koneksi MySQL via SSH
         
         Args:
             ssh_config (dict): Konfigurasi SSH server
             mysql_config (dict): Konfigurasi MySQL database
+            ping_interval (float): Ping server hanya jika koneksi idle lebih dari
+                sekian detik (None = tidak pernah ping, andalkan retry)
+            query_cache (QueryCache): Cache hasil query baca (optional, opt-in)
+            share_tunnel (bool): Pakai ulang SSH tunnel ke endpoint yang sama
+                lewat registry tunnel bersama
+            health_check_interval (float): Interval (detik) monitor latar yang
+                membangun ulang SSH tunnel jika putus (None = tanpa monitor)
             
         Raises:
             TypeError: Jika ssh_config atau mysql_config bukan dict atau None
             ValueError: Jika konfigurasi tidak lengkap
         """
-        # Validasi input
-        if ssh_config is None or mysql_config is None:
-            raise TypeError("ssh_config dan mysql_config tidak boleh None")
-            
-        if not isinstance(ssh_config, dict) or not isinstance(mysql_config, dict):
-            raise TypeError("ssh_config dan mysql_config harus berupa dictionary")
-            
-        # Validasi field yang wajib ada
-        required_ssh_fields = ['host', 'port', 'username']
-        required_mysql_fields = ['host', 'port', 'username', 'password', 'database']
-        
-        for field in required_ssh_fields:
-            if field not in ssh_config:
-                raise ValueError(f"Field '{field}' wajib ada di ssh_config")
-                
-        for field in required_mysql_fields:
-            if field not in mysql_config:
-                raise ValueError(f"Field '{field}' wajib ada di mysql_config")
+        _validate_configs(ssh_config, mysql_config)
         
         self.ssh_config = ssh_config
         self.mysql_config = mysql_config
         self.tunnel = None
         self.connection = None
+        self.ping_interval = ping_interval
+        self.query_cache = query_cache
+        self.share_tunnel = share_tunnel
+        self.health_check_interval = health_check_interval
+        self._monitor = None
+        self._tunnel_restarted = False
+        self._max_packet_size = None
+        self._last_activity = 0.0
+        self._before_execute_hooks = []
+        self._after_execute_hooks = []
+        self._transaction_depth = 0
+        self._commit_batch = None
+        self._running = RunningQueries(self.open_side_connection)
+        # Exception yang membuat execute_query terakhir mengembalikan None (None jika berhasil)
+        self.last_error = None
+        # ssh_config['compression']: True/False, atau 'auto' (dinyalakan sesuai ukuran hasil)
+        self._adaptive_compression = None
+        if compression_mode(ssh_config) == 'auto':
+            self._adaptive_compression = AdaptiveCompression(
+                ssh_config.get('compression_threshold', COMPRESSION_THRESHOLD))
+        self.compressed = False
+        self._compression_pending = False
+        # Tunnel lama setelah pindah ke tunnel terkompresi; dilepas saat close()
+        # agar koneksi tambahan (paginasi, export) yang masih memakainya tidak putus
+        self._retired_tunnels = []
         
     def connect(self):
         """Membuat koneksi SSH tunnel dan MySQL"""
         try:
             # Membuat SSH tunnel
             logger.info("Membuat SSH tunnel...")
-            self.tunnel = SSHTunnelForwarder(
-                (self.ssh_config['host'], self.ssh_config['port']),
-                ssh_username=self.ssh_config['username'],
-                ssh_password=self.ssh_config.get('password'),
-                ssh_pkey=self.ssh_config.get('private_key_path'),
-                ssh_private_key_password=self.ssh_config.get('private_key_password'),
-                remote_bind_address=(self.mysql_config['host'], self.mysql_config['port']),
-                local_bind_address=('127.0.0.1', 0)  # 0 untuk auto-assign port
-            )
-            
-            self.tunnel.start()
+            with metrics.TUNNEL_SETUP_SECONDS.time():
+                adaptive = bool(self._adaptive_compression and self._adaptive_compression.enabled)
+                # None: acquire_tunnel mengikuti ssh_config['compression'] (atau ~/.ssh/config)
+                self.tunnel = acquire_tunnel(self.ssh_config, self.mysql_config, shared=self.share_tunnel,
+                                             compression=True if adaptive else None)
+                self.compressed = adaptive or compression_mode(self.ssh_config) is True
+            
             logger.info(f"SSH tunnel berhasil dibuat di port lokal: {self.tunnel.local_bind_port}")
             
+            if self.health_check_interval:
+                self._monitor = watch_tunnel(self.tunnel, self.health_check_interval, shared=self.share_tunnel)
+                self._monitor.add_listener(self._on_tunnel_restarted)
+            
             # Membuat koneksi MySQL
             logger.info("Menghubungkan ke MySQL database...")
-            self.connection = pymysql.connect(
-                host='127.0.0.1',
-                port=self.tunnel.local_bind_port,
-                user=self.mysql_config['username'],
-                password=self.mysql_config['password'],
-                database=self.mysql_config['database'],
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor
-            )
+            with metrics.CONNECT_SECONDS.time():
+                self.connection = _connect_mysql(self.mysql_config, self.tunnel.local_bind_port)
+            self._max_packet_size = None
+            self._last_activity = time.monotonic()
+            metrics.CONNECTS_TOTAL.inc(status='success')
             
             logger.info("Koneksi MySQL berhasil!")
             return True
             
         except Exception as e:
             logger.error(f"Error saat koneksi: {str(e)}")
+            metrics.CONNECTS_TOTAL.inc(status='error')
             self.close()
             return False
     
-    def execute_query(self, query, params=None):
+    def execute_query(self, query, params=None, use_cache=True, result_format='dict', timeout=None):
         """
         Eksekusi query SQL dengan automatic reconnection
         
         Args:
             query (str): Query SQL
             params (tuple): Parameter untuk query (optional)
+            use_cache (bool): Pakai query_cache untuk query baca (jika dipasang)
+            result_format (str): Format hasil baca: 'dict' (default), 'tuple',
+                'columnar' (dict kolom -> list), 'numpy' atau 'pandas'
+            timeout (float): Batas waktu eksekusi di server (detik). SELECT
+                memakai hint MAX_EXECUTION_TIME, statement lain dihentikan
+                dengan KILL QUERY. Query yang dihentikan mengembalikan None
+                (penyebab kegagalan tersimpan di last_error)
             
         Returns:
-            list: Hasil query
+            list: Hasil query (atau format lain sesuai result_format)
+            
+        Raises:
+            ValueError: Jika result_format atau timeout tidak valid
+            ImportError: Jika numpy/pandas untuk result_format belum terpasang
+            pymysql.MySQLError: Error query di dalam transaction() atau
+                batch_commits() dilempar ulang (tanpa retry) agar unit kerja
+                di-rollback oleh context manager
         """
+        validate_result_format(result_format)
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout harus lebih dari 0")
+        self.last_error = None
         if not self.connection:
             logger.error("Tidak ada koneksi aktif")
+            self.last_error = ConnectionError("Tidak ada koneksi aktif")
             return None
         
+        statement = statement_type(query)
+        sent_query, kill_timeout = query, timeout
+        if timeout is not None:
+            # Server menghentikan SELECT sendiri; KILL QUERY hanya untuk sisanya
+            hinted = add_max_execution_time(query, timeout)
+            if hinted is not None:
+                sent_query, kill_timeout = hinted, None
+        in_unit_of_work = self.in_transaction or self._commit_batch is not None
+        # Hasil baca yang bisa melihat tulis belum ter-commit tidak boleh masuk cache;
+        # tulis dan baca non-deterministik tidak dicari di cache (tidak dihitung miss)
+        use_cache = (use_cache and self.query_cache is not None and not in_unit_of_work
+                     and is_read_statement(query) and is_cacheable(query))
+        # Format selain dict disimpan terpisah di cache
+        cache_extra = () if result_format == 'dict' else (result_format,)
+        if use_cache:
+            cached = self.query_cache.get(query, params, *cache_extra)
+            if cached is not None:
+                metrics.QUERIES_TOTAL.inc(statement=metrics.statement_label(statement), status='cache_hit')
+                return cached
+        
+        event = None
+        if self._before_execute_hooks or self._after_execute_hooks:
+            event = {'query': query, 'params': params, 'statement': statement,
+                     'result_format': result_format}
+            self._run_hooks(self._before_execute_hooks, event)
+        
+        start = time.perf_counter()
         # Coba reconnect jika koneksi terputus
         max_retries = 2
         for attempt in range(max_retries):
             try:
-                # Test koneksi dengan ping
-                self.connection.ping(reconnect=True)
+                # Ping hanya jika koneksi sudah lama idle
+                self._ensure_connection()
                 
-                with self.connection.cursor() as cursor:
-                    cursor.execute(query, params)
-                    # Check if query returns results (SELECT, SHOW, DESCRIBE, EXPLAIN, etc.)
-                    query_type = query.strip().upper()
-                    if any(query_type.startswith(cmd) for cmd in ['SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN']):
-                        result = cursor.fetchall()
-                        return result
-                    else:
-                        self.connection.commit()
-                        return cursor.rowcount
+                with self._running.track(self.connection, kill_timeout):
+                    result = _execute(self.connection, sent_query, params, result_format, commit=False)
+                if isinstance(result, int):
+                    self._commit_write()
+                self._last_activity = time.monotonic()
+                self._record_query(statement, start, result)
+                self._update_cache(query, params, result, use_cache, *cache_extra)
+                if event is not None:
+                    self._finish_event(event, start, attempt + 1, result)
+                return result
                         
             except Exception as e:
                 logger.error(f"Error saat eksekusi query (attempt {attempt + 1}): {str(e)}")
+                if is_interrupted_error(e):
+                    logger.warning("Query dihentikan karena melewati batas waktu atau dibatalkan")
+                    if e.args[0] == MAX_EXECUTION_TIME_ERROR:
+                        metrics.QUERY_CANCELS_TOTAL.inc(reason='timeout')
+                
+                if in_unit_of_work:
+                    # Reconnect akan membuang tulis yang belum di-commit secara diam-diam
+                    self._record_query(statement, start, None)
+                    if event is not None:
+                        self._finish_event(event, start, attempt + 1, None, e)
+                    raise
                 
                 # Jika koneksi terputus, coba reconnect
-                if attempt < max_retries - 1:
+                if attempt < max_retries - 1 and _is_connection_error(e):
                     logger.info("Mencoba reconnect...")
+                    metrics.RETRIES_TOTAL.inc()
                     if self._reconnect():
                         continue
                 
                 # Jika semua attempt gagal
+                self.last_error = e
+                self._record_query(statement, start, None)
                 if self.connection:
                     try:
                         self.connection.rollback()
                     except:
                         pass
+                if event is not None:
+                    self._finish_event(event, start, attempt + 1, None, e)
                 return None
     
+    def cancel(self):
+        """
+        Hentikan query yang sedang berjalan lewat KILL QUERY di koneksi tambahan
+        
+        Aman dipanggil dari thread lain selama execute_query (atau query
+        paginasi yang didaftarkan lewat track_query) masih menunggu hasil.
+        
+        Returns:
+            int: Jumlah query yang dihentikan
+        """
+        return self._running.cancel()
+    
+    def track_query(self, connection, timeout=None):
+        """
+        Context manager: daftarkan query di koneksi (mis. koneksi tambahan)
+        agar ikut dihentikan oleh cancel() atau KILL QUERY setelah timeout detik
+        """
+        return self._running.track(connection, timeout)
+    
+    def add_execute_hook(self, before=None, after=None):
+        """
+        Daftarkan hook di sekitar eksekusi execute_query (hasil dari cache tidak memicu hook)
+        
+        Kedua hook dipanggil sebagai hook(mysql_ssh, event). Event berisi
+        query, params, statement dan result_format; sebelum after hook
+        dipanggil event dilengkapi duration (detik), rows (baris hasil atau
+        baris terpengaruh), attempts dan error (None jika berhasil).
+        Exception dari hook dicatat di log dan tidak menggagalkan query.
+        
+        Args:
+            before (callable): Dipanggil sebelum query dikirim (optional)
+            after (callable): Dipanggil setelah query selesai atau gagal (optional)
+        """
+        if before is not None:
+            self._before_execute_hooks.append(before)
+        if after is not None:
+            self._after_execute_hooks.append(after)
+    
+    def remove_execute_hook(self, before=None, after=None):
+        """Lepas hook yang sebelumnya didaftarkan dengan add_execute_hook"""
+        for hooks, hook in ((self._before_execute_hooks, before), (self._after_execute_hooks, after)):
+            if hook is not None and hook in hooks:
+                hooks.remove(hook)
+    
+    def _run_hooks(self, hooks, event):
+        """Panggil hook satu per satu; error hook hanya dicatat"""
+        for hook in list(hooks):
+            try:
+                hook(self, event)
+            except Exception as e:
+                logger.error(f"Error pada execute hook: {str(e)}")
+    
+    def _finish_event(self, event, start, attempts, result, error=None):
+        """Lengkapi event dengan hasil eksekusi lalu jalankan after hook"""
+        event['duration'] = time.perf_counter() - start
+        event['attempts'] = attempts
+        event['error'] = str(error) if error is not None else None
+        if result is None:
+            event['rows'] = None
+        else:
+            event['rows'] = result if isinstance(result, int) else row_count(result)
+        self._run_hooks(self._after_execute_hooks, event)
+    
+    def _record_query(self, statement, start, result):
+        """Catat eksekusi yang dimulai pada start (perf_counter) ke metrik"""
+        if result is not None:
+            self._observe_transfer()
+        metrics.record_query(statement, time.perf_counter() - start, result, self.connection)
+    
+    def _observe_transfer(self):
+        """
+        Mode kompresi 'auto': ukur byte yang diterima sejak hitungan terakhir
+        
+        Dipanggil sebelum hitungan byte koneksi dipindahkan ke metrik. Jika
+        rata-rata hasil melewati ambang, koneksi pindah ke tunnel terkompresi
+        sebelum query berikutnya (lihat _ensure_connection).
+        """
+        received = getattr(self.connection, 'bytes_received', 0)
+        if self._adaptive_compression is None or not isinstance(received, int):
+            return
+        if self._adaptive_compression.observe(received):
+            logger.info(f"Rata-rata hasil {self._adaptive_compression.average:.0f} byte per query, "
+                        f"kompresi SSH dinyalakan")
+            self._compression_pending = True
+    
+    def _update_cache(self, query, params, result, use_cache=True, *extra):
+        """Simpan hasil baca ke cache atau invalidasi entry yang terpengaruh tulis"""
+        if self.query_cache is None:
+            return
+        if not isinstance(result, int):
+            if use_cache:
+                self.query_cache.set(query, params, result, *extra)
+        else:
+            self.query_cache.invalidate_for_write(query)
+    
+    @property
+    def in_transaction(self):
+        """True jika sedang di dalam transaction()"""
+        return self._transaction_depth > 0
+    
+    @contextmanager
+    def transaction(self, isolation_level=None, read_only=False):
+        """
+        Context manager transaksi eksplisit
+        
+        Semua query di dalam blok berjalan dalam satu transaksi yang di-commit
+        saat blok selesai dan di-rollback jika ada exception (exception
+        dilempar ulang). Error query di dalam blok dilempar, bukan dikembalikan
+        sebagai None. Blok bersarang memakai SAVEPOINT: exception di blok
+        dalam hanya membatalkan perubahan blok itu.
+        
+        Args:
+            isolation_level (str): 'READ UNCOMMITTED', 'READ COMMITTED',
+                'REPEATABLE READ' atau 'SERIALIZABLE' (default: setting sesi)
+            read_only (bool): START TRANSACTION READ ONLY
+            
+        Yields:
+            MySQLSSHConnection: Koneksi ini
+            
+        Raises:
+            ValueError: Jika isolation_level tidak dikenal atau diberikan untuk blok bersarang
+            RuntimeError: Jika tidak ada koneksi aktif
+        """
+        if isolation_level is not None:
+            isolation_level = isolation_level.upper().replace('_', ' ')
+            if isolation_level not in ISOLATION_LEVELS:
+                raise ValueError(f"Isolation level tidak dikenal: {isolation_level}")
+        if not self.connection:
+            raise RuntimeError("Tidak ada koneksi aktif")
+        
+        if self.in_transaction:
+            if isolation_level is not None or read_only:
+                raise ValueError("isolation_level/read_only hanya untuk transaksi terluar")
+            yield from self._savepoint()
+            return
+        
+        if self._commit_batch is not None:
+            # START TRANSACTION meng-commit implisit; lakukan eksplisit agar tercatat
+            self._flush_batch()
+        
+        self._ensure_connection()
+        with self.connection.cursor() as cursor:
+            if isolation_level is not None:
+                cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation_level}")
+            cursor.execute("START TRANSACTION READ ONLY" if read_only else "START TRANSACTION")
+        self._transaction_depth = 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth = 0
+            self._rollback_quietly()
+            raise
+        self._transaction_depth = 0
+        try:
+            self.connection.commit()
+        except Exception:
+            self._rollback_quietly()
+            raise
+        finally:
+            self._last_activity = time.monotonic()
+    
+    def _savepoint(self):
+        """Generator body untuk transaction() bersarang"""
+        name = f"sp_{self._transaction_depth}"
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SAVEPOINT {name}")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        self._transaction_depth -= 1
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"RELEASE SAVEPOINT {name}")
+    
+    @contextmanager
+    def batch_commits(self, size=100, max_delay=None):
+        """
+        Mode batched commit: tulis lewat execute_query di-commit per kelompok
+        
+        Alih-alih satu commit (fsync di server + round trip tunnel) per tulis,
+        commit dikirim setiap size statement tulis atau jika tulis tertua yang
+        belum di-commit sudah lebih dari max_delay detik. Sisa batch di-commit
+        saat blok selesai. Jika terjadi exception, hanya tulis sejak commit
+        terakhir yang di-rollback dan exception dilempar ulang.
+        
+        Args:
+            size (int): Jumlah statement tulis per commit
+            max_delay (float): Batas umur (detik) tulis yang belum di-commit (optional)
+            
+        Yields:
+            MySQLSSHConnection: Koneksi ini
+            
+        Raises:
+            ValueError: Jika size kurang dari 1
+            RuntimeError: Jika dipanggil di dalam transaction() atau batch_commits() lain
+        """
+        if size < 1:
+            raise ValueError("size minimal 1")
+        if self.in_transaction or self._commit_batch is not None:
+            raise RuntimeError("batch_commits tidak bisa di dalam transaksi atau batch lain")
+        if not self.connection:
+            raise RuntimeError("Tidak ada koneksi aktif")
+        
+        self._commit_batch = _CommitBatch(size, max_delay)
+        try:
+            yield self
+        except BaseException:
+            batch, self._commit_batch = self._commit_batch, None
+            logger.error(f"Batch commit dibatalkan, {batch.pending} tulis belum ter-commit di-rollback")
+            self._rollback_quietly()
+            raise
+        try:
+            self._flush_batch()
+        finally:
+            self._commit_batch = None
+    
+    def _commit_write(self):
+        """Commit setelah tulis: ditunda di dalam transaksi, dikelompokkan di mode batch"""
+        if self.in_transaction:
+            return
+        if self._commit_batch is not None:
+            self._count_batched_write()
+            return
+        self.connection.commit()
+    
+    def _count_batched_write(self):
+        """Catat satu tulis di batch dan commit jika batch sudah penuh/kedaluwarsa"""
+        batch = self._commit_batch
+        now = time.monotonic()
+        if batch.pending == 0:
+            batch.first_pending = now
+        batch.pending += 1
+        if batch.is_due(now):
+            self._flush_batch()
+    
+    def _flush_batch(self):
+        """Commit tulis yang tertunda di batch"""
+        batch = self._commit_batch
+        if batch is None or batch.pending == 0:
+            return
+        self.connection.commit()
+        batch.commits += 1
+        batch.pending = 0
+        batch.first_pending = None
+    
+    def _rollback_quietly(self):
+        if self.connection:
+            try:
+                self.connection.rollback()
+            except Exception as e:
+                logger.warning(f"Rollback gagal: {str(e)}")
+    
+    def _on_tunnel_restarted(self):
+        """Listener monitor: tandai koneksi agar di-reconnect sebelum query berikutnya"""
+        self._tunnel_restarted = True
+    
+    def _ensure_connection(self):
+        """
+        Pastikan koneksi hidup tanpa round trip di setiap query
+        
+        Ping (dengan reconnect) hanya dikirim jika koneksi idle lebih lama dari
+        ping_interval. Koneksi yang putus di luar itu ditangani lewat retry
+        dan _reconnect di execute_query.
+        """
+        if self._tunnel_restarted and not (self.in_transaction or self._commit_batch is not None):
+            # Tunnel dibangun ulang oleh monitor: koneksi lama menunjuk port mati
+            self._tunnel_restarted = False
+            self._reconnect()
+            return
+        if self._compression_pending and not (self.in_transaction or self._commit_batch is not None):
+            # Pindah tunnel di antara query, tidak di tengah unit kerja yang belum di-commit
+            self._compression_pending = False
+            if self._use_compressed_tunnel():
+                return
+        if self.ping_interval is None:
+            return
+        if time.monotonic() - self._last_activity >= self.ping_interval:
+            # Di dalam transaksi/batch reconnect diam-diam membuang tulis yang belum di-commit
+            self.connection.ping(reconnect=not (self.in_transaction or self._commit_batch is not None))
+            self._last_activity = time.monotonic()
+    
+    def _get_max_packet_size(self):
+        """Batas ukuran statement (byte) berdasarkan max_allowed_packet server dan client"""
+        if self._max_packet_size is None:
+            self._max_packet_size = _max_packet_size(self.connection)
+        return self._max_packet_size
+    
+    def execute_many(self, query, params_seq, batch_size=1000):
+        """
+        Eksekusi satu query untuk banyak set parameter (cursor.executemany)
+        
+        Untuk INSERT ... VALUES, pymysql menggabungkan baris menjadi
+        multi-row INSERT. Commit dilakukan sekali per batch.
+        
+        Args:
+            query (str): Query SQL dengan placeholder %s
+            params_seq (iterable): Deretan tuple parameter (boleh generator)
+            batch_size (int): Jumlah set parameter per commit
+            
+        Returns:
+            int: Jumlah baris yang terpengaruh, atau None jika gagal
+        """
+        if not self.connection:
+            logger.error("Tidak ada koneksi aktif")
+            return None
+        
+        statement = statement_type(query)
+        start = time.perf_counter()
+        total = 0
+        try:
+            self._ensure_connection()
+            max_stmt_length = self._get_max_packet_size()
+            for batch in _iter_batches(params_seq, batch_size):
+                with self.connection.cursor() as cursor:
+                    cursor.max_stmt_length = max_stmt_length
+                    cursor.executemany(query, batch)
+                    total += cursor.rowcount
+                self._commit_write()
+            self._last_activity = time.monotonic()
+            self._record_query(statement, start, total)
+            self._update_cache(query, None, total)
+            return total
+            
+        except Exception as e:
+            logger.error(f"Error saat execute_many (baris ter-commit: {total}): {str(e)}")
+            self._record_query(statement, start, None)
+            self._update_cache(query, None, total)
+            if self.in_transaction or self._commit_batch is not None:
+                raise
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            return None
+    
+    def bulk_insert(self, table, columns, rows, batch_size=None):
+        """
+        Insert banyak baris dengan multi-row INSERT yang ukurannya
+        disesuaikan dengan max_allowed_packet server
+        
+        Args:
+            table (str): Nama tabel (boleh format db.table)
+            columns (list): Nama kolom
+            rows (iterable): Deretan tuple nilai sesuai urutan columns (boleh generator)
+            batch_size (int): Batas jumlah baris per INSERT (optional)
+            
+        Returns:
+            int: Jumlah baris yang ditulis, atau None jika gagal
+        """
+        if not self.connection:
+            logger.error("Tidak ada koneksi aktif")
+            return None
+        if not columns:
+            raise ValueError("columns tidak boleh kosong")
+        
+        prefix = "INSERT INTO {} ({}) VALUES ".format(
+            _quote_identifier(table),
+            ', '.join(_quote_identifier(column) for column in columns)
+        )
+        row_template = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        start = time.perf_counter()
+        total = 0
+        
+        try:
+            self._ensure_connection()
+            max_size = self._get_max_packet_size()
+            prefix_size = len(prefix.encode('utf8'))
+            
+            with self.connection.cursor() as cursor:
+                values, size = [], prefix_size
+                
+                def flush():
+                    cursor.execute(prefix + ','.join(values))
+                    self._commit_write()
+                    return cursor.rowcount
+                
+                for row in rows:
+                    value = cursor.mogrify(row_template, tuple(row))
+                    value_size = len(value.encode('utf8')) + 1
+                    if values and (size + value_size > max_size
+                                   or (batch_size and len(values) >= batch_size)):
+                        total += flush()
+                        values, size = [], prefix_size
+                    values.append(value)
+                    size += value_size
+                
+                if values:
+                    total += flush()
+            
+            self._last_activity = time.monotonic()
+            self._record_query('INSERT', start, total)
+            if self.query_cache is not None:
+                self.query_cache.invalidate_tables([table.split('.')[-1].strip('`')])
+            logger.info(f"Bulk insert {total} baris ke {table}")
+            return total
+            
+        except Exception as e:
+            logger.error(f"Error saat bulk insert ke {table} (baris ter-commit: {total}): {str(e)}")
+            self._record_query('INSERT', start, None)
+            if self.query_cache is not None:
+                self.query_cache.invalidate_tables([table.split('.')[-1].strip('`')])
+            if self.in_transaction or self._commit_batch is not None:
+                raise
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            return None
+    
+    def execute_script(self, script, max_statements=500, stop_on_error=True):
+        """
+        Eksekusi script SQL (migrasi, seed, dump) dengan sedikit round trip
+        
+        Statement dikirim berkelompok lewat koneksi tambahan dengan
+        CLIENT.MULTI_STATEMENTS (koneksi utama tidak menerima multi-statement
+        agar query berparameter tetap aman) dan autocommit per statement
+        seperti client mysql. File dibaca per baris, tidak dimuat sekaligus.
+        
+        Args:
+            script: Teks SQL, path file .sql atau objek file teks
+            max_statements (int): Jumlah statement maksimal per round trip
+            stop_on_error (bool): False untuk lanjut ke statement berikutnya
+                setelah statement yang gagal
+            
+        Returns:
+            dict: 'statements' (index, query, statement, rows, seconds, error
+                per statement), 'executed', 'failed', 'rows' dan 'elapsed',
+                atau None jika koneksi gagal
+            
+        Raises:
+            ValueError: Jika max_statements kurang dari 1
+            RuntimeError: Jika dipanggil di dalam transaction() atau batch_commits()
+        """
+        if max_statements < 1:
+            raise ValueError("max_statements minimal 1")
+        if self.in_transaction or self._commit_batch is not None:
+            raise RuntimeError("execute_script tidak bisa dipakai di dalam transaction() atau batch_commits()")
+        
+        connection = self.open_side_connection(client_flag=CLIENT.MULTI_STATEMENTS, autocommit=True,
+                                               cursorclass=pymysql.cursors.Cursor)
+        if connection is None:
+            return None
+        
+        start = time.perf_counter()
+        outcomes = []
+        try:
+            statements = split_statements(iter_script_lines(script))
+            for outcome in run_script(connection, statements, _max_packet_size(connection),
+                                      max_statements, stop_on_error):
+                outcomes.append(outcome)
+                if outcome['error'] is not None:
+                    logger.error(f"Statement #{outcome['index'] + 1} gagal: {outcome['error']}")
+                elif self.query_cache is not None and outcome['statement'] not in READ_COMMANDS:
+                    self.query_cache.invalidate_for_write(outcome['query'])
+        except Exception as e:
+            logger.error(f"Error saat eksekusi script: {str(e)}")
+            return None
+        finally:
+            metrics.record_transfer(connection)
+            try:
+                connection.close()
+            except Exception:
+                pass
+        
+        failed = sum(1 for outcome in outcomes if outcome['error'] is not None)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Script selesai: {len(outcomes) - failed} statement berhasil, "
+                    f"{failed} gagal dalam {elapsed:.2f} detik")
+        return {
+            'statements': outcomes,
+            'executed': len(outcomes) - failed,
+            'failed': failed,
+            'rows': sum(outcome['rows'] or 0 for outcome in outcomes),
+            'elapsed': elapsed,
+        }
+    
+    def execute_query_stream(self, query, params=None, chunk_size=1000, as_dict=True, chunked=False,
+                             with_header=False):
+        """
+        Eksekusi query SELECT secara streaming (server-side cursor)
+        
+        Cocok untuk hasil besar: baris tidak dimuat sekaligus ke memori.
+        Koneksi tidak boleh dipakai query lain sampai generator selesai
+        atau ditutup.
+        
+        Args:
+            query (str): Query SQL
+            params (tuple): Parameter untuk query (optional)
+            chunk_size (int): Jumlah baris per fetch dari server
+            as_dict (bool): True untuk baris dict, False untuk tuple
+            chunked (bool): True untuk yield list baris per chunk
+            with_header (bool): True untuk yield tuple nama kolom lebih dulu
+            
+        Yields:
+            dict/tuple: Baris hasil query (atau list baris jika chunked=True)
+        """
+        if not self.connection:
+            logger.error("Tidak ada koneksi aktif")
+            return
+        
+        self._ensure_connection()
+        try:
+            yield from _stream_query(self.connection, query, params, chunk_size, as_dict, chunked,
+                                     with_header)
+        except Exception as e:
+            logger.error(f"Error saat streaming query: {str(e)}")
+            raise
+        finally:
+            self._last_activity = time.monotonic()
+            self._observe_transfer()
+            metrics.record_transfer(self.connection)
+    
+    def open_side_connection(self, **options):
+        """
+        Koneksi pymysql tambahan lewat SSH tunnel yang sama
+        
+        Dipakai untuk pekerjaan yang tidak boleh mengganggu koneksi utama,
+        mis. server-side cursor yang ditahan lama. Pemanggil wajib menutupnya.
+        
+        Args:
+            **options: Override argumen pymysql.connect
+            
+        Returns:
+            pymysql.connections.Connection: Koneksi baru, None jika gagal
+        """
+        if not self.tunnel:
+            logger.error("Tidak ada SSH tunnel aktif")
+            return None
+        try:
+            return _connect_mysql(self.mysql_config, self.tunnel.local_bind_port, **options)
+        except Exception as e:
+            logger.error(f"Gagal membuka koneksi tambahan: {str(e)}")
+            return None
+    
     def _reconnect(self):
         """Helper method untuk reconnect"""
+        start = time.perf_counter()
         try:
             if self.connection:
-                self.connection.close()
+                metrics.record_transfer(self.connection)
+                try:
+                    self.connection.close()
+                except Exception:
+                    pass
+            
+            # SSH tunnel ikut dibangun ulang jika sesi SSH sudah putus
+            if not is_tunnel_healthy(self.tunnel):
+                restart_tunnel(self.tunnel)
             
             # Reconnect ke MySQL
-            self.connection = pymysql.connect(
-                host='127.0.0.1',
-                port=self.tunnel.local_bind_port,
-                user=self.mysql_config['username'],
-                password=self.mysql_config['password'],
-                database=self.mysql_config['database'],
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor,
-                autocommit=False
-            )
+            self.connection = _connect_mysql(self.mysql_config, self.tunnel.local_bind_port)
+            self._last_activity = time.monotonic()
+            metrics.RECONNECT_SECONDS.observe(time.perf_counter() - start)
+            metrics.RECONNECTS_TOTAL.inc(status='success')
             logger.info("Reconnect berhasil!")
             return True
         except Exception as e:
             logger.error(f"Reconnect gagal: {str(e)}")
+            metrics.RECONNECTS_TOTAL.inc(status='error')
             return False
     
+    def _use_compressed_tunnel(self):
+        """
+        Pindahkan koneksi utama ke SSH tunnel terkompresi (mode kompresi 'auto')
+        
+        Seperti reconnect, koneksi MySQL baru adalah sesi baru: variabel sesi
+        dan temporary table tidak ikut pindah. Jika gagal, koneksi lama tetap
+        dipakai tanpa kompresi.
+        
+        Returns:
+            bool: True jika koneksi sudah memakai tunnel terkompresi
+        """
+        try:
+            tunnel = acquire_tunnel(self.ssh_config, self.mysql_config, shared=self.share_tunnel,
+                                    compression=True)
+        except Exception as e:
+            logger.error(f"Gagal membuat SSH tunnel terkompresi: {str(e)}")
+            return False
+        try:
+            connection = _connect_mysql(self.mysql_config, tunnel.local_bind_port)
+        except Exception as e:
+            logger.error(f"Gagal connect lewat SSH tunnel terkompresi: {str(e)}")
+            release_tunnel(tunnel, shared=self.share_tunnel)
+            return False
+        
+        if self._monitor is not None:
+            unwatch_tunnel(self._monitor, self._on_tunnel_restarted)
+            self._monitor = watch_tunnel(tunnel, self.health_check_interval, shared=self.share_tunnel)
+            self._monitor.add_listener(self._on_tunnel_restarted)
+        
+        old_connection = self.connection
+        self._retired_tunnels.append(self.tunnel)
+        self.connection, self.tunnel, self.compressed = connection, tunnel, True
+        self._last_activity = time.monotonic()
+        if old_connection:
+            metrics.record_transfer(old_connection)
+            try:
+                old_connection.close()
+            except Exception:
+                pass
+        logger.info(f"Koneksi pindah ke SSH tunnel terkompresi di port lokal: {tunnel.local_bind_port}")
+        return True
+    
     def close(self):
         """Menutup koneksi MySQL dan SSH tunnel"""
         if self.connection:
+            metrics.record_transfer(self.connection)
             self.connection.close()
             logger.info("Koneksi MySQL ditutup")
             
-        if self.tunnel and self.tunnel.is_active:
-            self.tunnel.stop()
-            logger.info("SSH tunnel ditutup")
+        if self._monitor is not None:
+            unwatch_tunnel(self._monitor, self._on_tunnel_restarted)
+            self._monitor = None
+            
+        if self.tunnel:
+            release_tunnel(self.tunnel, shared=self.share_tunnel)
+            self.tunnel = None
+            logger.info("SSH tunnel dilepas")
+        
+        while self._retired_tunnels:
+            release_tunnel(self._retired_tunnels.pop(), shared=self.share_tunnel)
 
 def main():
     """Contoh penggunaan"""
@@ -0,0 +1,408 @@
+"""
+Paginasi hasil query: keyset pagination atau server-side cursor yang ditahan
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Halaman pertama dikembalikan secepatnya beserta token cursor; halaman
+berikutnya diambil saat diminta. SELECT satu tabel yang diurutkan (atau bisa
+diurutkan) berdasarkan primary key tunggal ditulis ulang menjadi keyset
+query (WHERE key > nilai_terakhir ORDER BY key LIMIT n) sehingga setiap
+halaman murah. Query lain dibaca lewat server-side cursor di koneksi
+tambahan yang ditahan sampai habis, mencapai batas baris, atau kedaluwarsa.
+"""
+
+import logging
+import re
+import threading
+import time
+import uuid
+
+import pymysql
+
+from .mysql_ssh_connection import _primary_key_columns, _quote_identifier
+from .query_cache import _strip_literals
+from .statements import statement_type
+
+logger = logging.getLogger(__name__)
+
+_IDENTIFIER = r"(?:`(?:[^`]|``)+`|[\w$]+)"
+
+# SELECT <kolom> FROM <tabel> [WHERE ...] [ORDER BY <kolom> [ASC|DESC]]
+_KEYSET_RE = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+(?P<table>" + _IDENTIFIER + r"(?:\s*\.\s*" + _IDENTIFIER + r")?)"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>" + _IDENTIFIER + r"(?:\s*\.\s*" + _IDENTIFIER + r")?)"
+    r"(?:\s+(?P<direction>ASC|DESC))?)?"
+    r"\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Konstruksi yang membuat rewrite keyset tidak aman
+_NOT_KEYSET_RE = re.compile(
+    r"\b(?:JOIN|GROUP\s+BY|HAVING|LIMIT|UNION|FOR\s+UPDATE|LOCK\s+IN|INTO|WINDOW|OVER)\b"
+    r"|\(\s*SELECT\b",
+    re.IGNORECASE
+)
+
+_ORDER_BY_RE = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+
+def _bare_name(identifier):
+    """Nama kolom tanpa backtick dan tanpa prefix tabel, lowercase"""
+    return identifier.split('.')[-1].strip().strip('`').lower()
+
+def parse_keyset_query(query):
+    """
+    Bagian query yang dibutuhkan untuk rewrite keyset
+
+    Returns:
+        dict: columns, table, where, order (atau None), descending; None jika
+            query bukan SELECT satu tabel sederhana
+    """
+    stripped = _strip_literals(query)
+    if _NOT_KEYSET_RE.search(stripped):
+        return None
+    match = _KEYSET_RE.match(query)
+    if match is None:
+        return None
+    # WHERE yang lazy ikut menelan ORDER BY multi-kolom/ekspresi (ORDER BY name, id
+    # atau ORDER BY RAND()) yang tidak cocok dengan grup order
+    if match.group('where') and _ORDER_BY_RE.search(_strip_literals(match.group('where'))):
+        return None
+    return {
+        'columns': match.group('columns'),
+        'table': re.sub(r'\s+', '', match.group('table')),
+        'where': match.group('where'),
+        'order': match.group('order'),
+        'descending': (match.group('direction') or '').upper() == 'DESC',
+    }
+
+def _selects_column(columns, key):
+    """Cek apakah daftar kolom SELECT memuat kolom key apa adanya (tanpa alias)"""
+    items = [item.strip() for item in columns.split(',')]
+    return any(item == '*' or _bare_name(item) == key.lower() for item in items)
+
+def _row_value(row, column):
+    """Nilai kolom dari baris dict (nama kolom tidak case-sensitive seperti di MySQL)"""
+    if column in row:
+        return row[column]
+    lowered = column.lower()
+    for name, value in row.items():
+        if name.lower() == lowered:
+            return value
+    raise KeyError(column)
+
+def build_keyset_query(parts, key, params, after=None, limit=100):
+    """
+    Query satu halaman keyset
+
+    Args:
+        parts (dict): Hasil parse_keyset_query
+        key (str): Kolom primary key
+        params (tuple): Parameter query asli (atau None)
+        after: Nilai key baris terakhir halaman sebelumnya (None untuk halaman pertama)
+        limit (int): Jumlah baris yang diambil
+
+    Returns:
+        tuple: (query, params)
+    """
+    columns, table, where = parts['columns'], parts['table'], parts['where']
+    if params is None:
+        # Query tanpa parameter tidak di-escape oleh pymysql; kini parameter ditambahkan
+        columns, table = columns.replace('%', '%%'), table.replace('%', '%%')
+        where = where.replace('%', '%%') if where else where
+    params = list(params or ())
+
+    conditions = [f"({where})"] if where else []
+    quoted_key = _quote_identifier(key)
+    if after is not None:
+        conditions.append(f"{quoted_key} {'<' if parts['descending'] else '>'} %s")
+        params.append(after)
+
+    query = f"SELECT {columns} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {quoted_key} {'DESC' if parts['descending'] else 'ASC'} LIMIT {int(limit)}"
+    return query, tuple(params)
+
+def _copy_session_state(mysql_ssh, connection):
+    """
+    Samakan schema aktif, sql_mode dan time_zone koneksi tambahan dengan koneksi utama
+
+    Koneksi tambahan mulai dari mysql_config['database']; tanpa ini query
+    setelah USE lain di koneksi utama membaca schema yang salah. Variabel
+    sesi lain dan temporary table tidak ikut disalin.
+    """
+    rows = mysql_ssh.execute_query("SELECT DATABASE(), @@SESSION.sql_mode, @@SESSION.time_zone",
+                                   use_cache=False, result_format='tuple')
+    if not rows:
+        raise RuntimeError("Gagal membaca state sesi koneksi utama")
+    database, sql_mode, time_zone = rows[0]
+    if database is not None:
+        connection.select_db(database)
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("SET SESSION sql_mode = %s, time_zone = %s", (sql_mode, time_zone))
+
+class _PageState:
+    """State satu query yang sedang dipaginasi"""
+
+    __slots__ = ('mode', 'owner', 'query', 'params', 'timeout', 'parts', 'key', 'last_key',
+                 'connection', 'cursor', 'pending', 'columns', 'rows_served', 'last_used', 'lock')
+
+    def __init__(self, mode, owner, query, params, timeout=None):
+        self.mode = mode
+        self.owner = owner
+        self.query = query
+        self.params = params
+        # Batas waktu per query halaman (detik)
+        self.timeout = timeout
+        self.parts = None
+        self.key = None
+        self.last_key = None
+        self.connection = None
+        self.cursor = None
+        # Baris lookahead mode cursor yang belum dikembalikan
+        self.pending = []
+        self.columns = []
+        self.rows_served = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def close(self):
+        """
+        Tutup koneksi tambahan (mode cursor)
+
+        Koneksi ditutup langsung tanpa cursor.close(): SSCursor akan membaca
+        habis sisa hasil lewat tunnel sebelum bisa ditutup.
+        """
+        self.cursor = None
+        self.pending = []
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+class QueryPager:
+    def __init__(self, page_size=500, max_rows=10000, ttl=300):
+        """
+        Inisialisasi penyimpan state paginasi
+
+        Args:
+            page_size (int): Jumlah baris per halaman
+            max_rows (int): Batas keras total baris yang dikembalikan per query
+            ttl (float): Detik state idle sebelum cursor ditutup dan token kedaluwarsa
+        """
+        if page_size < 1 or max_rows < 1:
+            raise ValueError("page_size dan max_rows harus lebih dari 0")
+
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _keyset_key(self, mysql_ssh, parts):
+        """Primary key tunggal yang bisa dipakai untuk keyset, None jika tidak ada"""
+        if parts['order'] is not None and '.' in parts['order'].replace('``', ''):
+            order_table = _bare_name(parts['order'].rsplit('.', 1)[0])
+            if order_table != _bare_name(parts['table']):
+                return None
+        try:
+            keys = _primary_key_columns(mysql_ssh.connection, parts['table'])
+        except Exception as e:
+            logger.debug(f"Gagal membaca primary key {parts['table']}: {str(e)}")
+            return None
+        if len(keys) != 1:
+            return None
+        key = keys[0][0]
+        if parts['order'] is not None and _bare_name(parts['order']) != key.lower():
+            return None
+        if not _selects_column(parts['columns'], key):
+            return None
+        return key
+
+    def start(self, mysql_ssh, query, params=None, page_size=None, timeout=None):
+        """
+        Jalankan query dan ambil halaman pertama
+
+        Args:
+            mysql_ssh (MySQLSSHConnection): Koneksi aktif
+            query (str): Query SELECT
+            params (tuple): Parameter query (optional)
+            page_size (int): Override jumlah baris per halaman
+            timeout (float): Batas waktu eksekusi query di server (detik);
+                query bisa dihentikan lewat mysql_ssh.cancel(). Di mode cursor
+                hanya eksekusi awal yang dibatasi (KILL QUERY), bukan lama
+                cursor ditahan antar halaman
+
+        Returns:
+            dict: rows, columns, cursor (token atau None), has_more, truncated,
+                row_count, mode; None jika query gagal
+        """
+        self.expire()
+        page_size = min(page_size or self.page_size, self.max_rows)
+
+        parts = parse_keyset_query(query) if statement_type(query) == 'SELECT' else None
+        key = None
+        if parts is not None and not isinstance(params, dict):
+            key = self._keyset_key(mysql_ssh, parts)
+
+        if key is not None:
+            state = _PageState('keyset', mysql_ssh, query, params, timeout)
+            state.parts, state.key = parts, key
+        else:
+            state = _PageState('cursor', mysql_ssh, query, params, timeout)
+            state.connection = mysql_ssh.open_side_connection(
+                cursorclass=pymysql.cursors.SSDictCursor
+            )
+            if state.connection is None:
+                return None
+            try:
+                _copy_session_state(mysql_ssh, state.connection)
+                state.cursor = state.connection.cursor()
+                # Tanpa hint MAX_EXECUTION_TIME: hint berlaku sampai hasil habis dibaca,
+                # sedangkan cursor ditahan antar halaman. Timeout hanya membatasi execute()
+                with mysql_ssh.track_query(state.connection, timeout):
+                    state.cursor.execute(query, params)
+                state.columns = [column[0] for column in state.cursor.description or ()]
+            except Exception as e:
+                logger.error(f"Error saat menjalankan query paginasi: {str(e)}")
+                state.close()
+                return None
+
+        return self._fetch(state, page_size, token=None)
+
+    def next_page(self, token, page_size=None, owner=None):
+        """
+        Ambil halaman berikutnya
+
+        Args:
+            token (str): Token cursor dari halaman sebelumnya
+            page_size (int): Override jumlah baris per halaman
+            owner (MySQLSSHConnection): Koneksi pemanggil; jika diisi, token
+                milik koneksi lain ditolak
+
+        Returns:
+            dict: Halaman berikutnya, None jika token tidak dikenal/kedaluwarsa,
+                milik koneksi lain, atau query gagal
+        """
+        self.expire()
+        with self._lock:
+            state = self._states.get(token)
+        if state is None:
+            return None
+        if owner is not None and state.owner is not owner:
+            logger.warning("Token paginasi dipakai oleh koneksi lain, ditolak")
+            return None
+        return self._fetch(state, min(page_size or self.page_size, self.max_rows), token)
+
+    def _fetch(self, state, page_size, token):
+        """Ambil satu halaman dan simpan/hapus state sesuai sisa hasil"""
+        with state.lock:
+            limit = min(page_size, self.max_rows - state.rows_served)
+            try:
+                if state.mode == 'keyset':
+                    rows = self._fetch_keyset(state, limit)
+                elif limit > 0:
+                    # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+                    rows = state.pending + state.cursor.fetchmany(limit + 1 - len(state.pending))
+                    state.pending = rows[limit:]
+                else:
+                    rows = []
+            except Exception as e:
+                logger.error(f"Error saat mengambil halaman query: {str(e)}")
+                self.close(token)
+                state.close()
+                return None
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            state.rows_served += len(rows)
+            state.last_used = time.monotonic()
+            truncated = has_more and state.rows_served >= self.max_rows
+            has_more = has_more and not truncated
+            if rows and not state.columns:
+                state.columns = list(rows[0].keys())
+
+        if has_more:
+            if token is None:
+                token = uuid.uuid4().hex
+                with self._lock:
+                    self._states[token] = state
+        else:
+            self.close(token)
+            state.close()
+            token = None
+
+        return {
+            'rows': rows,
+            'columns': state.columns,
+            'cursor': token,
+            'has_more': has_more,
+            'truncated': truncated,
+            'row_count': state.rows_served,
+            'mode': state.mode,
+        }
+
+    def _fetch_keyset(self, state, limit):
+        """Satu halaman keyset: baris setelah key terakhir, plus satu baris ekstra"""
+        if limit <= 0:
+            return []
+        query, params = build_keyset_query(state.parts, state.key, state.params,
+                                           after=state.last_key, limit=limit + 1)
+        rows = state.owner.execute_query(query, params, timeout=state.timeout)
+        if rows is None:
+            raise RuntimeError("Query halaman keyset gagal")
+        page = rows[:limit]
+        if page:
+            state.last_key = _row_value(page[-1], state.key)
+        return rows
+
+    def close(self, token):
+        """Tutup state paginasi (cursor ditahan ikut ditutup)"""
+        if token is None:
+            return False
+        with self._lock:
+            state = self._states.pop(token, None)
+        if state is None:
+            return False
+        state.close()
+        return True
+
+    def close_for(self, mysql_ssh):
+        """Tutup semua state milik satu koneksi (mis. saat disconnect)"""
+        with self._lock:
+            tokens = [token for token, state in self._states.items() if state.owner is mysql_ssh]
+        for token in tokens:
+            self.close(token)
+        return len(tokens)
+
+    def expire(self):
+        """Tutup state yang idle lebih lama dari ttl"""
+        if self.ttl is None:
+            return 0
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            tokens = [token for token, state in self._states.items() if state.last_used < deadline]
+        for token in tokens:
+            logger.info("Cursor paginasi kedaluwarsa, ditutup")
+            self.close(token)
+        return len(tokens)
+
+    def stats(self):
+        """Jumlah query yang sedang dipaginasi per mode"""
+        with self._lock:
+            states = list(self._states.values())
+        return {
+            'open': len(states),
+            'keyset': sum(1 for state in states if state.mode == 'keyset'),
+            'cursor': sum(1 for state in states if state.mode == 'cursor'),
+        }
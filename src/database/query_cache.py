@@ -0,0 +1,276 @@
+"""
+Cache hasil query dengan TTL dan LRU berbasis ukuran byte
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+"""
+
+import re
+import sys
+import threading
+import time
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from .statements import STATEMENT_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# String literal dan identifier ber-quote tidak boleh diubah saat normalisasi
+_QUOTED_RE = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`(?:[^`]|``)*`)""")
+_IDENT = r"(`(?:[^`]|``)+`|[\w$]+)(?:\s*\.\s*(`(?:[^`]|``)+`|[\w$]+))?"
+
+_READ_TABLE_RE = re.compile(r"\b(?:FROM|JOIN)\s+" + _IDENT, re.IGNORECASE)
+_COMMA_TABLE_RE = re.compile(r",\s*" + _IDENT, re.IGNORECASE)
+_FROM_CLAUSE_RE = re.compile(
+    r"\bFROM\s+(.*?)(?=\bWHERE\b|\bGROUP\b|\bORDER\b|\bLIMIT\b|\bHAVING\b|\bJOIN\b"
+    r"|\bUNION\b|\bWINDOW\b|\bFOR\b|\)|$)",
+    re.IGNORECASE | re.DOTALL
+)
+_WRITE_TABLE_RES = [
+    re.compile(r"^\s*(?:INSERT|REPLACE)\s+(?:(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE)\s+)*(?:INTO\s+)?" + _IDENT, re.IGNORECASE),
+    re.compile(r"^\s*UPDATE\s+(?:(?:LOW_PRIORITY|IGNORE)\s+)*" + _IDENT, re.IGNORECASE),
+    re.compile(r"^\s*DELETE\s+(?:(?:LOW_PRIORITY|QUICK|IGNORE)\s+)*FROM\s+" + _IDENT, re.IGNORECASE),
+    re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?" + _IDENT, re.IGNORECASE),
+    re.compile(r"^\s*(?:ALTER|DROP)\s+TABLE\s+(?:IF\s+EXISTS\s+)?" + _IDENT, re.IGNORECASE),
+    re.compile(r"^\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?" + _IDENT, re.IGNORECASE),
+    re.compile(r"\bINTO\s+TABLE\s+" + _IDENT, re.IGNORECASE),
+]
+_DDL_RE = re.compile(r"^\s*(?:CREATE|DROP|ALTER|RENAME|TRUNCATE)\b", re.IGNORECASE)
+_UNCACHEABLE_RE = re.compile(
+    r"\bFOR\s+UPDATE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bFOR\s+SHARE\b|\bSQL_NO_CACHE\b"
+    r"|\b(?:NOW|RAND|UUID|CURRENT_TIMESTAMP|SYSDATE|CONNECTION_ID|LAST_INSERT_ID)\s*\(",
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def normalize_query(query):
+    """
+    Normalisasi SQL untuk cache key: whitespace di luar literal diringkas
+    dan titik koma di akhir dibuang. Isi literal tidak diubah.
+    """
+    parts = _QUOTED_RE.split(query.strip().rstrip(';').strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r'\s+', ' ', parts[i])
+    return ''.join(parts)
+
+def _table_name(match):
+    """Ambil nama tabel (tanpa prefix database, lowercase) dari match _IDENT"""
+    name = match.group(2) or match.group(1)
+    return name.strip('`').replace('``', '`').lower()
+
+def _strip_literals(query):
+    """Ganti literal string dengan placeholder agar tidak salah dibaca sebagai SQL"""
+    return _QUOTED_RE.sub(lambda m: m.group(0) if m.group(0).startswith('`') else "''", query)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def extract_read_tables(query):
+    """Nama tabel yang dibaca oleh query SELECT (FROM, JOIN, daftar koma)"""
+    sql = _strip_literals(query)
+    tables = {_table_name(m) for m in _READ_TABLE_RE.finditer(sql)}
+    for clause in _FROM_CLAUSE_RE.finditer(sql):
+        tables.update(_table_name(m) for m in _COMMA_TABLE_RE.finditer(clause.group(1)))
+    return frozenset(tables)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def extract_write_tables(query):
+    """Nama tabel yang diubah oleh statement tulis (kosong jika tidak dikenali)"""
+    sql = _strip_literals(query)
+    tables = set()
+    for pattern in _WRITE_TABLE_RES:
+        match = pattern.search(sql)
+        if match:
+            tables.add(_table_name(match))
+            break
+    if tables and re.match(r"^\s*(?:UPDATE|DELETE)\b", sql, re.IGNORECASE):
+        # Multi-table UPDATE/DELETE bisa mengubah tabel di JOIN juga
+        tables.update(_table_name(m) for m in _READ_TABLE_RE.finditer(sql))
+    rename = re.match(r"^\s*RENAME\s+TABLE\s+(.*)", sql, re.IGNORECASE | re.DOTALL)
+    if rename:
+        tables.update(_table_name(m) for m in re.finditer(_IDENT, rename.group(1))
+                      if m.group(0).upper() != 'TO')
+    return frozenset(tables)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def is_cacheable(query):
+    """Query baca yang hasilnya deterministik dan aman di-cache"""
+    return not _UNCACHEABLE_RE.search(_strip_literals(query))
+
+def _estimate_size(value):
+    """Perkiraan ukuran memori hasil query dalam byte"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(k) + _estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+def _copy_result(result):
+    """Salinan dangkal per baris agar pemanggil tidak mengubah isi cache"""
+    if isinstance(result, list):
+        return [dict(row) if isinstance(row, dict) else row for row in result]
+    if isinstance(result, dict):
+        # result_format='columnar'
+        return {name: list(values) for name, values in result.items()}
+    if hasattr(result, 'copy'):
+        # NumPy array / pandas DataFrame
+        return result.copy()
+    return result
+
+class _CacheEntry:
+    __slots__ = ('value', 'size', 'expires_at', 'tables')
+
+    def __init__(self, value, size, expires_at, tables):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tables = tables
+
+class QueryCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, default_ttl=60):
+        """
+        Inisialisasi cache hasil query
+
+        Args:
+            max_bytes (int): Batas total ukuran hasil yang disimpan (LRU eviction)
+            default_ttl (float): Umur entry dalam detik jika tidak ditentukan
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes harus lebih dari 0")
+
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, params=None, *extra):
+        """Cache key dari SQL yang dinormalisasi dan parameternya"""
+        return (normalize_query(query), repr(params)) + extra
+
+    def get(self, query, params=None, *extra):
+        """
+        Ambil hasil dari cache
+
+        Returns:
+            list: Salinan hasil query, atau None jika tidak ada/kadaluarsa
+        """
+        key = self.make_key(query, params, *extra)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy_result(entry.value)
+
+    def set(self, query, params, result, *extra, ttl=None):
+        """
+        Simpan hasil query baca ke cache
+
+        Args:
+            query (str): Query SQL
+            params: Parameter query
+            result (list): Hasil query
+            ttl (float): Umur entry dalam detik (default: default_ttl)
+
+        Returns:
+            bool: True jika hasil disimpan
+        """
+        if not is_cacheable(query):
+            return False
+
+        value = _copy_result(result)
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        ttl = self.default_ttl if ttl is None else ttl
+        key = self.make_key(query, params, *extra)
+        entry = _CacheEntry(value, size, time.monotonic() + ttl, extract_read_tables(query))
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _remove(self, key):
+        """Hapus entry (dipanggil dengan lock dipegang)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate_tables(self, tables):
+        """Hapus semua entry yang membaca salah satu tabel"""
+        tables = {name.lower() for name in tables}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_for_write(self, query):
+        """
+        Invalidasi entry yang terpengaruh statement tulis
+
+        Tabel target diambil dari statement. DDL juga menghapus entry tanpa
+        tabel (mis. SHOW TABLES). Jika target tidak dikenali, seluruh cache
+        dikosongkan agar tidak ada hasil basi.
+        """
+        tables = extract_write_tables(query)
+        if not tables:
+            return self.clear()
+
+        removed = self.invalidate_tables(tables)
+        if _DDL_RE.match(query):
+            with self._lock:
+                stale = [key for key, entry in self._entries.items() if not entry.tables]
+                for key in stale:
+                    self._remove(key)
+                self.invalidations += len(stale)
+            removed += len(stale)
+        return removed
+
+    def clear(self):
+        """Kosongkan seluruh cache"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += removed
+        return removed
+
+    def stats(self):
+        """Counter cache: hit, miss, eviction, invalidation, jumlah entry dan byte"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,179 @@
+"""
+Batas waktu per query dan pembatalan query di sisi server
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+SELECT diberi hint MAX_EXECUTION_TIME sehingga server sendiri yang
+menghentikannya tanpa round trip tambahan. Statement lain (dan SELECT yang
+tidak bisa diberi hint) dihentikan dengan KILL QUERY <thread id> lewat
+koneksi tambahan saat batas waktu habis atau saat cancel() dipanggil dari
+thread lain. Koneksinya sendiri tetap hidup dan bisa langsung dipakai lagi.
+"""
+
+import logging
+import re
+import threading
+from contextlib import contextmanager
+
+import pymysql
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# ER_QUERY_TIMEOUT: SELECT dihentikan karena MAX_EXECUTION_TIME
+MAX_EXECUTION_TIME_ERROR = 3024
+# ER_QUERY_INTERRUPTED: statement dihentikan oleh KILL QUERY
+QUERY_INTERRUPTED_ERROR = 1317
+
+# Hint hanya berlaku untuk SELECT level teratas (bukan (SELECT ...) UNION ...)
+_SELECT_RE = re.compile(r"^(\s*(?:/\*(?!\+).*?\*/\s*|(?:--|#)[^\n]*\n\s*)*SELECT\b)", re.IGNORECASE | re.DOTALL)
+_HINT_RE = re.compile(r"MAX_EXECUTION_TIME\s*\(", re.IGNORECASE)
+# Komentar hint optimizer milik query (/*+ ... */) tepat setelah SELECT
+_HINT_BLOCK_RE = re.compile(r"\s*/\*\+(.*?)\*/", re.DOTALL)
+
+def add_max_execution_time(query, timeout):
+    """
+    Sisipkan hint /*+ MAX_EXECUTION_TIME(ms) */ setelah keyword SELECT
+
+    Jika query sudah punya komentar hint setelah SELECT, MAX_EXECUTION_TIME
+    ditambahkan ke dalam komentar tersebut.
+
+    Args:
+        query (str): Query SQL
+        timeout (float): Batas waktu (detik)
+
+    Returns:
+        str: Query dengan hint, None jika query tidak bisa diberi hint
+            (bukan SELECT level teratas atau sudah punya hint sendiri)
+    """
+    match = _SELECT_RE.match(query)
+    if match is None or _HINT_RE.search(query):
+        return None
+    hint = f"MAX_EXECUTION_TIME({max(1, int(timeout * 1000))})"
+    rest = query[match.end():]
+    block = _HINT_BLOCK_RE.match(rest)
+    if block is not None:
+        # MySQL hanya membaca komentar hint pertama: gabungkan, jangan tambah blok kedua
+        return f"{match.group(1)} /*+ {block.group(1).strip()} {hint} */{rest[block.end():]}"
+    return f"{match.group(1)} /*+ {hint} */{rest}"
+
+def is_interrupted_error(error):
+    """True jika query dihentikan oleh MAX_EXECUTION_TIME atau KILL QUERY"""
+    return (isinstance(error, pymysql.MySQLError) and bool(error.args)
+            and error.args[0] in (MAX_EXECUTION_TIME_ERROR, QUERY_INTERRUPTED_ERROR))
+
+def kill_query(open_connection, thread_id):
+    """
+    Hentikan statement yang sedang berjalan di thread server thread_id
+
+    Args:
+        open_connection (callable): Membuka koneksi pymysql tambahan
+        thread_id (int): connection.thread_id() milik koneksi yang dihentikan
+
+    Returns:
+        bool: True jika KILL QUERY terkirim
+    """
+    connection = None
+    try:
+        connection = open_connection()
+        if connection is None:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("KILL QUERY %s", (thread_id,))
+        return True
+    except Exception as e:
+        logger.error(f"Gagal menghentikan query di thread {thread_id}: {str(e)}")
+        return False
+    finally:
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+class _RunningQuery:
+    __slots__ = ('thread_id', 'finished', 'reason', 'timer', 'lock')
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.finished = False
+        # 'timeout' atau 'cancel' jika query dihentikan lewat KILL QUERY
+        self.reason = None
+        self.timer = None
+        self.lock = threading.Lock()
+
+class RunningQueries:
+    """Query yang sedang berjalan di koneksi-koneksi milik satu pemilik"""
+
+    def __init__(self, open_connection):
+        """
+        Args:
+            open_connection (callable): Membuka koneksi tambahan untuk KILL QUERY
+        """
+        self.open_connection = open_connection
+        self._queries = set()
+        self._lock = threading.Lock()
+
+    def _kill(self, running, reason):
+        # Lock per query: query yang sudah selesai tidak ikut terbunuh statement berikutnya
+        with running.lock:
+            if running.finished or running.reason is not None:
+                return False
+            if not kill_query(self.open_connection, running.thread_id):
+                return False
+            running.reason = reason
+        metrics.QUERY_CANCELS_TOTAL.inc(reason=reason)
+        logger.warning(f"Query di thread {running.thread_id} dihentikan ({reason})")
+        return True
+
+    @contextmanager
+    def track(self, connection, timeout=None):
+        """
+        Context manager: daftarkan query yang berjalan di connection
+
+        Args:
+            connection: Koneksi pymysql yang menjalankan query
+            timeout (float): KILL QUERY otomatis setelah sekian detik (None = tanpa batas)
+
+        Yields:
+            _RunningQuery: reason berisi 'timeout'/'cancel' jika query dihentikan
+        """
+        running = _RunningQuery(connection.thread_id())
+        if timeout is not None:
+            running.timer = threading.Timer(timeout, self._kill, (running, 'timeout'))
+            running.timer.daemon = True
+            running.timer.start()
+        with self._lock:
+            self._queries.add(running)
+        try:
+            yield running
+        finally:
+            if running.timer is not None:
+                running.timer.cancel()
+            with self._lock:
+                self._queries.discard(running)
+            with running.lock:
+                running.finished = True
+
+    def cancel(self):
+        """
+        Hentikan semua query yang sedang berjalan
+
+        Returns:
+            int: Jumlah query yang dikirimi KILL QUERY
+        """
+        with self._lock:
+            queries = list(self._queries)
+        return sum(1 for running in queries if self._kill(running, 'cancel'))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queries)
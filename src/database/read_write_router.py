@@ -0,0 +1,268 @@
+"""
+Read/write splitting antara primary dan replica MySQL lewat SSH bastion yang sama
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Statement baca (klasifikasi is_read_statement yang sama dengan
+execute_query) dibagi round-robin ke replica yang sehat dan lag-nya di
+bawah batas; tulis, baca di dalam transaction() dan baca yang dipin ke
+primary dikirim ke primary. BEGIN/COMMIT mentah lewat execute_query tidak
+membuka transaksi (setiap tulis langsung di-commit); pakai
+router.transaction(). Lag replica dicek lazy (paling sering sekali
+per lag_check_interval) lewat SHOW REPLICA STATUS / SHOW SLAVE STATUS.
+
+Seperti MySQLSSHConnection, setiap node adalah satu koneksi MySQL sehingga
+router tidak thread-safe: pakai satu router per thread.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from .mysql_ssh_connection import MySQLSSHConnection, _is_connection_error, _validate_configs
+from .query_timeout import is_interrupted_error
+from .statements import is_read_statement
+
+logger = logging.getLogger(__name__)
+
+# SHOW REPLICA STATUS ada sejak MySQL 8.0.22; server lama hanya kenal SHOW SLAVE STATUS
+_REPLICA_STATUS_QUERIES = (
+    ("SHOW REPLICA STATUS", 'Seconds_Behind_Source'),
+    ("SHOW SLAVE STATUS", 'Seconds_Behind_Master'),
+)
+
+def _node_name(mysql_config):
+    return mysql_config.get('name') or f"{mysql_config['host']}:{mysql_config['port']}"
+
+class _Replica:
+    __slots__ = ('name', 'connection', 'lag', 'healthy', 'last_check', 'queries', 'status_query')
+
+    def __init__(self, name, connection):
+        self.name = name
+        self.connection = connection
+        self.lag = None
+        self.healthy = False
+        # 0 = belum pernah dicek, paksa cek sebelum dipakai
+        self.last_check = 0.0
+        self.queries = 0
+        self.status_query = None
+
+class ReadWriteRouter:
+    def __init__(self, ssh_config, primary_config, replica_configs, max_replica_lag=5.0,
+                 lag_check_interval=10.0, read_after_write_window=0.0, query_cache=None,
+                 **connection_options):
+        """
+        Inisialisasi router primary + replica
+
+        Args:
+            ssh_config (dict): Konfigurasi SSH bastion (sama untuk semua node)
+            primary_config (dict): Konfigurasi MySQL primary
+            replica_configs (list): Konfigurasi MySQL replica (boleh berisi 'name')
+            max_replica_lag (float): Replica dengan lag lebih dari sekian detik
+                (atau replikasi berhenti) tidak dipakai untuk baca
+            lag_check_interval (float): Jeda minimal antar cek lag per replica (detik)
+            read_after_write_window (float): Setelah tulis, baca dikirim ke primary
+                selama sekian detik agar perubahan sendiri langsung terbaca (0 = mati)
+            query_cache (QueryCache): Cache hasil baca bersama untuk semua node (optional)
+            **connection_options: Argumen tambahan MySQLSSHConnection
+                (ping_interval, share_tunnel, health_check_interval)
+
+        Raises:
+            TypeError: Jika konfigurasi bukan dict atau None
+            ValueError: Jika konfigurasi tidak lengkap
+        """
+        _validate_configs(ssh_config, primary_config)
+        for config in replica_configs:
+            _validate_configs(ssh_config, config)
+
+        self.max_replica_lag = max_replica_lag
+        self.lag_check_interval = lag_check_interval
+        self.read_after_write_window = read_after_write_window
+        self.primary = MySQLSSHConnection(ssh_config, primary_config, query_cache=query_cache,
+                                          **connection_options)
+        self.replicas = [
+            _Replica(_node_name(config),
+                     MySQLSSHConnection(ssh_config, config, query_cache=query_cache, **connection_options))
+            for config in replica_configs
+        ]
+        self.primary_queries = 0
+        self._next_replica = 0
+        self._pinned = 0
+        self._last_write = float('-inf')
+
+    def connect(self):
+        """
+        Connect ke primary dan semua replica
+
+        Replica yang gagal connect dilewati (baca jatuh ke primary) dan dicoba
+        lagi saat cek lag berikutnya.
+
+        Returns:
+            bool: True jika primary berhasil terhubung
+        """
+        if not self.primary.connect():
+            logger.error("Gagal connect ke primary")
+            return False
+        for replica in self.replicas:
+            if not replica.connection.connect():
+                logger.warning(f"Replica {replica.name} gagal connect, baca dialihkan ke node lain")
+        return True
+
+    def _check_replica(self, replica):
+        """Perbarui status sehat dan lag replica"""
+        replica.last_check = time.monotonic()
+        connection = replica.connection
+        if connection.connection is None and not connection.connect():
+            replica.healthy, replica.lag = False, None
+            return
+
+        queries = _REPLICA_STATUS_QUERIES
+        if replica.status_query is not None:
+            queries = [replica.status_query]
+        for status_query in queries:
+            rows = connection.execute_query(status_query[0], use_cache=False)
+            if rows is None:
+                continue
+            replica.status_query = status_query
+            lag = rows[0].get(status_query[1]) if rows else None
+            if lag is None:
+                # Tanpa status replikasi atau thread SQL berhenti: lag tidak diketahui
+                logger.warning(f"Replica {replica.name}: status replikasi tidak tersedia")
+            replica.lag = lag
+            replica.healthy = lag is not None and lag <= self.max_replica_lag
+            if lag is not None and not replica.healthy:
+                logger.warning(f"Replica {replica.name} tertinggal {lag} detik, tidak dipakai untuk baca")
+            return
+        replica.healthy, replica.lag = False, None
+
+    def _pick_replica(self):
+        """Replica berikutnya (round-robin) yang sehat, None jika tidak ada"""
+        now = time.monotonic()
+        count = len(self.replicas)
+        for offset in range(count):
+            replica = self.replicas[(self._next_replica + offset) % count]
+            if now - replica.last_check >= self.lag_check_interval:
+                self._check_replica(replica)
+            if replica.healthy:
+                self._next_replica = (self._next_replica + offset + 1) % count
+                replica.queries += 1
+                return replica
+        return None
+
+    def _routes_to_primary(self, query):
+        """Tentukan apakah query harus ke primary (tulis juga mencatat waktu tulis terakhir)"""
+        if not is_read_statement(query):
+            self._last_write = time.monotonic()
+            return True
+        return (self.primary.in_transaction or self._pinned > 0
+                or time.monotonic() - self._last_write < self.read_after_write_window)
+
+    def route(self, query):
+        """
+        Node tujuan untuk query (tanpa mengeksekusinya)
+
+        Returns:
+            MySQLSSHConnection: Primary atau salah satu replica
+        """
+        if self._routes_to_primary(query):
+            return self.primary
+        replica = self._pick_replica()
+        return replica.connection if replica is not None else self.primary
+
+    def execute_query(self, query, params=None, use_cache=True, result_format='dict', timeout=None):
+        """
+        Eksekusi query di node yang sesuai
+
+        Baca yang gagal di replica karena koneksi terputus diulang sekali di
+        primary dan replica tersebut dicek ulang sebelum dipakai lagi. Baca
+        yang dihentikan timeout/KILL QUERY atau gagal karena error SQL tidak
+        diulang.
+
+        Returns:
+            list: Hasil query (sesuai result_format), int untuk tulis, None jika gagal
+        """
+        if self._routes_to_primary(query):
+            self.primary_queries += 1
+            return self.primary.execute_query(query, params, use_cache, result_format, timeout)
+
+        replica = self._pick_replica()
+        if replica is not None:
+            result = replica.connection.execute_query(query, params, use_cache, result_format, timeout)
+            if result is not None:
+                return result
+            error = replica.connection.last_error
+            if not _is_connection_error(error):
+                # Mengulang query yang dihentikan hanya memindahkan beban yang sama ke primary
+                if is_interrupted_error(error):
+                    logger.warning(f"Baca di replica {replica.name} dihentikan, tidak diulang di primary")
+                return None
+            logger.warning(f"Baca di replica {replica.name} gagal, diulang di primary")
+            replica.last_check = 0.0
+        self.primary_queries += 1
+        return self.primary.execute_query(query, params, use_cache, result_format, timeout)
+
+    def execute_query_stream(self, query, params=None, chunk_size=1000, as_dict=True, chunked=False,
+                             with_header=False):
+        """Streaming query di node yang sesuai (lihat MySQLSSHConnection.execute_query_stream)"""
+        return self.route(query).execute_query_stream(query, params, chunk_size, as_dict, chunked,
+                                                      with_header)
+
+    def execute_many(self, query, params_seq, batch_size=1000):
+        """execute_many selalu di primary"""
+        self._last_write = time.monotonic()
+        return self.primary.execute_many(query, params_seq, batch_size)
+
+    def bulk_insert(self, table, columns, rows, batch_size=None):
+        """bulk_insert selalu di primary"""
+        self._last_write = time.monotonic()
+        return self.primary.bulk_insert(table, columns, rows, batch_size)
+
+    def transaction(self, isolation_level=None, read_only=False):
+        """Transaksi di primary (lihat MySQLSSHConnection.transaction); baca di dalamnya ikut ke primary"""
+        return self.primary.transaction(isolation_level, read_only)
+
+    @contextmanager
+    def use_primary(self):
+        """Context manager: semua baca di dalam blok dikirim ke primary"""
+        self._pinned += 1
+        try:
+            yield self.primary
+        finally:
+            self._pinned -= 1
+
+    def cancel(self):
+        """Hentikan query yang sedang berjalan di semua node, kembalikan jumlahnya"""
+        return self.primary.cancel() + sum(replica.connection.cancel() for replica in self.replicas)
+
+    def stats(self):
+        """Status node: jumlah query, lag dan kesehatan replica"""
+        return {
+            'primary_queries': self.primary_queries,
+            'in_transaction': self.primary.in_transaction,
+            'replicas': [
+                {'name': replica.name, 'healthy': replica.healthy, 'lag': replica.lag,
+                 'queries': replica.queries}
+                for replica in self.replicas
+            ],
+        }
+
+    def close(self):
+        """Tutup semua koneksi"""
+        for replica in self.replicas:
+            replica.connection.close()
+        self.primary.close()
+
+    def __enter__(self):
+        if not self.connect():
+            raise ConnectionError("Gagal connect ke primary")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
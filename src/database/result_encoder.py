@@ -0,0 +1,80 @@
+"""
+Encoder JSON cepat untuk hasil query MySQL
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Semua tipe kolom yang dikembalikan pymysql (datetime, date, time, TIME
+sebagai timedelta, DECIMAL, BLOB/BINARY sebagai bytes, SET) diserialisasi
+dalam satu kali jalan tanpa mengubah baris aslinya. orjson dipakai jika
+terpasang; tanpa orjson dipakai modul json standar.
+"""
+
+import datetime
+import decimal
+import json
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+def bytes_to_text(value):
+    """Bytes sebagai teks UTF-8, atau hex berawalan 0x jika bukan teks valid"""
+    try:
+        return bytes(value).decode('utf8')
+    except UnicodeDecodeError:
+        return '0x' + bytes(value).hex()
+
+def format_timedelta(value):
+    """Kolom TIME (timedelta dari pymysql) dalam format MySQL, mis. '-26:03:04.500000'"""
+    total = abs(value)
+    seconds = total.days * 86400 + total.seconds
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    text = f"{'-' if value < datetime.timedelta(0) else ''}{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if total.microseconds:
+        text += f".{total.microseconds:06d}"
+    return text
+
+def json_default(value):
+    """
+    Konversi tipe non-JSON ke nilai JSON (dipakai sebagai default= json/orjson)
+
+    Raises:
+        TypeError: Jika tipe tidak dikenal
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return format_timedelta(value)
+    if isinstance(value, decimal.Decimal):
+        # String agar presisi DECIMAL tidak hilang menjadi float
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes_to_text(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Tipe {type(value).__name__} tidak bisa diserialisasi ke JSON")
+
+def backend():
+    """Nama library JSON yang dipakai: 'orjson' atau 'json'"""
+    return 'orjson' if _orjson is not None else 'json'
+
+def dumps(obj):
+    """
+    Serialisasi hasil query (dan payload di sekitarnya) ke JSON UTF-8
+
+    Returns:
+        bytes: Dokumen JSON
+    """
+    if _orjson is not None:
+        return _orjson.dumps(obj, default=json_default)
+    return json.dumps(obj, default=json_default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf8')
@@ -0,0 +1,124 @@
+"""
+Format hasil query selain list dict per baris
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+DictCursor membuat satu dict per baris yang mengulang semua nama kolom.
+Untuk SELECT analitik yang lebar, hasil bisa dibaca sebagai tuple atau
+per kolom (dict of list, NumPy structured array, pandas DataFrame) langsung
+dari chunk fetchmany tanpa dict per baris.
+"""
+
+import importlib
+
+import pymysql
+
+RESULT_FORMATS = ('dict', 'tuple', 'columnar', 'numpy', 'pandas')
+
+# Library opsional yang dibutuhkan format tertentu
+_OPTIONAL_MODULES = {'numpy': 'numpy', 'pandas': 'pandas'}
+
+def _import_optional(result_format):
+    """Import library untuk format numpy/pandas, None untuk format lain"""
+    module_name = _OPTIONAL_MODULES.get(result_format)
+    if module_name is None:
+        return None
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        raise ImportError(
+            f"result_format='{result_format}' membutuhkan {module_name} "
+            f"(pip install {module_name})"
+        ) from None
+
+def validate_result_format(result_format):
+    """
+    Pastikan format dikenal dan library opsionalnya terpasang
+
+    Raises:
+        ValueError: Jika format tidak dikenal
+        ImportError: Jika numpy/pandas belum terpasang
+    """
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(
+            f"result_format tidak dikenal: {result_format!r} "
+            f"(pilihan: {', '.join(RESULT_FORMATS)})"
+        )
+    _import_optional(result_format)
+
+def cursor_class_for(result_format):
+    """Cursor pymysql untuk format: DictCursor untuk 'dict', Cursor (tuple) untuk lainnya"""
+    if result_format == 'dict':
+        return pymysql.cursors.DictCursor
+    return pymysql.cursors.Cursor
+
+def column_names(cursor):
+    """Nama kolom dari cursor.description; nama kembar diberi akhiran _2, _3, ..."""
+    names = []
+    seen = {}
+    for column in cursor.description or ():
+        name = column[0]
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 1
+        names.append(name)
+    return names
+
+def fetch_columns(cursor, chunk_size=10000):
+    """Baca hasil per chunk langsung ke list per kolom (tanpa dict per baris)"""
+    names = column_names(cursor)
+    columns = [[] for _ in names]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for values, column_values in zip(columns, zip(*rows)):
+            values.extend(column_values)
+    return names, columns
+
+def _to_numpy(numpy, names, columns):
+    """Structured array dengan dtype per kolom hasil inferensi NumPy"""
+    arrays = [numpy.asarray(values) for values in columns]
+    dtype = [(name, array.dtype) for name, array in zip(names, arrays)]
+    result = numpy.empty(len(arrays[0]) if arrays else 0, dtype=dtype)
+    for name, array in zip(names, arrays):
+        result[name] = array
+    return result
+
+def fetch_result(cursor, result_format='dict', chunk_size=10000):
+    """
+    Ambil seluruh hasil cursor dalam format yang diminta
+
+    Cursor harus dibuat dengan cursor_class_for(result_format).
+
+    Returns:
+        list: Baris dict ('dict') atau tuple ('tuple')
+        dict: {kolom: list nilai} untuk 'columnar'
+        numpy.ndarray: Structured array untuk 'numpy'
+        pandas.DataFrame: DataFrame untuk 'pandas'
+    """
+    if result_format in ('dict', 'tuple'):
+        return list(cursor.fetchall())
+
+    module = _import_optional(result_format)
+    names, columns = fetch_columns(cursor, chunk_size)
+    if result_format == 'columnar':
+        return dict(zip(names, columns))
+    if result_format == 'numpy':
+        return _to_numpy(module, names, columns)
+    return module.DataFrame(dict(zip(names, columns)), columns=names)
+
+def row_count(result):
+    """Jumlah baris hasil fetch_result untuk format apa pun"""
+    if isinstance(result, dict):
+        return len(next(iter(result.values()), ()))
+    return len(result)
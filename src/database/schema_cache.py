@@ -0,0 +1,239 @@
+"""
+Cache metadata skema (database, tabel, kolom, index) per koneksi
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Seluruh katalog satu database dimuat dengan tiga query information_schema
+(TABLES, COLUMNS, STATISTICS) lalu dilayani dari memori sampai TTL habis,
+refresh() dipanggil, atau invalidate() setelah DDL. Tidak ada lagi satu
+query per tabel untuk kolom, index atau perkiraan ukuran.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_DATABASES_QUERY = "SELECT SCHEMA_NAME FROM information_schema.SCHEMATA ORDER BY SCHEMA_NAME"
+
+_TABLES_QUERY = (
+    "SELECT TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH, "
+    "TABLE_COLLATION, TABLE_COMMENT "
+    "FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME"
+)
+
+_COLUMNS_QUERY = (
+    "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, "
+    "COLUMN_KEY, EXTRA "
+    "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s "
+    "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+)
+
+_INDEXES_QUERY = (
+    "SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME, INDEX_TYPE "
+    "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = %s "
+    "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+)
+
+class _SchemaSnapshot:
+    """Katalog satu database pada satu waktu"""
+
+    __slots__ = ('tables', 'loaded_at')
+
+    def __init__(self, tables, loaded_at):
+        # Nama tabel -> dict info tabel (termasuk 'columns' dan 'indexes')
+        self.tables = tables
+        self.loaded_at = loaded_at
+
+class SchemaCache:
+    def __init__(self, mysql_ssh, ttl=300):
+        """
+        Inisialisasi cache metadata untuk satu koneksi
+
+        Args:
+            mysql_ssh (MySQLSSHConnection): Koneksi yang dipakai untuk introspeksi
+            ttl (float): Umur katalog dalam detik sebelum dimuat ulang (None = sampai refresh)
+        """
+        self.mysql_ssh = mysql_ssh
+        self.ttl = ttl
+        self.loads = 0
+        self._databases = None
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def _query(self, query, params=None):
+        """Jalankan query introspeksi (tuple, tanpa query cache)"""
+        result = self.mysql_ssh.execute_query(query, params, use_cache=False, result_format='tuple')
+        if result is None:
+            raise RuntimeError("Query information_schema gagal")
+        return result
+
+    def _is_fresh(self, loaded_at):
+        return self.ttl is None or time.monotonic() - loaded_at < self.ttl
+
+    def _default_database(self, database):
+        return database or self.mysql_ssh.mysql_config['database']
+
+    def _load_schema(self, database):
+        """Muat seluruh katalog satu database dengan tiga query"""
+        tables = {}
+        for name, table_type, engine, rows, data_length, index_length, collation, comment \
+                in self._query(_TABLES_QUERY, (database,)):
+            tables[name] = {
+                'name': name,
+                'type': table_type,
+                'engine': engine,
+                # TABLE_ROWS adalah perkiraan (InnoDB), bukan COUNT(*)
+                'rows': rows,
+                'data_length': data_length,
+                'index_length': index_length,
+                'collation': collation,
+                'comment': comment,
+                'columns': [],
+                'indexes': [],
+            }
+
+        for table, name, column_type, data_type, nullable, default, key, extra \
+                in self._query(_COLUMNS_QUERY, (database,)):
+            if table in tables:
+                tables[table]['columns'].append({
+                    'name': name,
+                    'type': column_type,
+                    'data_type': data_type,
+                    'nullable': nullable == 'YES',
+                    'default': default,
+                    'key': key,
+                    'extra': extra,
+                })
+
+        for table, name, non_unique, column, index_type in self._query(_INDEXES_QUERY, (database,)):
+            if table not in tables:
+                continue
+            indexes = tables[table]['indexes']
+            if not indexes or indexes[-1]['name'] != name:
+                indexes.append({
+                    'name': name,
+                    'unique': not int(non_unique),
+                    'type': index_type,
+                    'columns': [],
+                })
+            indexes[-1]['columns'].append(column)
+
+        self.loads += 1
+        logger.info(f"Metadata skema {database} dimuat: {len(tables)} tabel")
+        return _SchemaSnapshot(tables, time.monotonic())
+
+    def _snapshot(self, database=None):
+        """Katalog database dari cache, dimuat ulang jika kosong atau kedaluwarsa"""
+        database = self._default_database(database)
+        with self._lock:
+            snapshot = self._schemas.get(database)
+            if snapshot is None or not self._is_fresh(snapshot.loaded_at):
+                snapshot = self._schemas[database] = self._load_schema(database)
+            return snapshot
+
+    def databases(self):
+        """
+        Daftar nama database
+
+        Returns:
+            list: Nama database, None jika gagal dimuat
+        """
+        try:
+            with self._lock:
+                if self._databases is None or not self._is_fresh(self._databases[1]):
+                    names = [row[0] for row in self._query(_DATABASES_QUERY)]
+                    self._databases = (names, time.monotonic())
+                return list(self._databases[0])
+        except Exception as e:
+            logger.error(f"Gagal memuat daftar database: {str(e)}")
+            return None
+
+    def tables(self, database=None, details=False):
+        """
+        Daftar tabel satu database (default: database koneksi)
+
+        Args:
+            details (bool): True untuk dict info lengkap (engine, rows, ukuran,
+                kolom, index), False untuk nama saja
+
+        Returns:
+            list: Nama tabel atau dict info tabel, None jika gagal dimuat
+        """
+        try:
+            snapshot = self._snapshot(database)
+        except Exception as e:
+            logger.error(f"Gagal memuat metadata skema: {str(e)}")
+            return None
+        if details:
+            return [dict(info) for info in snapshot.tables.values()]
+        return list(snapshot.tables)
+
+    def table(self, table, database=None):
+        """
+        Info satu tabel (kolom, index, perkiraan baris dan ukuran)
+
+        Returns:
+            dict: Info tabel, None jika tabel tidak ada atau gagal dimuat
+        """
+        try:
+            tables = self._snapshot(database).tables
+        except Exception as e:
+            logger.error(f"Gagal memuat metadata skema: {str(e)}")
+            return None
+        info = tables.get(table)
+        if info is None:
+            # Nama tabel tidak case-sensitive di sebagian besar instalasi MySQL
+            info = next((v for k, v in tables.items() if k.lower() == table.lower()), None)
+        return dict(info) if info is not None else None
+
+    def columns(self, table, database=None):
+        """Daftar kolom tabel, None jika tabel tidak ditemukan"""
+        info = self.table(table, database)
+        return info['columns'] if info is not None else None
+
+    def indexes(self, table, database=None):
+        """Daftar index tabel, None jika tabel tidak ditemukan"""
+        info = self.table(table, database)
+        return info['indexes'] if info is not None else None
+
+    def refresh(self, database=None):
+        """
+        Muat ulang katalog sekarang juga (dan daftar database)
+
+        Returns:
+            bool: True jika berhasil
+        """
+        self.invalidate()
+        try:
+            self._snapshot(database)
+        except Exception as e:
+            logger.error(f"Gagal refresh metadata skema: {str(e)}")
+            return False
+        return self.databases() is not None
+
+    def invalidate(self, database=None):
+        """Buang katalog (satu database atau semuanya) agar dimuat ulang saat dipakai"""
+        with self._lock:
+            if database is None:
+                self._schemas.clear()
+                self._databases = None
+            else:
+                self._schemas.pop(database, None)
+
+    def stats(self):
+        """Jumlah database yang katalognya di-cache dan jumlah load"""
+        with self._lock:
+            return {
+                'schemas': sorted(self._schemas),
+                'tables': sum(len(snapshot.tables) for snapshot in self._schemas.values()),
+                'loads': self.loads,
+            }
@@ -0,0 +1,270 @@
+"""
+Slow-query log dan profiler berbasis execute hook
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+SlowQueryLog dipasang sebagai after-execute hook MySQLSSHConnection. Query
+yang lebih lama dari threshold dicatat ke ring buffer berukuran tetap
+beserta fingerprint SQL (literal diganti '?'), jumlah baris, pembagian
+durasi server vs jaringan (performance_schema, atau SHOW PROFILES jika
+profiling sesi aktif) dan hasil EXPLAIN.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+# String literal atau komentar; dicocokkan bersama agar '--' di dalam string aman
+_TOKEN_RE = re.compile(
+    r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|/\*.*?\*/|(?:--[ \t]|#)[^\n]*""",
+    re.S
+)
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_NUMBER_RE = re.compile(r'\b0x[0-9a-f]+\b|(?<![\w.])[-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?\b', re.I)
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUES_RE = re.compile(r'\bvalues\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Statement yang bisa di-EXPLAIN tanpa dieksekusi
+EXPLAINABLE_STATEMENTS = frozenset(['SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE'])
+
+_PERFORMANCE_SCHEMA_QUERY = (
+    "SELECT SQL_TEXT, TIMER_WAIT FROM performance_schema.events_statements_history "
+    "WHERE THREAD_ID = (SELECT THREAD_ID FROM performance_schema.threads "
+    "WHERE PROCESSLIST_ID = CONNECTION_ID()) ORDER BY EVENT_ID DESC LIMIT 5"
+)
+
+# Statement internal (commit pymysql, profiling) yang dilewati saat mencari query asli
+_SKIPPED_PREFIXES = ('commit', 'rollback', 'show profile', 'set profiling')
+
+def _replace_token(match):
+    token = match.group(0)
+    return '?' if token[0] in '\'"' else ' '
+
+@lru_cache(maxsize=1024)
+def fingerprint(query):
+    """
+    Bentuk normal SQL untuk mengelompokkan query yang sama
+
+    Komentar dibuang, literal string/angka dan placeholder menjadi '?',
+    daftar IN (...) dan VALUES (...), (...) diringkas menjadi '(?+)', spasi
+    dirapatkan dan semua huruf kecil.
+    """
+    text = _TOKEN_RE.sub(_replace_token, query)
+    text = _PLACEHOLDER_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _WHITESPACE_RE.sub(' ', text).strip().rstrip(';').strip().lower()
+    text = _IN_LIST_RE.sub('in(?+)', text)
+    return _VALUES_RE.sub('values(?+)', text)
+
+def fingerprint_id(query):
+    """ID pendek (16 hex) dari fingerprint query"""
+    return hashlib.md5(fingerprint(query).encode('utf8')).hexdigest()[:16]
+
+def _is_skipped(sql_text):
+    return sql_text.strip().lower().startswith(_SKIPPED_PREFIXES)
+
+def server_seconds(connection):
+    """
+    Durasi eksekusi di server untuk statement terakhir pada koneksi
+
+    Dibaca dari performance_schema.events_statements_history; jika tidak
+    tersedia (dimatikan atau tanpa hak akses) dari SHOW PROFILES, yang hanya
+    berisi data jika profiling sesi aktif.
+
+    Returns:
+        float: Detik, None jika tidak ada sumber yang tersedia
+    """
+    try:
+        with connection.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(_PERFORMANCE_SCHEMA_QUERY)
+            for sql_text, timer_wait in cursor.fetchall():
+                if sql_text and timer_wait is not None and not _is_skipped(sql_text):
+                    # TIMER_WAIT dalam picodetik
+                    return int(timer_wait) / 1e12
+    except Exception as e:
+        logger.debug(f"performance_schema tidak tersedia: {str(e)}")
+
+    try:
+        with connection.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute("SHOW PROFILES")
+            for _query_id, duration, sql_text in reversed(cursor.fetchall()):
+                if not _is_skipped(sql_text):
+                    return float(duration)
+    except Exception as e:
+        logger.debug(f"SHOW PROFILES tidak tersedia: {str(e)}")
+    return None
+
+def explain(connection, query, params=None):
+    """
+    Hasil EXPLAIN untuk query (tanpa mengeksekusinya)
+
+    Returns:
+        list: Baris EXPLAIN sebagai dict, None jika gagal
+    """
+    try:
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute("EXPLAIN " + query, params)
+            return list(cursor.fetchall())
+    except Exception as e:
+        logger.warning(f"EXPLAIN gagal: {str(e)}")
+        return None
+
+class SlowQueryLog:
+    def __init__(self, threshold=1.0, capacity=200, explain=True, server_timing=True):
+        """
+        Inisialisasi slow-query log
+
+        Args:
+            threshold (float): Durasi minimal (detik) agar query dicatat
+            capacity (int): Jumlah entry maksimal di ring buffer (entry tertua dibuang)
+            explain (bool): Jalankan EXPLAIN untuk query lambat yang bisa di-EXPLAIN
+            server_timing (bool): Ambil durasi sisi server dari performance_schema
+                atau SHOW PROFILES
+
+        Raises:
+            ValueError: Jika threshold negatif atau capacity kurang dari 1
+        """
+        if threshold < 0:
+            raise ValueError("threshold tidak boleh negatif")
+        if capacity < 1:
+            raise ValueError("capacity minimal 1")
+        self.threshold = threshold
+        self.capacity = capacity
+        self.explain = explain
+        self.server_timing = server_timing
+        self.total_recorded = 0
+        self._entries = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def attach(self, mysql_ssh, profiling=False):
+        """
+        Pasang log sebagai after-execute hook koneksi
+
+        Args:
+            mysql_ssh (MySQLSSHConnection): Koneksi yang dipantau
+            profiling (bool): Aktifkan SET profiling = 1 untuk sesi saat ini
+                (sumber cadangan SHOW PROFILES; hilang setelah reconnect)
+        """
+        mysql_ssh.add_execute_hook(after=self._after_execute)
+        if profiling and mysql_ssh.connection is not None:
+            try:
+                with mysql_ssh.connection.cursor() as cursor:
+                    cursor.execute("SET profiling = 1")
+            except Exception as e:
+                logger.warning(f"Gagal mengaktifkan profiling sesi: {str(e)}")
+
+    def detach(self, mysql_ssh):
+        """Lepas hook dari koneksi"""
+        mysql_ssh.remove_execute_hook(after=self._after_execute)
+
+    def _after_execute(self, mysql_ssh, event):
+        """After-execute hook: catat query yang melewati threshold"""
+        duration = event['duration']
+        if duration < self.threshold:
+            return
+
+        entry = {
+            'timestamp': time.time(),
+            'query': event['query'],
+            'fingerprint': fingerprint(event['query']),
+            'fingerprint_id': fingerprint_id(event['query']),
+            'statement': event['statement'],
+            'duration': duration,
+            'server_seconds': None,
+            'network_seconds': None,
+            'rows': event['rows'],
+            'attempts': event['attempts'],
+            'error': event['error'],
+            'explain': None,
+        }
+
+        connection = mysql_ssh.connection
+        if event['error'] is None and connection is not None:
+            # Durasi server diambil sebelum EXPLAIN agar statement terakhir masih query aslinya
+            if self.server_timing:
+                seconds = server_seconds(connection)
+                if seconds is not None:
+                    entry['server_seconds'] = seconds
+                    # Sisa waktu: round trip tunnel, transfer hasil dan decode di client
+                    entry['network_seconds'] = max(duration - seconds, 0.0)
+            if self.explain and event['statement'] in EXPLAINABLE_STATEMENTS:
+                entry['explain'] = explain(connection, event['query'], event['params'])
+
+        self.record(entry)
+        logger.warning(f"Query lambat ({duration:.3f} detik): {entry['fingerprint'][:200]}")
+
+    def record(self, entry):
+        """Tambahkan entry ke ring buffer"""
+        with self._lock:
+            self._entries.append(entry)
+            self.total_recorded += 1
+
+    def entries(self, limit=None):
+        """
+        Entry query lambat, terbaru lebih dulu
+
+        Returns:
+            list: Dict entry (query, fingerprint, duration, server/network_seconds,
+                rows, explain, ...)
+        """
+        with self._lock:
+            items = list(reversed(self._entries))
+        return items[:limit] if limit is not None else items
+
+    def summary(self):
+        """
+        Ringkasan per fingerprint, diurutkan dari total durasi terbesar
+
+        Returns:
+            list: Dict dengan fingerprint, count, total, avg, max dan contoh query terakhir
+        """
+        groups = {}
+        for entry in self.entries():
+            group = groups.get(entry['fingerprint_id'])
+            if group is None:
+                group = groups[entry['fingerprint_id']] = {
+                    'fingerprint_id': entry['fingerprint_id'],
+                    'fingerprint': entry['fingerprint'],
+                    'sample': entry['query'],
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                }
+            group['count'] += 1
+            group['total'] += entry['duration']
+            group['max'] = max(group['max'], entry['duration'])
+        result = sorted(groups.values(), key=lambda group: group['total'], reverse=True)
+        for group in result:
+            group['avg'] = group['total'] / group['count']
+        return result
+
+    def clear(self):
+        """Kosongkan ring buffer"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Konfigurasi dan jumlah entry"""
+        with self._lock:
+            return {
+                'threshold': self.threshold,
+                'capacity': self.capacity,
+                'entries': len(self._entries),
+                'total_recorded': self.total_recorded,
+            }
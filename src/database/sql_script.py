@@ -0,0 +1,240 @@
+"""
+Pemecah dan eksekutor script SQL (migrasi, seed, dump) dalam batch multi-statement
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Script dibaca per baris (file besar tidak dimuat sekaligus) dan dipecah per
+statement dengan aturan client mysql: string, identifier ber-backtick,
+komentar dan perintah DELIMITER. Statement lalu dikirim berkelompok dalam
+satu round trip dengan CLIENT.MULTI_STATEMENTS dan hasilnya dibaca satu per
+satu lewat nextset().
+"""
+
+import io
+import os
+import re
+import time
+
+import pymysql
+
+from .statements import READ_COMMANDS, statement_type
+from . import metrics
+
+# Jumlah karakter query yang disimpan di laporan per statement
+REPORT_QUERY_LENGTH = 200
+
+_DELIMITER_RE = re.compile(r"\s*delimiter\s+(\S+)", re.IGNORECASE)
+# Akhir string/identifier mulai dari posisi setelah tanda kutip pembuka
+_QUOTE_END_RE = {
+    "'": re.compile(r"(?:[^'\\]|\\.|'')*'", re.DOTALL),
+    '"': re.compile(r'(?:[^"\\]|\\.|"")*"', re.DOTALL),
+    '`': re.compile(r"(?:[^`]|``)*`", re.DOTALL),
+}
+# Tanpa memoize: statement script hampir selalu unik dan bisa sangat besar
+_statement_keyword = statement_type.__wrapped__
+# Statement yang bisa menghasilkan lebih dari satu result set dikirim sendiri
+_MULTI_RESULT_STATEMENTS = frozenset(['CALL'])
+
+def _special_re(delimiter):
+    """Token yang mengubah state pemecah di luar string dan komentar"""
+    return re.compile(r"['\"`#]|--(?=\s|$)|/\*|" + re.escape(delimiter))
+
+def split_statements(lines):
+    """
+    Pecah baris-baris script SQL menjadi statement
+
+    Delimiter di dalam string, identifier ber-backtick dan komentar
+    diabaikan. Komentar biasa dibuang; komentar bersyarat (/*! ... */) dan
+    hint optimizer (/*+ ... */) dipertahankan karena dieksekusi server.
+    Perintah DELIMITER mengganti pemisah statement seperti di client mysql.
+
+    Args:
+        lines (iterable): Baris script (mis. objek file teks)
+
+    Yields:
+        str: Statement tanpa delimiter penutup
+    """
+    delimiter = ';'
+    special = _special_re(delimiter)
+    pieces = []
+    # None, tanda kutip pembuka, atau '*/' di dalam komentar blok
+    state = None
+    keep_comment = False
+
+    for line in lines:
+        start = position = 0
+        if state is None and not any(piece.strip() for piece in pieces):
+            match = _DELIMITER_RE.match(line)
+            if match:
+                delimiter = match.group(1)
+                special = _special_re(delimiter)
+                pieces = []
+                continue
+
+        while position < len(line):
+            if state == '*/':
+                end = line.find('*/', position)
+                if end < 0:
+                    position = len(line)
+                    break
+                position = end + 2
+                if not keep_comment:
+                    start = position
+                state = None
+            elif state is not None:
+                match = _QUOTE_END_RE[state].match(line, position)
+                if match is None:
+                    position = len(line)
+                    break
+                position = match.end()
+                state = None
+            else:
+                match = special.search(line, position)
+                if match is None:
+                    position = len(line)
+                    break
+                token = match.group()
+                if token in _QUOTE_END_RE:
+                    state = token
+                    position = match.end()
+                elif token in ('--', '#'):
+                    pieces.append(line[start:match.start()] + '\n')
+                    start = position = len(line)
+                elif token == '/*':
+                    keep_comment = line.startswith(('/*!', '/*+'), match.start())
+                    if not keep_comment:
+                        pieces.append(line[start:match.start()])
+                    state = '*/'
+                    position = match.end()
+                else:
+                    pieces.append(line[start:match.start()])
+                    statement = ''.join(pieces).strip()
+                    if statement:
+                        yield statement
+                    pieces = []
+                    start = position = match.end()
+
+        if not (state == '*/' and not keep_comment):
+            pieces.append(line[start:])
+
+    statement = ''.join(pieces).strip()
+    if statement:
+        yield statement
+
+def iter_script_lines(script):
+    """
+    Baris script dari teks SQL, path file atau objek file
+
+    String yang menunjuk file yang ada dianggap path; string lain dianggap
+    teks SQL. File dibaca per baris sehingga ukuran file tidak berpengaruh
+    ke memori.
+
+    Yields:
+        str: Baris script
+    """
+    if isinstance(script, (str, os.PathLike)) and os.path.isfile(script):
+        with open(script, 'r', encoding='utf-8') as script_file:
+            yield from script_file
+    elif isinstance(script, str):
+        yield from io.StringIO(script)
+    else:
+        yield from script
+
+def _batches(statements, max_size, max_statements):
+    """
+    Kelompokkan statement per round trip: batas byte (max_allowed_packet)
+    dan jumlah statement, CALL selalu dikirim sendiri
+    """
+    batch, size = [], 0
+    for statement in statements:
+        statement_size = len(statement.encode('utf8')) + 2
+        alone = _statement_keyword(statement) in _MULTI_RESULT_STATEMENTS
+        if batch and (alone or size + statement_size > max_size or len(batch) >= max_statements):
+            yield batch
+            batch, size = [], 0
+        batch.append(statement)
+        size += statement_size
+        if alone:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+def _outcome(index, statement, seconds, rows=None, error=None):
+    return {
+        'index': index,
+        'query': statement[:REPORT_QUERY_LENGTH],
+        'statement': _statement_keyword(statement),
+        'rows': rows,
+        'seconds': seconds,
+        'error': error,
+    }
+
+def _record(outcome):
+    """Catat hasil satu statement script ke metrik"""
+    rows = outcome['rows']
+    if rows is not None and outcome['statement'] in READ_COMMANDS:
+        metrics.record_query(outcome['statement'], outcome['seconds'], 0)
+        metrics.ROWS_TOTAL.inc(rows, kind='fetched')
+    else:
+        metrics.record_query(outcome['statement'], outcome['seconds'], rows)
+
+def run_script(connection, statements, max_size, max_statements=500, stop_on_error=True):
+    """
+    Eksekusi statement berkelompok pada koneksi dengan CLIENT.MULTI_STATEMENTS
+
+    Server mengeksekusi statement satu kelompok berurutan dan berhenti pada
+    statement pertama yang gagal. Durasi per statement adalah selisih waktu
+    kedatangan hasilnya (statement pertama termasuk pengiriman kelompok).
+
+    Args:
+        connection: Koneksi pymysql dengan CLIENT.MULTI_STATEMENTS aktif
+        statements (iterable): Statement (mis. dari split_statements)
+        max_size (int): Batas byte per kelompok
+        max_statements (int): Batas jumlah statement per kelompok
+        stop_on_error (bool): False untuk lanjut ke statement setelah yang gagal
+
+    Yields:
+        dict: index, query (dipotong), statement, rows, seconds, error
+    """
+    index = 0
+    pending = []
+    batches = _batches(statements, max_size, max_statements)
+    while True:
+        batch = pending or next(batches, None)
+        if batch is None:
+            return
+        pending = []
+
+        with connection.cursor(pymysql.cursors.Cursor) as cursor:
+            last = time.perf_counter()
+            for position, statement in enumerate(batch):
+                try:
+                    if position == 0:
+                        cursor.execute(';\n'.join(batch))
+                    elif not cursor.nextset():
+                        raise pymysql.err.InternalError(
+                            f"Server mengembalikan {position} hasil untuk {len(batch)} statement")
+                except pymysql.MySQLError as e:
+                    outcome = _outcome(index, statement, time.perf_counter() - last, error=str(e))
+                    _record(outcome)
+                    yield outcome
+                    index += 1
+                    if stop_on_error:
+                        return
+                    # Statement setelah yang gagal tidak dieksekusi server: kirim ulang
+                    pending = batch[position + 1:]
+                    break
+                now = time.perf_counter()
+                outcome = _outcome(index, statement, now - last, max(cursor.rowcount, 0))
+                _record(outcome)
+                yield outcome
+                index += 1
+                last = now
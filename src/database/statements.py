@@ -0,0 +1,58 @@
+"""
+Klasifikasi statement SQL dengan cache per template query
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Hot path menjalankan template SQL yang sama berulang kali. Hasil
+klasifikasi (baca/tulis, jenis statement) di-memoize per teks query
+sehingga parsing di sisi Python hanya terjadi sekali per template.
+"""
+
+import re
+from functools import lru_cache
+
+# Jumlah template query berbeda yang hasil klasifikasinya disimpan
+STATEMENT_CACHE_SIZE = 4096
+
+# Statement yang mengembalikan result set
+READ_COMMANDS = frozenset(['SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN'])
+
+_LEADING_COMMENT_RE = re.compile(r"^\s*(?:/\*.*?\*/\s*|(?:--|#)[^\n]*(?:\n|$)\s*)*", re.DOTALL)
+# Keyword pertama, termasuk query dalam kurung seperti (SELECT ...) UNION (...)
+_KEYWORD_RE = re.compile(r"[(\s]*([A-Za-z]+)")
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def statement_type(query):
+    """
+    Keyword pertama statement dalam huruf besar (mis. 'SELECT', 'INSERT')
+
+    Komentar di awal query diabaikan. Mengembalikan string kosong jika
+    keyword tidak ditemukan.
+    """
+    body = query[_LEADING_COMMENT_RE.match(query).end():]
+    match = _KEYWORD_RE.match(body)
+    return match.group(1).upper() if match else ''
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def is_read_statement(query):
+    """True jika query mengembalikan hasil (SELECT, SHOW, DESCRIBE, EXPLAIN)"""
+    return statement_type(query) in READ_COMMANDS
+
+def statement_cache_info():
+    """Statistik cache klasifikasi (hits, misses, currsize) untuk observability"""
+    return {
+        'statement_type': statement_type.cache_info()._asdict(),
+        'is_read_statement': is_read_statement.cache_info()._asdict(),
+    }
+
+def clear_statement_cache():
+    """Kosongkan cache klasifikasi statement"""
+    statement_type.cache_clear()
+    is_read_statement.cache_clear()
@@ -0,0 +1,455 @@
+"""
+Export tabel paralel per rentang primary key ke CSV, JSONL atau Parquet
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Tabel dibagi menjadi rentang primary key integer berisi jumlah baris yang
+sama (batas diambil dari data). Setiap rentang dibaca
+dengan server-side cursor lewat koneksi pool secara paralel dan ditulis ke
+file part sendiri. Manifest mencatat part yang selesai sehingga export yang
+gagal di tengah jalan bisa dilanjutkan tanpa mengulang dari awal.
+"""
+
+import csv
+import datetime
+import importlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import pymysql
+
+from .mysql_ssh_connection import _primary_key_columns, _quote_identifier, _split_table_name, _stream_query
+from .result_encoder import bytes_to_text, dumps, format_timedelta
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Tipe kolom yang bisa dibagi per rentang nilai
+_INTEGER_TYPES = frozenset(['tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint'])
+
+# Lebar bit integer Arrow per tipe integer MySQL (unsigned menjadi uint)
+_ARROW_INTEGER_TYPES = {'tinyint': 8, 'smallint': 16, 'mediumint': 32, 'int': 32, 'integer': 32, 'bigint': 64}
+
+# Tipe MySQL yang dibaca pymysql sebagai bytes
+_BINARY_TYPES = frozenset(['binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob', 'bit',
+                           'geometry', 'point', 'linestring', 'polygon', 'multipoint',
+                           'multilinestring', 'multipolygon', 'geometrycollection'])
+
+# Batas jumlah chunk per export agar manifest dan jumlah file part tetap wajar
+MAX_CHUNKS = 10000
+
+def _column_types(connection, table):
+    """
+    Tipe kolom tabel dari information_schema
+
+    Returns:
+        dict: Nama kolom (lowercase) -> [DATA_TYPE, COLUMN_TYPE, presisi, skala]
+    """
+    schema, name = _split_table_name(table)
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, NUMERIC_PRECISION, NUMERIC_SCALE "
+            "FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s",
+            (schema, name)
+        )
+        return {row[0].lower(): [row[1].lower(), row[2].lower(), row[3], row[4]]
+                for row in cursor.fetchall()}
+
+def _fetch_metadata(connection, table, columns=None):
+    """
+    Kolom export beserta tipenya, primary key integer dan nilai terkecilnya
+
+    Returns:
+        tuple: (daftar kolom, nama key atau None, nilai min, daftar tipe kolom
+            [DATA_TYPE, COLUMN_TYPE, presisi, skala] atau None per kolom)
+    """
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        select_list = ', '.join(_quote_identifier(c) for c in columns) if columns else '*'
+        cursor.execute(f"SELECT {select_list} FROM {_quote_identifier(table)} LIMIT 0")
+        column_list = [column[0] for column in cursor.description]
+        cursor.fetchall()
+
+    types = _column_types(connection, table)
+    column_types = [types.get(column.lower()) for column in column_list]
+
+    keys = _primary_key_columns(connection, table)
+    # Hanya primary key tunggal bertipe integer yang bisa dibagi per rentang
+    if len(keys) != 1 or keys[0][1] not in _INTEGER_TYPES:
+        return column_list, None, None, column_types
+
+    key = keys[0][0]
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(f"SELECT MIN({_quote_identifier(key)}) FROM {_quote_identifier(table)}")
+        low = cursor.fetchone()[0]
+    return column_list, key, low, column_types
+
+def _plan_chunks(connection, table, key, low, chunk_size, max_chunks=MAX_CHUNKS):
+    """
+    Rentang [awal, akhir) yang masing-masing berisi sekitar chunk_size baris
+
+    Batas chunk diambil dari data dengan melangkah lewat index key
+    (LIMIT 1 OFFSET chunk_size), bukan dari rentang nilai, sehingga key
+    yang jarang atau sangat besar tidak menghasilkan chunk kosong. Chunk
+    terakhir tidak punya batas atas (akhir None).
+    """
+    if low is None:
+        return []
+    quoted_key = _quote_identifier(key)
+    query = (f"SELECT {quoted_key} FROM {_quote_identifier(table)} WHERE {quoted_key} >= %s "
+             f"ORDER BY {quoted_key} LIMIT 1 OFFSET %s")
+    chunks = []
+    start = low
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        while len(chunks) < max_chunks - 1:
+            cursor.execute(query, (start, chunk_size))
+            row = cursor.fetchone()
+            if row is None:
+                break
+            chunks.append([start, row[0]])
+            start = row[0]
+        else:
+            logger.warning(
+                f"Export {table} dibatasi {max_chunks} chunk, sisa tabel masuk chunk terakhir; "
+                f"perbesar chunk_size"
+            )
+    chunks.append([start, None])
+    return chunks
+
+def _text_value(value):
+    """Nilai kolom sebagai teks untuk CSV"""
+    if value is None:
+        return ''
+    if isinstance(value, (bytes, bytearray)):
+        return bytes_to_text(value)
+    if isinstance(value, datetime.timedelta):
+        return format_timedelta(value)
+    return value
+
+def encode_csv(columns, batches, header=True):
+    """
+    Generator teks CSV per batch baris (tuple)
+
+    Dipakai untuk file part export maupun response streaming; memori
+    sebanding dengan satu batch, bukan seluruh hasil.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for rows in batches:
+        writer.writerows([_text_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def encode_jsonl(columns, batches):
+    """Generator teks JSON Lines (satu objek per baris) per batch baris (tuple)"""
+    for rows in batches:
+        yield b''.join(dumps(dict(zip(columns, row))) + b'\n' for row in rows).decode('utf8')
+
+def _import_pyarrow():
+    """Import pyarrow dan pyarrow.parquet (dependency opsional untuk format parquet)"""
+    try:
+        return importlib.import_module('pyarrow'), importlib.import_module('pyarrow.parquet')
+    except ImportError:
+        raise ImportError("format='parquet' membutuhkan pyarrow (pip install pyarrow)") from None
+
+def _arrow_type(pyarrow, column_type):
+    """Tipe Arrow untuk satu kolom MySQL ([DATA_TYPE, COLUMN_TYPE, presisi, skala])"""
+    if column_type is None:
+        return pyarrow.string()
+    data_type, full_type, precision, scale = column_type
+    if data_type in _ARROW_INTEGER_TYPES:
+        bits = _ARROW_INTEGER_TYPES[data_type]
+        return getattr(pyarrow, f"uint{bits}" if 'unsigned' in full_type else f"int{bits}")()
+    if data_type in ('decimal', 'numeric'):
+        decimal = pyarrow.decimal128 if precision <= 38 else pyarrow.decimal256
+        return decimal(precision, scale)
+    if data_type in ('float', 'double', 'real'):
+        return pyarrow.float64()
+    if data_type == 'year':
+        return pyarrow.int16()
+    if data_type == 'date':
+        return pyarrow.date32()
+    if data_type in ('datetime', 'timestamp'):
+        return pyarrow.timestamp('us')
+    if data_type == 'time':
+        return pyarrow.duration('us')
+    if data_type in _BINARY_TYPES:
+        return pyarrow.binary()
+    return pyarrow.string()
+
+def _arrow_schema(columns, column_types):
+    """
+    Skema Parquet yang sama untuk semua part, dari tipe kolom information_schema
+
+    Tanpa skema eksplisit tipe disimpulkan per chunk: kolom yang seluruhnya
+    NULL di chunk pertama bertipe null dan presisi DECIMAL berbeda antar part
+    sehingga penggabungan gagal.
+
+    Returns:
+        pyarrow.Schema: Skema, None jika tipe kolom tidak diketahui (manifest lama)
+    """
+    if column_types is None:
+        return None
+    pyarrow, _ = _import_pyarrow()
+    return pyarrow.schema([(column, _arrow_type(pyarrow, column_type))
+                           for column, column_type in zip(columns, column_types)])
+
+def _counted(batches, counter):
+    """Teruskan batch sambil menghitung jumlah baris ke counter[0]"""
+    for rows in batches:
+        counter[0] += len(rows)
+        yield rows
+
+def _write_part(path, fmt, columns, batches, schema=None):
+    """Tulis batch baris (tuple) ke satu file part; mengembalikan jumlah baris"""
+    counter = [0]
+    batches = _counted(batches, counter)
+    if fmt == 'parquet':
+        pyarrow, parquet = _import_pyarrow()
+        values = [[] for _ in columns]
+        for rows in batches:
+            for column_values, new_values in zip(values, zip(*rows)):
+                column_values.extend(new_values)
+        parquet.write_table(pyarrow.table(dict(zip(columns, values)), schema=schema), path)
+        return counter[0]
+
+    with open(path, 'w', newline='', encoding='utf8') as handle:
+        if fmt == 'csv':
+            handle.writelines(encode_csv(columns, batches, header=False))
+        else:
+            handle.writelines(encode_jsonl(columns, batches))
+    return counter[0]
+
+def _merge_parts(part_paths, output_path, fmt, columns, schema=None):
+    """Gabungkan file part berurutan menjadi file output"""
+    if fmt == 'parquet':
+        pyarrow, parquet = _import_pyarrow()
+        writer = None
+        try:
+            for path in part_paths:
+                table = parquet.read_table(path)
+                if writer is None:
+                    writer = parquet.ParquetWriter(output_path, schema or table.schema)
+                if table.schema != writer.schema:
+                    # Part dari manifest lama (tanpa skema) bisa bertipe berbeda
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    with open(output_path, 'w', newline='', encoding='utf8') as output:
+        if fmt == 'csv':
+            csv.writer(output).writerow(columns)
+        for path in part_paths:
+            with open(path, 'r', newline='', encoding='utf8') as part:
+                shutil.copyfileobj(part, output)
+
+class TableExporter:
+    def __init__(self, pool, table, output_path, format='csv', columns=None,
+                 chunk_size=100000, workers=4, fetch_size=5000):
+        """
+        Inisialisasi export satu tabel
+
+        Args:
+            pool (MySQLSSHConnectionPool): Pool yang sudah connect; max_size
+                sebaiknya >= workers
+            table (str): Nama tabel (boleh format db.table)
+            output_path (str): File tujuan
+            format (str): 'csv', 'jsonl' atau 'parquet' (butuh pyarrow)
+            columns (list): Kolom yang diexport (default: semua)
+            chunk_size (int): Jumlah baris per chunk
+            workers (int): Jumlah chunk yang dibaca bersamaan
+            fetch_size (int): Jumlah baris per fetch dari server-side cursor
+
+        Raises:
+            ValueError: Jika format tidak dikenal atau ukuran tidak valid
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"format harus salah satu dari: {', '.join(EXPORT_FORMATS)}")
+        if chunk_size < 1 or workers < 1 or fetch_size < 1:
+            raise ValueError("chunk_size, workers dan fetch_size harus lebih dari 0")
+        if format == 'parquet':
+            _import_pyarrow()
+
+        self.pool = pool
+        self.table = table
+        self.output_path = output_path
+        self.format = format
+        self.columns = list(columns) if columns else None
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.fetch_size = fetch_size
+        self.manifest_path = output_path + '.manifest.json'
+        self.parts_dir = output_path + '.parts'
+        self._manifest_lock = threading.Lock()
+
+    def _part_path(self, index):
+        return os.path.join(self.parts_dir, f"part-{index:06d}.{self.format}")
+
+    def _schema(self, manifest):
+        """Skema Parquet export (None untuk format lain)"""
+        if self.format != 'parquet':
+            return None
+        return _arrow_schema(manifest['columns'], manifest.get('column_types'))
+
+    def _load_manifest(self):
+        """Manifest export sebelumnya untuk tabel dan format yang sama, None jika tidak ada"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if (manifest.get('table') != self.table or manifest.get('format') != self.format
+                or manifest.get('requested_columns') != self.columns):
+            logger.warning("Manifest export tidak cocok dengan konfigurasi sekarang, mulai dari awal")
+            return None
+        # Part yang tercatat selesai tapi filenya hilang dibaca ulang
+        manifest['done'] = [i for i in manifest['done'] if os.path.exists(self._part_path(i))]
+        return manifest
+
+    def _save_manifest(self, manifest):
+        """Tulis manifest secara atomik (file sementara lalu rename)"""
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf8') as handle:
+            json.dump(manifest, handle)
+        os.replace(temp_path, self.manifest_path)
+
+    def _plan(self):
+        """Buat manifest baru: kolom, key dan daftar rentang chunk"""
+        with self.pool.connection() as conn:
+            columns, key, low, column_types = _fetch_metadata(conn, self.table, self.columns)
+            if key is None:
+                logger.warning(f"{self.table} tidak punya primary key integer tunggal, export tanpa paralelisme")
+                chunks = [None]
+            else:
+                # Tabel kosong tetap menghasilkan satu part (header/skema saja)
+                chunks = _plan_chunks(conn, self.table, key, low, self.chunk_size) or [None]
+
+        return {
+            'table': self.table,
+            'format': self.format,
+            'requested_columns': self.columns,
+            'columns': columns,
+            'column_types': column_types,
+            'key': key,
+            'chunks': chunks,
+            'done': [],
+            'rows': {},
+        }
+
+    def _export_chunk(self, manifest, index):
+        """Baca satu rentang key dan tulis ke file part-nya"""
+        select_list = ', '.join(_quote_identifier(column) for column in manifest['columns'])
+        query = f"SELECT {select_list} FROM {_quote_identifier(self.table)}"
+        params = None
+        chunk = manifest['chunks'][index]
+        if chunk is not None:
+            key = _quote_identifier(manifest['key'])
+            start, end = chunk
+            if end is None:
+                query += f" WHERE {key} >= %s ORDER BY {key}"
+                params = (start,)
+            else:
+                query += f" WHERE {key} >= %s AND {key} < %s ORDER BY {key}"
+                params = (start, end)
+
+        part_path = self._part_path(index)
+        temp_path = part_path + '.tmp'
+        try:
+            with self.pool.connection() as conn:
+                # closing(): cursor di-drain sebelum koneksi kembali ke pool walau penulisan gagal
+                with closing(_stream_query(conn, query, params, self.fetch_size,
+                                           as_dict=False, chunked=True)) as batches:
+                    count = _write_part(temp_path, self.format, manifest['columns'], batches,
+                                        schema=self._schema(manifest))
+            os.replace(temp_path, part_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._manifest_lock:
+            manifest['done'].append(index)
+            manifest['rows'][str(index)] = count
+            self._save_manifest(manifest)
+        return count
+
+    def export(self):
+        """
+        Jalankan export (melanjutkan export sebelumnya jika manifest ada)
+
+        Returns:
+            dict: Statistik export (rows, chunks, resumed_chunks, output), None jika gagal.
+                Jika gagal, part yang selesai disimpan dan export bisa dilanjutkan
+                dengan memanggil export() lagi.
+        """
+        try:
+            manifest = self._load_manifest() or self._plan()
+            os.makedirs(self.parts_dir, exist_ok=True)
+            self._save_manifest(manifest)
+        except Exception as e:
+            logger.error(f"Gagal menyiapkan export {self.table}: {str(e)}")
+            return None
+
+        resumed = len(manifest['done'])
+        done = set(manifest['done'])
+        pending = [i for i in range(len(manifest['chunks'])) if i not in done]
+        if resumed:
+            logger.info(f"Melanjutkan export {self.table}: {resumed}/{len(manifest['chunks'])} chunk sudah selesai")
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='table-export') as executor:
+            futures = {executor.submit(self._export_chunk, manifest, i): i for i in pending}
+            for future, index in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(index)
+                    logger.error(f"Chunk {index} export {self.table} gagal: {str(e)}")
+
+        if errors:
+            logger.error(
+                f"Export {self.table} belum selesai ({len(errors)} chunk gagal), "
+                f"panggil export() lagi untuk melanjutkan"
+            )
+            return None
+
+        try:
+            part_paths = [self._part_path(i) for i in range(len(manifest['chunks']))]
+            _merge_parts(part_paths, self.output_path, self.format, manifest['columns'],
+                         schema=self._schema(manifest))
+        except Exception as e:
+            logger.error(f"Gagal menggabungkan part export {self.table}: {str(e)}")
+            return None
+
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        os.remove(self.manifest_path)
+        rows = sum(manifest['rows'].values())
+        logger.info(f"Export {self.table} selesai: {rows} baris ke {self.output_path}")
+        return {
+            'rows': rows,
+            'chunks': len(manifest['chunks']),
+            'resumed_chunks': resumed,
+            'output': self.output_path,
+        }
@@ -0,0 +1,275 @@
+"""
+Registry SSH tunnel bersama untuk seluruh proses
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Koneksi ke endpoint SSH yang sama (host, port, user, remote bind, kredensial,
+kompresi) memakai satu SSHTunnelForwarder dengan reference counting. Tunnel
+baru ditutup saat pemakai terakhir melepasnya.
+"""
+
+import hashlib
+import logging
+import threading
+
+from sshtunnel import SSHTunnelForwarder
+
+from .compression import tunnel_compression
+from .tunnel_monitor import TunnelMonitor, restart_tunnel
+
+logger = logging.getLogger(__name__)
+
+def _create_tunnel(ssh_config, mysql_config, compression=None):
+    """Membuat SSHTunnelForwarder (belum di-start) sesuai konfigurasi"""
+    return SSHTunnelForwarder(
+        (ssh_config['host'], ssh_config['port']),
+        ssh_username=ssh_config['username'],
+        ssh_password=ssh_config.get('password'),
+        ssh_pkey=ssh_config.get('private_key_path'),
+        ssh_private_key_password=ssh_config.get('private_key_password'),
+        remote_bind_address=(mysql_config['host'], mysql_config['port']),
+        local_bind_address=('127.0.0.1', 0),  # 0 untuk auto-assign port
+        set_keepalive=ssh_config.get('keepalive', 5.0),  # SSH keepalive (detik)
+        # None: ikuti opsi Compression di ~/.ssh/config
+        compression=None if compression is None else bool(compression)
+    )
+
+def _stop_quietly(tunnel):
+    """Stop tunnel tanpa melempar exception"""
+    try:
+        tunnel.stop()
+    except Exception as e:
+        logger.warning(f"Error saat menutup SSH tunnel: {str(e)}")
+
+class _TunnelEntry:
+    __slots__ = ('tunnel', 'refcount', 'lock', 'monitor')
+
+    def __init__(self):
+        self.tunnel = None
+        self.refcount = 0
+        self.monitor = None
+        # Lock per endpoint: handshake SSH tidak memblokir endpoint lain
+        self.lock = threading.Lock()
+
+class TunnelManager:
+    def __init__(self):
+        """Inisialisasi registry tunnel kosong"""
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @staticmethod
+    def make_key(ssh_config, mysql_config, compression=None):
+        """
+        Key tunnel: endpoint SSH, user, remote bind, kompresi dan digest kredensial
+
+        Kredensial ikut di-hash agar pemakai dengan password/key berbeda tidak
+        menumpang tunnel yang diautentikasi orang lain. Tunnel terkompresi dan
+        tidak terkompresi ke endpoint yang sama adalah tunnel terpisah.
+
+        Args:
+            compression (bool): None untuk mengikuti ssh_config['compression']
+                (mode 'auto' mulai tanpa kompresi; tanpa compression nilainya
+                tetap None agar ~/.ssh/config berlaku)
+        """
+        if compression is None:
+            compression = tunnel_compression(ssh_config)
+        secret = '\0'.join(str(ssh_config.get(field) or '') for field in
+                           ('password', 'private_key_path', 'private_key_password'))
+        return (
+            ssh_config['host'],
+            int(ssh_config['port']),
+            ssh_config['username'],
+            mysql_config['host'],
+            int(mysql_config['port']),
+            hashlib.sha256(secret.encode('utf8')).hexdigest(),
+            None if compression is None else bool(compression),
+        )
+
+    def acquire(self, ssh_config, mysql_config, compression=None):
+        """
+        Ambil tunnel untuk endpoint, membuat dan start tunnel baru jika belum ada
+
+        Args:
+            compression (bool): Kompresi transport SSH (None = ikuti ssh_config)
+
+        Returns:
+            SSHTunnelForwarder: Tunnel aktif (refcount bertambah satu)
+
+        Raises:
+            Exception: Error dari sshtunnel jika tunnel gagal dibuat
+        """
+        key = self.make_key(ssh_config, mysql_config, compression)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _TunnelEntry()
+            entry.refcount += 1
+
+        try:
+            with entry.lock:
+                if entry.tunnel is not None and entry.tunnel.is_active:
+                    logger.info(f"Memakai ulang SSH tunnel di port lokal: {entry.tunnel.local_bind_port}")
+                    return entry.tunnel
+
+                if entry.tunnel is not None:
+                    # Bangun ulang di objek yang sama agar pemakai lain ikut mendapat port baru
+                    if entry.monitor is not None:
+                        if not entry.monitor.check():
+                            raise ConnectionError("Gagal membangun ulang SSH tunnel")
+                    else:
+                        restart_tunnel(entry.tunnel)
+                    return entry.tunnel
+
+                tunnel = _create_tunnel(ssh_config, mysql_config, compression=key[-1])
+                tunnel.start()
+                entry.tunnel = tunnel
+                return tunnel
+        except Exception:
+            self._decrement(key, entry)
+            raise
+
+    def release(self, tunnel):
+        """
+        Lepas tunnel; tunnel di-stop jika tidak ada pemakai lain
+
+        Returns:
+            bool: True jika tunnel milik registry ini
+        """
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.tunnel is tunnel:
+                    break
+            else:
+                return False
+        self._decrement(key, entry)
+        return True
+
+    def _decrement(self, key, entry):
+        """Kurangi refcount dan stop tunnel saat refcount mencapai nol"""
+        with self._lock:
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+        with entry.lock:
+            if entry.monitor is not None:
+                entry.monitor.stop()
+                entry.monitor = None
+            if entry.tunnel is not None and entry.tunnel.is_active:
+                _stop_quietly(entry.tunnel)
+                logger.info("SSH tunnel bersama ditutup")
+
+    def get_monitor(self, tunnel, interval, max_backoff=300):
+        """
+        Monitor kesehatan bersama untuk tunnel di registry ini
+
+        Monitor dibuat sekali per tunnel dan berhenti otomatis saat tunnel
+        dilepas pemakai terakhir.
+
+        Returns:
+            TunnelMonitor: Monitor yang sudah berjalan, None jika tunnel bukan milik registry
+        """
+        with self._lock:
+            entry = next((e for e in self._entries.values() if e.tunnel is tunnel), None)
+        if entry is None:
+            return None
+        with entry.lock:
+            if entry.monitor is None:
+                entry.monitor = TunnelMonitor(tunnel, interval, max_backoff)
+                entry.monitor.shared = True
+                entry.monitor.start()
+            return entry.monitor
+
+    def stats(self):
+        """Daftar tunnel aktif beserta jumlah pemakainya"""
+        with self._lock:
+            return [
+                {
+                    'ssh_host': key[0],
+                    'ssh_port': key[1],
+                    'ssh_username': key[2],
+                    'remote_bind': f"{key[3]}:{key[4]}",
+                    'local_bind_port': entry.tunnel.local_bind_port if entry.tunnel is not None else None,
+                    'active': bool(entry.tunnel is not None and entry.tunnel.is_active),
+                    'refcount': entry.refcount,
+                    'compression': key[6],
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def close_all(self):
+        """Stop semua tunnel tanpa memperhatikan refcount (mis. saat shutdown)"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            with entry.lock:
+                if entry.monitor is not None:
+                    entry.monitor.stop()
+                    entry.monitor = None
+                if entry.tunnel is not None and entry.tunnel.is_active:
+                    _stop_quietly(entry.tunnel)
+
+_default_manager = TunnelManager()
+
+def get_tunnel_manager():
+    """Registry tunnel default untuk seluruh proses"""
+    return _default_manager
+
+def acquire_tunnel(ssh_config, mysql_config, shared=True, compression=None):
+    """
+    Ambil tunnel yang sudah di-start
+
+    Args:
+        shared (bool): True untuk memakai registry bersama, False untuk tunnel privat
+        compression (bool): Kompresi transport SSH (None = ikuti ssh_config['compression'])
+    """
+    if shared:
+        return get_tunnel_manager().acquire(ssh_config, mysql_config, compression)
+    if compression is None:
+        compression = tunnel_compression(ssh_config)
+    tunnel = _create_tunnel(ssh_config, mysql_config, compression=compression)
+    tunnel.start()
+    return tunnel
+
+def release_tunnel(tunnel, shared=True):
+    """Lepas tunnel yang diambil lewat acquire_tunnel"""
+    if tunnel is None:
+        return
+    if shared and get_tunnel_manager().release(tunnel):
+        return
+    if tunnel.is_active:
+        tunnel.stop()
+
+def watch_tunnel(tunnel, interval, shared=True):
+    """
+    Pasang monitor kesehatan pada tunnel yang diambil lewat acquire_tunnel
+
+    Returns:
+        TunnelMonitor: Monitor bersama (shared) atau monitor privat yang sudah berjalan
+    """
+    if shared:
+        monitor = get_tunnel_manager().get_monitor(tunnel, interval)
+        if monitor is not None:
+            return monitor
+    monitor = TunnelMonitor(tunnel, interval)
+    monitor.start()
+    return monitor
+
+def unwatch_tunnel(monitor, callback=None):
+    """Lepas listener dari monitor; monitor privat sekaligus dihentikan"""
+    if monitor is None:
+        return
+    if callback is not None:
+        monitor.remove_listener(callback)
+    if not monitor.shared:
+        monitor.stop()
@@ -0,0 +1,162 @@
+"""
+Monitor kesehatan SSH tunnel dengan reconnect proaktif
+
+Author: Julian Sukrisna
+Email: smallest87@gmail.com
+GitHub: https://github.com/smallest87
+Organization: Javasatu.com
+Created: 2025
+License: MIT
+
+Copyright (c) 2025 Julian Sukrisna. All rights reserved.
+
+Thread latar memeriksa transport SSH secara berkala. Jika sesi SSH putus
+(mis. bastion restart), forwarder dibangun ulang dengan exponential backoff
+dan listener diberi tahu agar koneksi MySQL lama diganti.
+"""
+
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Satu lock restart per tunnel: beberapa pemakai tidak me-restart bersamaan
+_restart_locks = weakref.WeakKeyDictionary()
+_restart_locks_guard = threading.Lock()
+
+def _restart_lock(tunnel):
+    with _restart_locks_guard:
+        lock = _restart_locks.get(tunnel)
+        if lock is None:
+            lock = _restart_locks[tunnel] = threading.Lock()
+        return lock
+
+def is_tunnel_healthy(tunnel):
+    """
+    Cek apakah transport SSH tunnel masih hidup
+
+    Selain status is_active, paket SSH_MSG_IGNORE dikirim agar socket yang
+    sudah putus tapi belum terdeteksi ikut ketahuan.
+    """
+    if tunnel is None or not tunnel.is_active:
+        return False
+    transport = getattr(tunnel, '_transport', None)
+    if transport is None:
+        return True
+    try:
+        transport.send_ignore()
+    except Exception:
+        return False
+    return transport.is_active()
+
+def restart_tunnel(tunnel):
+    """
+    Bangun ulang forwarder yang mati (port lokal bisa berubah)
+
+    Returns:
+        bool: True jika tunnel di-restart, False jika ternyata masih sehat
+
+    Raises:
+        Exception: Error dari sshtunnel jika restart gagal
+    """
+    with _restart_lock(tunnel):
+        # Pemakai lain mungkin sudah me-restart tunnel ini
+        if is_tunnel_healthy(tunnel):
+            return False
+        logger.warning("SSH tunnel terputus, membangun ulang forwarder...")
+        try:
+            tunnel.stop(force=True)
+        except Exception as e:
+            logger.debug(f"Error saat stop tunnel mati: {str(e)}")
+        tunnel.start()
+        logger.info(f"SSH tunnel berhasil dibangun ulang di port lokal: {tunnel.local_bind_port}")
+        return True
+
+class TunnelMonitor:
+    def __init__(self, tunnel, interval=10, max_backoff=300):
+        """
+        Inisialisasi monitor untuk satu SSH tunnel
+
+        Args:
+            tunnel (SSHTunnelForwarder): Tunnel yang dipantau
+            interval (float): Jeda pemeriksaan normal dalam detik
+            max_backoff (float): Jeda maksimum antar percobaan restart yang gagal
+        """
+        if interval <= 0:
+            raise ValueError("interval harus lebih dari 0")
+
+        self.tunnel = tunnel
+        self.interval = interval
+        self.max_backoff = max(max_backoff, interval)
+        self.restarts = 0
+        self.failures = 0
+        # True jika monitor dikelola TunnelManager (dipakai bersama)
+        self.shared = False
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """Daftarkan callback() yang dipanggil setelah tunnel dibangun ulang"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Hapus callback yang sebelumnya didaftarkan"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def check(self):
+        """
+        Satu kali pemeriksaan: restart tunnel jika mati lalu panggil listener
+
+        Returns:
+            bool: True jika tunnel sehat (atau berhasil dibangun ulang)
+        """
+        if is_tunnel_healthy(self.tunnel):
+            return True
+        try:
+            restart_tunnel(self.tunnel)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Gagal membangun ulang SSH tunnel: {str(e)}")
+            return False
+
+        self.restarts += 1
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error di listener tunnel monitor: {str(e)}")
+        return True
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop_event.wait(delay):
+            if self.check():
+                delay = self.interval
+            else:
+                # Exponential backoff agar bastion yang sedang down tidak dibanjiri
+                delay = min(delay * 2, self.max_backoff)
+                logger.info(f"Percobaan restart berikutnya dalam {delay:.0f} detik")
+
+    def start(self):
+        """Jalankan thread monitor (daemon)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ssh-tunnel-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Hentikan thread monitor"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.interval)
+        self._thread = None
@@ -0,0 +1,152 @@
+"""
+Unit tests untuk client asyncio MySQL SSH Connection
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import threading
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.async_connection import AsyncMySQLSSHConnection, AsyncMySQLSSHConnectionPool
+
+class TestAsyncMySQLSSHConnection(unittest.TestCase):
+    """Test cases untuk AsyncMySQLSSHConnection dan AsyncMySQLSSHConnectionPool"""
+
+    def setUp(self):
+        """Setup test fixtures"""
+        self.ssh_config = {
+            'host': 'test-server.com',
+            'port': 22,
+            'username': 'test_user',
+            'password': 'test_password',
+        }
+
+        self.mysql_config = {
+            'host': 'localhost',
+            'port': 3306,
+            'username': 'test_mysql_user',
+            'password': 'test_mysql_password',
+            'database': 'test_database',
+        }
+
+    def test_execute_runs_outside_event_loop_thread(self):
+        """Query blocking dijalankan di thread executor, bukan thread event loop"""
+        conn = AsyncMySQLSSHConnection(self.ssh_config, self.mysql_config)
+        threads = []
+
+        def fake_execute(query, params=None, result_format='dict', timeout=None):
+            threads.append(threading.current_thread())
+            return [{'query': query}]
+
+        conn.sync_connection.execute_query = fake_execute
+        conn.sync_connection.close = mock.MagicMock()
+
+        async def scenario():
+            result = await conn.execute("SELECT 1")
+            await conn.close()
+            return result
+
+        self.assertEqual(asyncio.run(scenario()), [{'query': "SELECT 1"}])
+        self.assertIsNot(threads[0], threading.main_thread())
+        conn.sync_connection.close.assert_called_once()
+
+    def test_stream_closes_generator_on_early_stop(self):
+        """Async streaming menutup generator sinkron saat iterasi dihentikan"""
+        conn = AsyncMySQLSSHConnection(self.ssh_config, self.mysql_config)
+        closed = []
+
+        def fake_stream(query, params=None, chunk_size=1000, as_dict=True, chunked=False):
+            try:
+                yield [{'id': 1}, {'id': 2}]
+                yield [{'id': 3}]
+            finally:
+                closed.append(True)
+
+        conn.sync_connection.execute_query_stream = fake_stream
+
+        async def scenario():
+            rows = [row async for row in conn.stream("SELECT id FROM t")]
+            stream = conn.stream("SELECT id FROM t")
+            first = await stream.__anext__()
+            await stream.aclose()
+            # Lock harus sudah dilepas sehingga query berikutnya bisa jalan,
+            # dan generator sinkron sudah ditutup sebelum query itu dikirim
+            closed_before_execute = []
+
+            def fake_execute(query, params=None, result_format='dict', timeout=None):
+                closed_before_execute.append(len(closed))
+                return 1
+            conn.sync_connection.execute_query = fake_execute
+            await asyncio.wait_for(conn.execute("DELETE FROM t"), timeout=1)
+            return rows, first, closed_before_execute
+
+        rows, first, closed_before_execute = asyncio.run(scenario())
+        self.assertEqual(rows, [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEqual(first, {'id': 1})
+        self.assertEqual(closed, [True, True])
+        self.assertEqual(closed_before_execute, [2])
+
+    def test_pool_runs_queries_concurrently(self):
+        """Pool async menjalankan query paralel sesuai max_size"""
+        pool = AsyncMySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=0, max_size=3)
+        barrier = threading.Barrier(3, timeout=2)
+
+        def fake_execute(query, params=None, result_format='dict', timeout=None):
+            # Ketiga query harus berjalan bersamaan agar barrier terlewati
+            barrier.wait()
+            return query
+
+        pool.pool.execute_query = fake_execute
+
+        async def scenario():
+            return await asyncio.gather(*(pool.execute(f"SELECT {i}") for i in range(3)))
+
+        self.assertEqual(asyncio.run(scenario()), ["SELECT 0", "SELECT 1", "SELECT 2"])
+
+    def test_pool_execute_waits_for_open_stream(self):
+        """execute() saat semua koneksi ditahan stream menunggu di loop, bukan di thread executor"""
+        pool = AsyncMySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=0, max_size=1)
+        # Checkout pool palsu: menunggu koneksi bebas sampai checkout timeout
+        checkout = threading.Semaphore(1)
+
+        def fake_execute(query, params=None, result_format='dict', timeout=None):
+            if not checkout.acquire(timeout=2):
+                return None
+            checkout.release()
+            return query
+
+        def fake_stream(query, params=None, chunk_size=1000, as_dict=True, chunked=False):
+            if not checkout.acquire(timeout=2):
+                return
+            try:
+                yield [{'id': 1}]
+                yield [{'id': 2}]
+            finally:
+                checkout.release()
+
+        pool.pool.execute_query = fake_execute
+        pool.pool.execute_query_stream = fake_stream
+
+        async def scenario():
+            stream = pool.stream("SELECT id FROM t")
+            rows = [await stream.__anext__()]
+            query = asyncio.ensure_future(pool.execute("SELECT 1"))
+            await asyncio.sleep(0.05)
+            # Fetch berikutnya tetap mendapat thread walau execute() sedang menunggu
+            rows += [row async for row in stream]
+            return rows, await asyncio.wait_for(query, timeout=1)
+
+        async def with_timeout():
+            return await asyncio.wait_for(scenario(), timeout=1.5)
+
+        rows, result = asyncio.run(with_timeout())
+        self.assertEqual(rows, [{'id': 1}, {'id': 2}])
+        self.assertEqual(result, "SELECT 1")
+
+if __name__ == '__main__':
+    unittest.main()
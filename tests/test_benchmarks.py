@@ -0,0 +1,35 @@
+"""
+Smoke test harness benchmark (fake SSH + fake MySQL server)
+"""
+
+import unittest
+import sys
+import os
+
+# Tambahkan path src dan benchmarks ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from run_benchmarks import run, compare
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test cases untuk run_benchmarks"""
+
+    def test_quick_run_and_compare(self):
+        """Benchmark berjalan lewat sshtunnel + pymysql asli dan hasilnya bisa dibandingkan"""
+        report = run(('small_query', 'large_result', 'bulk_insert'), quick=True)
+
+        results = report['results']
+        self.assertEqual(set(results), {'small_query', 'large_result', 'bulk_insert'})
+        self.assertEqual(results['large_result']['rows'], report['meta']['sizes']['large_result_rows'])
+        self.assertGreater(results['bulk_insert']['value'], 0)
+        self.assertEqual(results['small_query']['latency']['count'],
+                         report['meta']['sizes']['small_query_iterations'])
+
+        slower = {'results': {'bulk_insert': dict(results['bulk_insert'],
+                                                  value=results['bulk_insert']['value'] / 2)}}
+        _, regressions = compare(report, slower)
+        self.assertEqual(regressions, ['bulk_insert'])
+
+if __name__ == '__main__':
+    unittest.main()
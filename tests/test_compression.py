@@ -0,0 +1,127 @@
+"""
+Unit tests untuk kompresi SSH tunnel dan mode kompresi adaptif
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database import mysql_ssh_connection
+from database.compression import AdaptiveCompression, compression_mode, tunnel_compression
+from database.mysql_ssh_connection import MySQLSSHConnection
+
+MYSQL_CONFIG = {'host': 'localhost', 'port': 3306, 'username': 'user',
+                'password': 'secret', 'database': 'test_database'}
+
+def _ssh_config(**options):
+    return dict({'host': 'test-server.com', 'port': 22, 'username': 'test_user'}, **options)
+
+class TestCompressionMode(unittest.TestCase):
+    """Test cases untuk compression_mode dan AdaptiveCompression"""
+
+    def test_modes(self):
+        """Nilai compression divalidasi; kompresi protokol MySQL ditolak"""
+        self.assertIsNone(compression_mode(_ssh_config()))
+        self.assertIs(compression_mode(_ssh_config(compression=False)), False)
+        self.assertIs(compression_mode(_ssh_config(compression=True)), True)
+        self.assertEqual(compression_mode(_ssh_config(compression='auto')), 'auto')
+        # Tanpa pengaturan: None agar ~/.ssh/config berlaku; 'auto' mulai tanpa kompresi
+        self.assertEqual([tunnel_compression(_ssh_config(**options)) for options in
+                          ({}, {'compression': False}, {'compression': 'auto'}, {'compression': True})],
+                         [None, False, False, True])
+        with self.assertRaises(ValueError):
+            MySQLSSHConnection(_ssh_config(compression='zstd'), MYSQL_CONFIG)
+        for number in (0, 1):
+            with self.assertRaises(ValueError):
+                compression_mode(_ssh_config(compression=number))
+        with self.assertRaises(ValueError):
+            MySQLSSHConnection(_ssh_config(), dict(MYSQL_CONFIG, compression=True))
+
+    def test_adaptive_threshold(self):
+        """Kompresi menyala sekali setelah rata-rata hasil melewati ambang"""
+        adaptive = AdaptiveCompression(threshold=1000, min_samples=3)
+        self.assertFalse(adaptive.observe(5000))
+        self.assertFalse(adaptive.observe(5000))
+        self.assertTrue(adaptive.observe(5000))
+        self.assertFalse(adaptive.observe(5000))
+
+        adaptive = AdaptiveCompression(threshold=1000, min_samples=3)
+        self.assertFalse(any(adaptive.observe(100) for _ in range(10)))
+        self.assertFalse(adaptive.enabled)
+
+class TestAdaptiveConnection(unittest.TestCase):
+    """Test cases untuk MySQLSSHConnection dengan compression='auto'"""
+
+    def setUp(self):
+        self.tunnels = []
+
+        def acquire(ssh_config, mysql_config, shared=True, compression=None):
+            tunnel = mock.MagicMock(local_bind_port=40000 + len(self.tunnels))
+            tunnel.compression = compression
+            self.tunnels.append(tunnel)
+            return tunnel
+
+        def connect(mysql_config, local_port, **options):
+            connection = mock.MagicMock(bytes_received=0, bytes_sent=0)
+            cursor = connection.cursor.return_value.__enter__.return_value
+            cursor.fetchall.return_value = [{'id': 1}]
+
+            def execute(query, params=None):
+                connection.bytes_received += 100000 if 'big' in query else 100
+            cursor.execute.side_effect = execute
+            return connection
+
+        patchers = [
+            mock.patch('database.mysql_ssh_connection.acquire_tunnel', side_effect=acquire),
+            mock.patch('database.mysql_ssh_connection.release_tunnel'),
+            mock.patch('database.mysql_ssh_connection._connect_mysql', side_effect=connect),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_switches_after_large_results(self):
+        """Hasil besar memindahkan koneksi ke tunnel terkompresi di antara query"""
+        mysql_ssh = MySQLSSHConnection(_ssh_config(compression='auto', compression_threshold=60000),
+                                       MYSQL_CONFIG, ping_interval=None)
+        self.assertTrue(mysql_ssh.connect())
+        # None: acquire_tunnel mengikuti mode 'auto' (tunnel tanpa kompresi)
+        self.assertIsNone(self.tunnels[0].compression)
+
+        for _ in range(5):
+            mysql_ssh.execute_query("SELECT small")
+        self.assertEqual(len(self.tunnels), 1)
+
+        for _ in range(3):
+            mysql_ssh.execute_query("SELECT big")
+        self.assertFalse(mysql_ssh.compressed)
+        old_connection = mysql_ssh.connection
+        mysql_ssh.execute_query("SELECT small")
+        self.assertTrue(mysql_ssh.compressed)
+        self.assertIs(mysql_ssh.tunnel, self.tunnels[1])
+        self.assertTrue(self.tunnels[1].compression)
+        old_connection.close.assert_called_once()
+
+        # Tunnel lama baru dilepas saat close()
+        mysql_ssh_connection.release_tunnel.assert_not_called()
+        mysql_ssh.close()
+        self.assertEqual(mysql_ssh_connection.release_tunnel.call_count, 2)
+
+    def test_no_switch_inside_transaction(self):
+        """Pindah tunnel ditunda sampai transaksi selesai"""
+        mysql_ssh = MySQLSSHConnection(_ssh_config(compression='auto', compression_threshold=50000),
+                                       MYSQL_CONFIG, ping_interval=None)
+        mysql_ssh.connect()
+        with mysql_ssh.transaction():
+            for _ in range(4):
+                mysql_ssh.execute_query("SELECT big")
+            self.assertFalse(mysql_ssh.compressed)
+        mysql_ssh.execute_query("SELECT small")
+        self.assertTrue(mysql_ssh.compressed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Unit tests untuk pengelola koneksi per pemilik (session)
+"""
+
+import unittest
+import sys
+import os
+import threading
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.connection_manager import ConnectionManager
+
+SSH_CONFIG = {'host': 'bastion', 'port': 22, 'username': 'user'}
+
+def _mysql_config(host='db1'):
+    return {'host': host, 'port': 3306, 'username': 'u', 'password': 'p', 'database': 'app'}
+
+class _FakeConnection:
+    """MySQLSSHConnection palsu yang mencatat cancel dan close"""
+
+    def __init__(self, ssh_config, mysql_config, **options):
+        self.ssh_config = ssh_config
+        self.mysql_config = mysql_config
+        self.cancelled = 0
+        self.closed = False
+
+    def connect(self):
+        return self.mysql_config['host'] != 'down'
+
+    def cancel(self):
+        self.cancelled += 1
+        return 0
+
+    def close(self):
+        self.closed = True
+
+class TestConnectionManager(unittest.TestCase):
+    """Test cases untuk ConnectionManager"""
+
+    def setUp(self):
+        patcher = mock.patch('database.connection_manager.MySQLSSHConnection', _FakeConnection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = ConnectionManager(max_connections=3, max_tunnels=2, max_per_owner=2,
+                                         idle_timeout=60)
+        self.addCleanup(self.manager.close_all)
+
+    def test_limits(self):
+        """Batas per pemilik, tunnel dan global melempar RuntimeError; connect gagal tidak memakai slot"""
+        self.assertIsNone(self.manager.open(SSH_CONFIG, _mysql_config('down'), owner='a'))
+        self.manager.open(SSH_CONFIG, _mysql_config('db1'), owner='a')
+        self.manager.open(SSH_CONFIG, _mysql_config('db1'), owner='a')
+        with self.assertRaises(RuntimeError):
+            self.manager.open(SSH_CONFIG, _mysql_config('db1'), owner='a')
+
+        # Endpoint yang sama berbagi tunnel; endpoint ketiga melewati max_tunnels
+        self.manager.open(SSH_CONFIG, _mysql_config('db1'), owner='b')
+        with self.assertRaises(RuntimeError):
+            self.manager.open(SSH_CONFIG, _mysql_config('db2'), owner='c')
+        self.assertEqual(len(self.manager), 3)
+        self.assertEqual(self.manager.stats()['tunnels'], 1)
+
+    def test_owner_isolation(self):
+        """Koneksi hanya bisa diambil dan ditutup oleh pemiliknya"""
+        entry = self.manager.open(SSH_CONFIG, _mysql_config(), owner='a')
+        self.assertEqual(len(entry.id), 32)
+        self.assertIs(self.manager.get(entry.id, owner='a'), entry)
+        self.assertIsNone(self.manager.get(entry.id, owner='b'))
+        self.assertFalse(self.manager.close(entry.id, owner='b'))
+
+        listener = mock.Mock()
+        self.manager.add_close_listener(listener)
+        self.assertTrue(self.manager.close(entry.id, owner='a'))
+        listener.assert_called_once_with(entry)
+        self.assertTrue(entry.connection.closed)
+        self.assertIsNone(self.manager.get(entry.id, owner='a'))
+
+    def test_use_is_exclusive(self):
+        """Request kedua menunggu koneksi yang sedang dipakai lalu TimeoutError"""
+        entry = self.manager.open(SSH_CONFIG, _mysql_config(), owner='a')
+        with entry.use() as connection:
+            self.assertIs(connection, entry.connection)
+            self.assertTrue(entry.busy)
+            errors = []
+
+            def second_request():
+                try:
+                    with entry.use(timeout=0.05):
+                        pass
+                except TimeoutError as e:
+                    errors.append(e)
+            thread = threading.Thread(target=second_request)
+            thread.start()
+            thread.join()
+            self.assertEqual(len(errors), 1)
+        self.assertFalse(entry.busy)
+
+    def test_reap_skips_busy(self):
+        """Reaper menutup koneksi idle, bukan koneksi yang sedang dipakai"""
+        idle = self.manager.open(SSH_CONFIG, _mysql_config(), owner='a')
+        busy = self.manager.open(SSH_CONFIG, _mysql_config(), owner='b')
+        later = idle.last_used + 120
+        with busy.use():
+            self.assertEqual(self.manager.reap(now=later), 1)
+        self.assertTrue(idle.closed and idle.connection.closed)
+        self.assertFalse(busy.connection.closed)
+        with self.assertRaises(ConnectionError):
+            with idle.use():
+                pass
+
+        stats = self.manager.stats()
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['reaped'], 1)
+        self.assertEqual(stats['details'][0]['id'], busy.id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Unit tests untuk MySQL SSH Connection Pool
+"""
+
+import unittest
+import sys
+import os
+import threading
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.connection_pool import MySQLSSHConnectionPool
+from database.tunnel_manager import TunnelManager
+
+class TestMySQLSSHConnectionPool(unittest.TestCase):
+    """Test cases untuk MySQLSSHConnectionPool"""
+
+    def setUp(self):
+        """Setup test fixtures"""
+        self.ssh_config = {
+            'host': 'test-server.com',
+            'port': 22,
+            'username': 'test_user',
+            'password': 'test_password',
+        }
+
+        self.mysql_config = {
+            'host': 'localhost',
+            'port': 3306,
+            'username': 'test_mysql_user',
+            'password': 'test_mysql_password',
+            'database': 'test_database',
+        }
+
+        # Mock tunnel dan koneksi MySQL agar tidak butuh server nyata
+        tunnel = mock.MagicMock()
+        tunnel.local_bind_port = 40000
+        tunnel.is_active = True
+        self.tunnel = tunnel
+
+        patcher_tunnel = mock.patch('database.tunnel_manager._create_tunnel', return_value=tunnel)
+        patcher_manager = mock.patch('database.tunnel_manager._default_manager', TunnelManager())
+        patcher_mysql = mock.patch('database.connection_pool._connect_mysql',
+                                   side_effect=lambda *args, **kwargs: mock.MagicMock(open=True))
+        self.create_tunnel = patcher_tunnel.start()
+        self.connect_mysql = patcher_mysql.start()
+        patcher_manager.start()
+        self.addCleanup(patcher_manager.stop)
+        self.addCleanup(patcher_tunnel.stop)
+        self.addCleanup(patcher_mysql.stop)
+
+    def test_size_validation(self):
+        """Test validasi ukuran pool"""
+        with self.assertRaises(ValueError):
+            MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, max_size=0)
+        with self.assertRaises(ValueError):
+            MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=5, max_size=2)
+        with self.assertRaises(ValueError):
+            MySQLSSHConnectionPool({}, self.mysql_config)
+
+    def test_single_tunnel_for_all_connections(self):
+        """Semua koneksi pool memakai satu tunnel yang sama"""
+        pool = MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=2, max_size=4)
+        self.assertTrue(pool.connect())
+
+        conns = [pool.acquire() for _ in range(4)]
+        self.assertEqual(self.create_tunnel.call_count, 1)
+        self.assertEqual(self.connect_mysql.call_count, 4)
+        for call in self.connect_mysql.call_args_list:
+            self.assertEqual(call.args[1], 40000)
+
+        for conn in conns:
+            pool.release(conn)
+        self.assertEqual(pool.stats(), {'size': 4, 'idle': 4, 'in_use': 0, 'max_size': 4})
+
+        pool.close()
+        self.tunnel.stop.assert_called_once()
+
+    def test_checkout_timeout(self):
+        """Acquire melempar TimeoutError jika pool penuh"""
+        pool = MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=0, max_size=1)
+        pool.connect()
+        conn = pool.acquire()
+
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        # Koneksi yang dikembalikan dari thread lain membangunkan waiter
+        threading.Timer(0.05, pool.release, args=(conn,)).start()
+        self.assertIs(pool.acquire(timeout=2), conn)
+        pool.close()
+
+    def test_context_manager_rollback_on_error(self):
+        """Context manager rollback dan mengembalikan koneksi saat exception"""
+        pool = MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=1, max_size=1)
+        pool.connect()
+
+        with self.assertRaises(RuntimeError):
+            with pool.connection() as conn:
+                raise RuntimeError("boom")
+
+        conn.rollback.assert_called_once()
+        self.assertEqual(pool.stats()['idle'], 1)
+        pool.close()
+
+    def test_release_rolls_back_uncommitted_work(self):
+        """Tulis yang belum di-commit tidak terbawa ke peminjam berikutnya"""
+        pool = MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=1, max_size=1)
+        pool.connect()
+
+        with pool.connection() as conn:
+            conn.cursor().execute("UPDATE accounts SET balance = 0")
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+        # Koneksi yang gagal di-rollback tidak kembali ke pool
+        with pool.connection() as same:
+            self.assertIs(same, conn)
+            conn.rollback.side_effect = RuntimeError("connection lost")
+        conn.close.assert_called_once()
+        self.assertEqual(pool.stats()['idle'], 0)
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh, conn)
+        pool.close()
+
+    def test_idle_eviction_and_max_lifetime(self):
+        """Koneksi idle di atas min_size dan yang melewati max_lifetime ditutup"""
+        pool = MySQLSSHConnectionPool(self.ssh_config, self.mysql_config,
+                                      min_size=1, max_size=3, idle_timeout=10, max_lifetime=100)
+        pool.connect()
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+
+        now = [1000.0]
+        with mock.patch('database.connection_pool.time.monotonic', side_effect=lambda: now[0]):
+            for pooled in pool._idle:
+                pooled.created_at = pooled.last_used = 1000.0
+            now[0] = 1005.0
+            pool.release(pool.acquire())
+            self.assertEqual(pool.stats()['size'], 3)
+
+            # Lewat idle_timeout: hanya tersisa min_size
+            now[0] = 1020.0
+            conn = pool.acquire()
+            self.assertEqual(pool.stats()['size'], 1)
+            pool.release(conn)
+
+            # Lewat max_lifetime: koneksi lama diganti yang baru
+            now[0] = 1200.0
+            self.assertIsNot(pool.acquire(), conn)
+        pool.close()
+
+    def test_tunnel_restart_replaces_connections(self):
+        """Koneksi dari tunnel lama tidak dipakai lagi setelah tunnel dibangun ulang"""
+        pool = MySQLSSHConnectionPool(self.ssh_config, self.mysql_config, min_size=2, max_size=2)
+        pool.connect()
+        in_use = pool.acquire()
+
+        pool._on_tunnel_restarted()
+        self.assertEqual(pool.stats(), {'size': 1, 'idle': 0, 'in_use': 1, 'max_size': 2})
+
+        pool.release(in_use)
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertIsNot(pool.acquire(), in_use)
+        pool.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests untuk fan-out query multi-host
+"""
+
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.fanout import QueryFanout
+
+def _target(host, delay=0.0, error=None):
+    ssh_config = {'host': host, 'port': 22, 'username': 'user', 'delay': delay, 'error': error}
+    mysql_config = {'host': 'localhost', 'port': 3306, 'username': 'u', 'password': 'p', 'database': 'app'}
+    return ssh_config, mysql_config
+
+def _fake_acquire(ssh_config, mysql_config, shared=True):
+    time.sleep(ssh_config['delay'])
+    if ssh_config['error']:
+        raise RuntimeError(ssh_config['error'])
+    tunnel = mock.MagicMock()
+    tunnel.host = ssh_config['host']
+    return tunnel
+
+class TestQueryFanout(unittest.TestCase):
+    """Test cases untuk QueryFanout"""
+
+    def setUp(self):
+        patchers = [
+            mock.patch('database.fanout.acquire_tunnel', side_effect=_fake_acquire),
+            mock.patch('database.fanout.release_tunnel'),
+            mock.patch('database.fanout._connect_mysql', side_effect=lambda config, port, **options: options),
+            mock.patch('database.fanout._execute',
+                       side_effect=lambda connection, query, params, fmt: [{'timeout': connection['read_timeout']}]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_parallel_with_partial_failure(self):
+        """Target berjalan paralel; kegagalan satu target tidak menggagalkan lainnya"""
+        fanout = QueryFanout([
+            _target('shard-1', 0.2),
+            ('shard-2', *_target('shard-2', 0.2, error='Authentication failed')),
+            _target('shard-3', 0.2),
+        ], max_workers=3, timeout=5)
+
+        start = time.monotonic()
+        summary = fanout.execute("SELECT @@hostname")
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual((summary['succeeded'], summary['failed'], summary['timed_out']), (2, 1, 0))
+        first, second, third = summary['results']
+        self.assertEqual(first['target'], 'shard-1:22/app')
+        self.assertEqual(first['result'], [{'timeout': 5}])
+        self.assertEqual(second['target'], 'shard-2')
+        self.assertFalse(second['success'])
+        self.assertIn('Authentication failed', second['error'])
+        self.assertTrue(third['success'])
+
+    def test_timeout_counts_from_target_start(self):
+        """Target lambat dilaporkan timeout; target yang antre tidak ikut timeout"""
+        fanout = QueryFanout([_target('slow', 1.0), _target('fast-1', 0.1), _target('fast-2', 0.1)],
+                             max_workers=2, timeout=0.3)
+
+        outcomes = list(fanout.iter_execute("SELECT 1"))
+        by_name = {item['target'].split(':')[0]: item for item in outcomes}
+
+        self.assertTrue(by_name['slow']['timed_out'])
+        self.assertTrue(by_name['fast-1']['success'])
+        self.assertTrue(by_name['fast-2']['success'])
+        # Hasil mengalir sesuai urutan selesai, target lambat paling akhir
+        self.assertEqual(outcomes[-1]['target'], 'slow:22/app')
+
+    def test_invalid_arguments(self):
+        """Validasi target dan parameter"""
+        with self.assertRaises(ValueError):
+            QueryFanout([])
+        with self.assertRaises(ValueError):
+            QueryFanout([_target('a')], max_workers=0)
+        with self.assertRaises(ValueError):
+            QueryFanout([({'host': 'a'}, {})])
+        with self.assertRaises(ValueError):
+            QueryFanout([_target('a')]).execute("SELECT 1", result_format='xml')
+
+if __name__ == '__main__':
+    unittest.main()
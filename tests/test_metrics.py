@@ -0,0 +1,139 @@
+"""
+Unit tests untuk metrik latensi dan throughput
+"""
+
+import io
+import json
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pymysql
+from database import metrics
+from database.metrics import MetricsRegistry, MeteredConnection, get_metrics_registry
+from database.mysql_ssh_connection import MySQLSSHConnection
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases untuk Counter, Histogram dan exporter"""
+
+    def test_counter_labels(self):
+        """Counter dihitung per kombinasi label dan label wajib lengkap"""
+        registry = MetricsRegistry()
+        counter = registry.counter('queries_total', 'Jumlah query', ('status',))
+        counter.inc(status='success')
+        counter.inc(2, status='success')
+        counter.inc(status='error')
+
+        self.assertEqual(counter.value(status='success'), 3)
+        self.assertEqual(counter.value(status='error'), 1)
+        self.assertIs(registry.counter('queries_total', 'Jumlah query', ('status',)), counter)
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            counter.inc(-1, status='success')
+        with self.assertRaises(ValueError):
+            registry.histogram('queries_total', 'Bentrok')
+
+    def test_histogram_buckets_cumulative(self):
+        """Bucket histogram diekspor kumulatif dengan +Inf, sum dan count"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latensi', buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        [(labels, value)] = histogram.samples()
+        self.assertEqual(labels, {})
+        self.assertEqual(value['buckets'], [(0.1, 1), (1.0, 3), (float('inf'), 4)])
+        self.assertEqual(value['count'], 4)
+        self.assertAlmostEqual(value['sum'], 4.25)
+
+    def test_prometheus_and_json_exporters(self):
+        """Exporter bawaan Prometheus dan JSON, serta exporter kustom"""
+        registry = MetricsRegistry()
+        registry.counter('rows_total', 'Baris', ('kind',)).inc(10, kind='fetched')
+        registry.histogram('query_seconds', 'Latensi', ('statement',), buckets=(0.5,)).observe(
+            0.25, statement='SELECT')
+
+        text = registry.export('prometheus')
+        self.assertIn('# TYPE rows_total counter', text)
+        self.assertIn('rows_total{kind="fetched"} 10', text)
+        self.assertIn('query_seconds_bucket{statement="SELECT",le="0.5"} 1', text)
+        self.assertIn('query_seconds_bucket{statement="SELECT",le="+Inf"} 1', text)
+        self.assertIn('query_seconds_count{statement="SELECT"} 1', text)
+
+        snapshot = json.loads(registry.export('json'))
+        self.assertEqual(snapshot['rows_total']['samples'], [{'labels': {'kind': 'fetched'}, 'value': 10}])
+
+        registry.register_exporter('names', lambda reg: ','.join(m.name for m in reg.metrics()))
+        self.assertEqual(registry.export('names'), 'query_seconds,rows_total')
+        with self.assertRaises(ValueError):
+            registry.export('statsd')
+
+class TestConnectionMetrics(unittest.TestCase):
+    """Test cases untuk instrumentasi MySQLSSHConnection"""
+
+    def setUp(self):
+        get_metrics_registry().reset()
+        ssh_config = {'host': 'test-server.com', 'port': 22, 'username': 'test_user'}
+        mysql_config = {
+            'host': 'localhost', 'port': 3306, 'username': 'user',
+            'password': 'secret', 'database': 'test_database',
+        }
+        self.mysql_ssh = MySQLSSHConnection(ssh_config, mysql_config)
+        self.mysql_ssh.connection = mock.MagicMock()
+        self.mysql_ssh._last_activity = float('inf')
+        self.cursor = self.mysql_ssh.connection.cursor.return_value.__enter__.return_value
+
+    def test_execute_query_records_latency_and_rows(self):
+        """Query baca dan tulis tercatat per statement beserta jumlah baris"""
+        self.cursor.fetchall.return_value = [{'id': 1}, {'id': 2}]
+        self.mysql_ssh.execute_query("SELECT id FROM users")
+        self.cursor.rowcount = 5
+        self.mysql_ssh.execute_query("UPDATE users SET active = 1")
+
+        self.assertEqual(metrics.QUERIES_TOTAL.value(statement='SELECT', status='success'), 1)
+        self.assertEqual(metrics.QUERIES_TOTAL.value(statement='UPDATE', status='success'), 1)
+        self.assertEqual(metrics.ROWS_TOTAL.value(kind='fetched'), 2)
+        self.assertEqual(metrics.ROWS_TOTAL.value(kind='affected'), 5)
+        [(labels, value)] = [s for s in metrics.QUERY_SECONDS.samples() if s[0]['statement'] == 'SELECT']
+        self.assertEqual(value['count'], 1)
+
+    def test_retry_and_reconnect_counted(self):
+        """Retry setelah koneksi putus, reconnect dan error tercatat"""
+        self.cursor.execute.side_effect = [pymysql.err.OperationalError(2013, "Lost connection"), None]
+        self.cursor.fetchall.return_value = []
+        with mock.patch('database.mysql_ssh_connection.is_tunnel_healthy', return_value=True), \
+                mock.patch('database.mysql_ssh_connection._connect_mysql',
+                           return_value=self.mysql_ssh.connection):
+            self.mysql_ssh.tunnel = mock.MagicMock()
+            self.mysql_ssh.execute_query("SELECT 1")
+
+        self.assertEqual(metrics.RETRIES_TOTAL.value(), 1)
+        self.assertEqual(metrics.RECONNECTS_TOTAL.value(status='success'), 1)
+        self.assertEqual(metrics.QUERIES_TOTAL.value(statement='SELECT', status='success'), 1)
+
+        self.cursor.execute.side_effect = pymysql.err.ProgrammingError(1064, "syntax error")
+        self.mysql_ssh.execute_query("FROBNICATE")
+        self.assertEqual(metrics.QUERIES_TOTAL.value(statement='OTHER', status='error'), 1)
+
+    def test_metered_connection_counts_bytes(self):
+        """Byte protokol dihitung per koneksi lalu dipindahkan ke registry"""
+        connection = MeteredConnection(defer_connect=True)
+        connection._sock = mock.MagicMock()
+        connection._rfile = io.BytesIO(b'\x01\x00\x00\x00\xfe')
+        connection._write_bytes(b'ping')
+        connection._read_bytes(4)
+        connection._read_bytes(1)
+
+        self.assertEqual((connection.bytes_received, connection.bytes_sent), (5, 4))
+        metrics.record_transfer(connection)
+        self.assertEqual(metrics.BYTES_TOTAL.value(direction='received'), 5)
+        self.assertEqual(metrics.BYTES_TOTAL.value(direction='sent'), 4)
+        self.assertEqual((connection.bytes_received, connection.bytes_sent), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
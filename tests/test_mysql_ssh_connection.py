@@ -5,10 +5,12 @@ Unit tests untuk MySQL SSH Connection
 import unittest
 import sys
 import os
+from unittest import mock
 
 # Tambahkan path src ke Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import pymysql
 from database.mysql_ssh_connection import MySQLSSHConnection
 
 class TestMySQLSSHConnection(unittest.TestCase):
@@ -64,6 +66,211 @@ class TestMySQLSSHConnection(unittest.TestCase):
         with self.assertRaises(ValueError):
             MySQLSSHConnection(incomplete_ssh, self.mysql_config)
     
+    def _mock_connection(self, mysql_ssh, rows):
+        """Pasang koneksi palsu dengan cursor yang mengembalikan rows per fetchmany"""
+        cursor = mock.MagicMock()
+        chunks = [rows[i:i + 2] for i in range(0, len(rows), 2)] + [[]]
+        cursor.fetchmany.side_effect = chunks
+        mysql_ssh.connection = mock.MagicMock()
+        mysql_ssh.connection.cursor.return_value = cursor
+        return cursor
+    
+    def test_execute_query_stream(self):
+        """Test streaming memakai server-side cursor"""
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+        rows = [{'id': i} for i in range(5)]
+        cursor = self._mock_connection(mysql_ssh, rows)
+        
+        self.assertEqual(list(mysql_ssh.execute_query_stream("SELECT id FROM t", chunk_size=2)), rows)
+        mysql_ssh.connection.cursor.assert_called_once_with(pymysql.cursors.SSDictCursor)
+        cursor.fetchmany.assert_called_with(2)
+        cursor.close.assert_called_once()
+        
+        # Mode chunked dengan tuple
+        cursor = self._mock_connection(mysql_ssh, rows)
+        chunks = list(mysql_ssh.execute_query_stream("SELECT id FROM t", as_dict=False, chunked=True))
+        self.assertEqual(chunks, [rows[0:2], rows[2:4], rows[4:5]])
+        mysql_ssh.connection.cursor.assert_called_once_with(pymysql.cursors.SSCursor)
+        
+        # Header nama kolom sebelum chunk pertama
+        cursor = self._mock_connection(mysql_ssh, rows)
+        cursor.description = [('id', 3, None, 11, 11, 0, False)]
+        chunks = list(mysql_ssh.execute_query_stream("SELECT id FROM t", as_dict=False, chunked=True,
+                                                     with_header=True))
+        self.assertEqual(chunks[0], ('id',))
+        self.assertEqual(chunks[1:], [rows[0:2], rows[2:4], rows[4:5]])
+    
+    def test_execute_query_stream_early_stop(self):
+        """Cursor tetap ditutup jika konsumen berhenti lebih awal"""
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+        cursor = self._mock_connection(mysql_ssh, [{'id': i} for i in range(6)])
+        
+        stream = mysql_ssh.execute_query_stream("SELECT id FROM t", chunk_size=2)
+        self.assertEqual(next(stream), {'id': 0})
+        stream.close()
+        cursor.close.assert_called_once()
+    
+    def test_bulk_insert_batches_by_packet_size(self):
+        """Bulk insert dipecah menjadi multi-row INSERT sesuai batas packet"""
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+        mysql_ssh.connection = mock.MagicMock()
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.mogrify.side_effect = lambda template, row: template % tuple(repr(v) for v in row)
+        executed = []
+        cursor.execute.side_effect = lambda sql: executed.append(sql)
+        cursor.rowcount = 2
+        
+        prefix = "INSERT INTO `db`.`users` (`id`, `name`) VALUES "
+        mysql_ssh._max_packet_size = len(prefix) + 2 * len("(1, 'aa'),")
+        rows = ((i, 'aa') for i in range(6))
+        
+        self.assertEqual(mysql_ssh.bulk_insert('db.users', ['id', 'name'], rows), 6)
+        self.assertEqual(executed, [
+            prefix + "(0, 'aa'),(1, 'aa')",
+            prefix + "(2, 'aa'),(3, 'aa')",
+            prefix + "(4, 'aa'),(5, 'aa')",
+        ])
+        self.assertEqual(mysql_ssh.connection.commit.call_count, 3)
+    
+    def test_bulk_insert_failure_rolls_back(self):
+        """Bulk insert mengembalikan None dan rollback jika gagal"""
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+        mysql_ssh.connection = mock.MagicMock()
+        mysql_ssh._max_packet_size = 1024
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.mogrify.return_value = "(1)"
+        cursor.execute.side_effect = pymysql.err.IntegrityError(1062, "Duplicate entry")
+        
+        self.assertIsNone(mysql_ssh.bulk_insert('users', ['id'], [(1,)]))
+        mysql_ssh.connection.rollback.assert_called_once()
+    
+    def test_ping_only_when_idle(self):
+        """Ping hanya dikirim jika koneksi idle lebih dari ping_interval"""
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config, ping_interval=30)
+        mysql_ssh.connection = mock.MagicMock()
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [{'id': 1}]
+        
+        with mock.patch('database.mysql_ssh_connection.time.monotonic', return_value=1000.0):
+            mysql_ssh._last_activity = 990.0
+            self.assertEqual(mysql_ssh.execute_query("SELECT 1"), [{'id': 1}])
+            mysql_ssh.connection.ping.assert_not_called()
+            
+            mysql_ssh._last_activity = 900.0
+            mysql_ssh.execute_query("SELECT 1")
+            mysql_ssh.connection.ping.assert_called_once_with(reconnect=True)
+    
+    def test_retry_only_on_connection_error(self):
+        """Reconnect dan retry hanya untuk error koneksi terputus"""
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+        mysql_ssh.connection = mock.MagicMock()
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        mysql_ssh._last_activity = float('inf')
+        
+        # Error syntax: tidak ada reconnect
+        cursor.execute.side_effect = pymysql.err.ProgrammingError(1064, "syntax error")
+        with mock.patch.object(mysql_ssh, '_reconnect') as reconnect:
+            self.assertIsNone(mysql_ssh.execute_query("SELEC 1"))
+            reconnect.assert_not_called()
+        
+        # Koneksi terputus: reconnect lalu retry berhasil
+        cursor.execute.side_effect = [pymysql.err.OperationalError(2013, "Lost connection"), None]
+        cursor.fetchall.return_value = [{'id': 1}]
+        with mock.patch.object(mysql_ssh, '_reconnect', return_value=True) as reconnect:
+            self.assertEqual(mysql_ssh.execute_query("SELECT 1"), [{'id': 1}])
+            reconnect.assert_called_once()
+    
+    def _mock_writer(self):
+        mysql_ssh = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+        mysql_ssh.connection = mock.MagicMock()
+        mysql_ssh._last_activity = float('inf')
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.rowcount = 1
+        return mysql_ssh, cursor
+    
+    @staticmethod
+    def _statements(cursor):
+        return [call[0][0] for call in cursor.execute.call_args_list]
+    
+    def test_transaction_commits_once(self):
+        """Tulis di dalam transaction() di-commit sekali di akhir, rollback jika exception"""
+        mysql_ssh, cursor = self._mock_writer()
+        with mysql_ssh.transaction(isolation_level='read_committed'):
+            self.assertTrue(mysql_ssh.in_transaction)
+            mysql_ssh.execute_query("UPDATE a SET x = 1")
+            mysql_ssh.execute_query("UPDATE b SET y = 2")
+            mysql_ssh.connection.commit.assert_not_called()
+        self.assertFalse(mysql_ssh.in_transaction)
+        mysql_ssh.connection.commit.assert_called_once()
+        self.assertEqual(self._statements(cursor)[:2],
+                         ["SET TRANSACTION ISOLATION LEVEL READ COMMITTED", "START TRANSACTION"])
+        
+        with self.assertRaises(KeyError):
+            with mysql_ssh.transaction():
+                mysql_ssh.execute_query("UPDATE a SET x = 1")
+                raise KeyError("batal")
+        mysql_ssh.connection.rollback.assert_called_once()
+        self.assertEqual(mysql_ssh.connection.commit.call_count, 1)
+        
+        with self.assertRaises(ValueError):
+            with mysql_ssh.transaction(isolation_level='SNAPSHOT'):
+                pass
+    
+    def test_transaction_reraises_without_retry(self):
+        """Error query di dalam transaksi dilempar tanpa reconnect"""
+        mysql_ssh, cursor = self._mock_writer()
+        with mock.patch.object(mysql_ssh, '_reconnect') as reconnect:
+            with self.assertRaises(pymysql.err.OperationalError):
+                with mysql_ssh.transaction():
+                    cursor.execute.side_effect = pymysql.err.OperationalError(2013, "Lost connection")
+                    mysql_ssh.execute_query("UPDATE a SET x = 1")
+            reconnect.assert_not_called()
+        mysql_ssh.connection.commit.assert_not_called()
+    
+    def test_nested_transaction_uses_savepoint(self):
+        """Blok bersarang memakai SAVEPOINT dan hanya membatalkan perubahannya sendiri"""
+        mysql_ssh, cursor = self._mock_writer()
+        with mysql_ssh.transaction():
+            mysql_ssh.execute_query("INSERT INTO a VALUES (1)")
+            with self.assertRaises(RuntimeError):
+                with mysql_ssh.transaction():
+                    mysql_ssh.execute_query("INSERT INTO a VALUES (2)")
+                    raise RuntimeError("batal")
+            with mysql_ssh.transaction():
+                mysql_ssh.execute_query("INSERT INTO a VALUES (3)")
+        self.assertEqual(self._statements(cursor), [
+            "START TRANSACTION",
+            "INSERT INTO a VALUES (1)",
+            "SAVEPOINT sp_1",
+            "INSERT INTO a VALUES (2)",
+            "ROLLBACK TO SAVEPOINT sp_1",
+            "SAVEPOINT sp_1",
+            "INSERT INTO a VALUES (3)",
+            "RELEASE SAVEPOINT sp_1",
+        ])
+        mysql_ssh.connection.commit.assert_called_once()
+        mysql_ssh.connection.rollback.assert_not_called()
+    
+    def test_batch_commits_groups_writes(self):
+        """batch_commits meng-commit per size tulis, sisa di akhir blok"""
+        mysql_ssh, cursor = self._mock_writer()
+        mysql_ssh.query_cache = mock.MagicMock()
+        with mysql_ssh.batch_commits(size=2):
+            for number in range(5):
+                mysql_ssh.execute_query("INSERT INTO a VALUES (%s)", (number,))
+            self.assertEqual(mysql_ssh.connection.commit.call_count, 2)
+            cursor.fetchall.return_value = [{'n': 5}]
+            mysql_ssh.execute_query("SELECT COUNT(*) AS n FROM a")
+        self.assertEqual(mysql_ssh.connection.commit.call_count, 3)
+        # Baca yang melihat tulis belum ter-commit tidak disimpan ke cache
+        mysql_ssh.query_cache.get.assert_not_called()
+        mysql_ssh.query_cache.set.assert_not_called()
+        
+        with self.assertRaises(RuntimeError):
+            with mysql_ssh.transaction():
+                with mysql_ssh.batch_commits():
+                    pass
+    
     # Note: Test koneksi aktual memerlukan server yang nyata
     # Untuk testing yang lebih komprehensif, gunakan mock objects
 
@@ -0,0 +1,197 @@
+"""
+Unit tests untuk paginasi hasil query
+"""
+
+import re
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.pagination import QueryPager, parse_keyset_query, build_keyset_query
+
+TABLE = [{'id': i, 'name': f"user{i}"} for i in range(1, 24)]
+
+def _keyset_connection():
+    """MySQLSSHConnection palsu yang menjalankan query keyset terhadap TABLE"""
+    mysql_ssh = mock.MagicMock()
+
+    def execute_query(query, params=None, timeout=None):
+        limit = int(re.search(r"LIMIT (\d+)$", query).group(1))
+        rows = TABLE
+        if '`id` > %s' in query:
+            rows = [row for row in rows if row['id'] > params[-1]]
+        return [dict(row) for row in rows[:limit]]
+
+    mysql_ssh.execute_query.side_effect = execute_query
+    return mysql_ssh
+
+def _cursor_connection(rows):
+    """MySQLSSHConnection palsu dengan koneksi tambahan ber-cursor server-side"""
+    mysql_ssh = mock.MagicMock()
+    session = {'database': 'app'}
+
+    def execute_query(query, params=None, use_cache=True, result_format='dict', timeout=None):
+        if query.startswith('USE '):
+            session['database'] = query[4:]
+            return 0
+        return [(session['database'], 'STRICT_TRANS_TABLES', '+07:00')]
+
+    mysql_ssh.execute_query.side_effect = execute_query
+    side = mysql_ssh.open_side_connection.return_value
+    cursor = side.cursor.return_value
+    cursor.description = [('id',), ('name',)]
+    remaining = list(rows)
+
+    def fetchmany(size):
+        chunk = remaining[:size]
+        del remaining[:size]
+        return chunk
+
+    cursor.fetchmany.side_effect = fetchmany
+    return mysql_ssh, side
+
+class TestKeysetRewrite(unittest.TestCase):
+    """Test cases untuk parse dan rewrite keyset"""
+
+    def test_parse(self):
+        """SELECT satu tabel dikenali, konstruksi kompleks ditolak"""
+        parts = parse_keyset_query("SELECT * FROM db.`users` WHERE name LIKE 'a%' ORDER BY id DESC;")
+        self.assertEqual(parts['table'], 'db.`users`')
+        self.assertEqual(parts['where'], "name LIKE 'a%'")
+        self.assertEqual(parts['order'], 'id')
+        self.assertTrue(parts['descending'])
+
+        self.assertIsNotNone(parse_keyset_query("SELECT * FROM t WHERE note = 'no limit'"))
+        self.assertEqual(parse_keyset_query("SELECT * FROM t WHERE note = 'order by id'")['where'],
+                         "note = 'order by id'")
+        for query in ["SELECT * FROM users WHERE active = 1 ORDER BY name, id",
+                      "SELECT * FROM users WHERE active = 1 ORDER BY RAND()",
+                      "SELECT * FROM users WHERE active = 1 ORDER BY LENGTH(name)",
+                      "SELECT * FROM users ORDER BY name, id","SELECT * FROM a JOIN b ON a.id = b.a_id",
+                      "SELECT * FROM t LIMIT 10",
+                      "SELECT * FROM t WHERE id IN (SELECT id FROM u)",
+                      "SELECT * FROM t u WHERE u.id = 1",
+                      "SELECT status, COUNT(*) FROM t GROUP BY status"]:
+            self.assertIsNone(parse_keyset_query(query), query)
+
+    def test_build(self):
+        """Halaman berikutnya menambah kondisi key dan meng-escape % tanpa parameter"""
+        parts = parse_keyset_query("SELECT * FROM t WHERE name LIKE 'a%' OR id = 1")
+        query, params = build_keyset_query(parts, 'id', None, after=10, limit=51)
+        self.assertEqual(query, "SELECT * FROM t WHERE (name LIKE 'a%%' OR id = 1) AND `id` > %s "
+                                "ORDER BY `id` ASC LIMIT 51")
+        self.assertEqual(params, (10,))
+
+class TestQueryPager(unittest.TestCase):
+    """Test cases untuk QueryPager"""
+
+    def setUp(self):
+        """Primary key palsu untuk semua tabel"""
+        patcher = mock.patch('database.pagination._primary_key_columns', return_value=[('id', 'int')])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_keyset_pages(self):
+        """Keyset: setiap halaman mulai setelah key terakhir halaman sebelumnya"""
+        pager = QueryPager(page_size=10)
+        mysql_ssh = _keyset_connection()
+
+        page = pager.start(mysql_ssh, "SELECT * FROM users")
+        self.assertEqual(page['mode'], 'keyset')
+        self.assertEqual([row['id'] for row in page['rows']], list(range(1, 11)))
+        self.assertTrue(page['has_more'])
+
+        ids = [row['id'] for row in page['rows']]
+        while page['cursor']:
+            page = pager.next_page(page['cursor'])
+            ids += [row['id'] for row in page['rows']]
+        self.assertEqual(ids, [row['id'] for row in TABLE])
+        self.assertEqual(page['row_count'], 23)
+        self.assertEqual(pager.stats()['open'], 0)
+        mysql_ssh.open_side_connection.assert_not_called()
+
+    def test_token_bound_to_owner(self):
+        """Token paginasi tidak bisa dipakai koneksi lain"""
+        pager = QueryPager(page_size=10)
+        mysql_ssh, other = _keyset_connection(), _keyset_connection()
+        token = pager.start(mysql_ssh, "SELECT * FROM users")['cursor']
+
+        self.assertIsNone(pager.next_page(token, owner=other))
+        other.execute_query.assert_not_called()
+        page = pager.next_page(token, owner=mysql_ssh)
+        self.assertEqual([row['id'] for row in page['rows']], list(range(11, 21)))
+
+    def test_cursor_mode_with_row_cap(self):
+        """Query tanpa key memakai cursor ditahan; batas baris memotong hasil"""
+        pager = QueryPager(page_size=10, max_rows=15)
+        mysql_ssh, side = _cursor_connection(TABLE)
+        query = "SELECT name, id FROM users ORDER BY name"
+
+        page = pager.start(mysql_ssh, query)
+        self.assertEqual(page['mode'], 'cursor')
+        self.assertEqual(page['columns'], ['id', 'name'])
+        self.assertEqual(len(page['rows']), 10)
+        self.assertEqual(pager.stats()['cursor'], 1)
+
+        page = pager.next_page(page['cursor'])
+        # Baris lookahead halaman pertama tidak hilang
+        self.assertEqual([row['id'] for row in page['rows']], list(range(11, 16)))
+        self.assertTrue(page['truncated'])
+        self.assertFalse(page['has_more'])
+        self.assertIsNone(page['cursor'])
+        side.close.assert_called_once()
+
+    def test_multi_column_order_uses_cursor(self):
+        """WHERE dengan ORDER BY multi-kolom tidak ditulis ulang menjadi keyset"""
+        pager = QueryPager(page_size=10)
+        mysql_ssh, side = _cursor_connection(TABLE)
+
+        page = pager.start(mysql_ssh, "SELECT * FROM users WHERE active = 1 ORDER BY name, id")
+        self.assertEqual(page['mode'], 'cursor')
+        self.assertEqual([row['id'] for row in page['rows']], list(range(1, 11)))
+        # Koneksi utama hanya ditanya state sesinya, query tidak ditulis ulang
+        self.assertEqual(mysql_ssh.execute_query.call_count, 1)
+        side.cursor.return_value.execute.assert_called_once()
+
+    def test_cursor_follows_session_schema(self):
+        """Setelah USE di koneksi utama, cursor di koneksi tambahan membaca schema yang sama"""
+        pager = QueryPager(page_size=10)
+        mysql_ssh, side = _cursor_connection(TABLE)
+        mysql_ssh.execute_query("USE other_db")
+
+        page = pager.start(mysql_ssh, "SELECT name, id FROM users ORDER BY name")
+        self.assertEqual(page['mode'], 'cursor')
+        side.select_db.assert_called_once_with('other_db')
+        session_cursor = side.cursor.return_value.__enter__.return_value
+        session_cursor.execute.assert_called_once_with(
+            "SET SESSION sql_mode = %s, time_zone = %s", ('STRICT_TRANS_TABLES', '+07:00'))
+        # State sesi disalin sebelum query paginasi dijalankan
+        names = [call[0] for call in side.mock_calls]
+        self.assertLess(names.index('select_db'), names.index('cursor().execute'))
+
+    def test_cursor_timeout_bounds_execute_only(self):
+        """Mode cursor tidak memakai hint MAX_EXECUTION_TIME; timeout lewat KILL QUERY saat execute"""
+        pager = QueryPager(page_size=10)
+        mysql_ssh, side = _cursor_connection(TABLE)
+        query = "SELECT name, id FROM users ORDER BY name"
+
+        pager.start(mysql_ssh, query, timeout=5)
+        side.cursor.return_value.execute.assert_called_once_with(query, None)
+        mysql_ssh.track_query.assert_called_once_with(side, 5)
+
+    def test_expired_cursor(self):
+        """Token yang idle melewati ttl ditutup dan tidak bisa dipakai lagi"""
+        pager = QueryPager(page_size=5, ttl=60)
+        mysql_ssh, side = _cursor_connection(TABLE)
+        with mock.patch('database.pagination.time.monotonic', return_value=1000):
+            token = pager.start(mysql_ssh, "SELECT name FROM users")['cursor']
+        with mock.patch('database.pagination.time.monotonic', return_value=1061):
+            self.assertIsNone(pager.next_page(token))
+        side.close.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
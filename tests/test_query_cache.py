@@ -0,0 +1,108 @@
+"""
+Unit tests untuk Query Cache
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.query_cache import QueryCache, normalize_query, extract_read_tables, extract_write_tables
+from database.mysql_ssh_connection import MySQLSSHConnection
+
+class TestQueryCache(unittest.TestCase):
+    """Test cases untuk QueryCache"""
+
+    def test_normalize_query_keeps_literals(self):
+        """Whitespace diringkas kecuali di dalam literal"""
+        self.assertEqual(normalize_query("SELECT  *\n FROM t WHERE a = 'x  y' ;"),
+                         "SELECT * FROM t WHERE a = 'x  y'")
+
+    def test_table_extraction(self):
+        """Ekstraksi tabel untuk query baca dan tulis"""
+        self.assertEqual(extract_read_tables("SELECT * FROM db.users u JOIN `orders` o ON u.id = o.uid"),
+                         {'users', 'orders'})
+        self.assertEqual(extract_read_tables("SELECT * FROM a, b WHERE a.x = 'FROM c'"), {'a', 'b'})
+        self.assertEqual(extract_write_tables("INSERT IGNORE INTO users (a) VALUES (1)"), {'users'})
+        self.assertEqual(extract_write_tables("UPDATE users u JOIN orders o ON 1 SET u.a = 1"),
+                         {'users', 'orders'})
+        self.assertEqual(extract_write_tables("DELETE FROM `db`.`logs` WHERE id = 1"), {'logs'})
+        self.assertEqual(extract_write_tables("SET @a = 1"), frozenset())
+
+    def test_ttl_and_counters(self):
+        """Entry kadaluarsa setelah TTL dan counter hit/miss bertambah"""
+        cache = QueryCache(default_ttl=10)
+        with mock.patch('database.query_cache.time.monotonic', return_value=100.0):
+            self.assertIsNone(cache.get("SELECT * FROM t"))
+            cache.set("SELECT * FROM t", None, [{'id': 1}])
+            self.assertEqual(cache.get("SELECT  *  FROM t;"), [{'id': 1}])
+        with mock.patch('database.query_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get("SELECT * FROM t"))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 2, 0))
+
+    def test_lru_eviction_by_bytes(self):
+        """Entry paling lama tidak dipakai dibuang saat melewati max_bytes"""
+        row = [{'payload': 'x' * 1000}]
+        cache = QueryCache(max_bytes=3000)
+        cache.set("SELECT 1 FROM a", None, row)
+        cache.set("SELECT 1 FROM b", None, row)
+        cache.get("SELECT 1 FROM a")
+        cache.set("SELECT 1 FROM c", None, row)
+
+        self.assertIsNotNone(cache.get("SELECT 1 FROM a"))
+        self.assertIsNone(cache.get("SELECT 1 FROM b"))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_write_invalidates_table(self):
+        """Statement tulis menghapus entry tabel terkait saja"""
+        cache = QueryCache()
+        cache.set("SELECT * FROM users", None, [])
+        cache.set("SELECT * FROM orders", None, [])
+        cache.set("SHOW TABLES", None, [])
+
+        cache.invalidate_for_write("UPDATE users SET a = 1")
+        self.assertIsNone(cache.get("SELECT * FROM users"))
+        self.assertIsNotNone(cache.get("SELECT * FROM orders"))
+        self.assertIsNotNone(cache.get("SHOW TABLES"))
+
+        cache.invalidate_for_write("CREATE TABLE new_table (id INT)")
+        self.assertIsNone(cache.get("SHOW TABLES"))
+        self.assertIsNotNone(cache.get("SELECT * FROM orders"))
+
+    def test_uncacheable_and_copy(self):
+        """Query non-deterministik tidak di-cache dan hasil cache tidak bisa diubah pemanggil"""
+        cache = QueryCache()
+        self.assertFalse(cache.set("SELECT NOW()", None, [{'now': 1}]))
+        cache.set("SELECT * FROM t", None, [{'id': 1}])
+        cache.get("SELECT * FROM t")[0]['id'] = 99
+        self.assertEqual(cache.get("SELECT * FROM t"), [{'id': 1}])
+
+    def test_connection_uses_cache(self):
+        """MySQLSSHConnection hanya ke server saat cache miss"""
+        ssh_config = {'host': 'h', 'port': 22, 'username': 'u'}
+        mysql_config = {'host': 'localhost', 'port': 3306, 'username': 'u', 'password': 'p', 'database': 'd'}
+        mysql_ssh = MySQLSSHConnection(ssh_config, mysql_config, query_cache=QueryCache())
+        mysql_ssh.connection = mock.MagicMock()
+        mysql_ssh._last_activity = float('inf')
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [{'Database': 'd'}]
+        cursor.rowcount = 1
+
+        mysql_ssh.execute_query("SELECT * FROM users")
+        mysql_ssh.execute_query("SELECT * FROM users")
+        self.assertEqual(cursor.execute.call_count, 1)
+
+        mysql_ssh.execute_query("DELETE FROM users WHERE id = 1")
+        mysql_ssh.execute_query("SELECT * FROM users")
+        self.assertEqual(cursor.execute.call_count, 3)
+
+        # Tulis dan baca yang tidak bisa di-cache tidak dicari di cache
+        mysql_ssh.execute_query("SELECT NOW()")
+        self.assertEqual((mysql_ssh.query_cache.hits, mysql_ssh.query_cache.misses), (1, 2))
+
+if __name__ == '__main__':
+    unittest.main()
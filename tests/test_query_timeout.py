@@ -0,0 +1,126 @@
+"""
+Unit tests untuk batas waktu query dan pembatalan KILL QUERY
+"""
+
+import unittest
+import sys
+import os
+import time
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pymysql
+from database import metrics
+from database.mysql_ssh_connection import MySQLSSHConnection
+from database.query_timeout import RunningQueries, add_max_execution_time
+
+class TestMaxExecutionTimeHint(unittest.TestCase):
+    """Test cases untuk add_max_execution_time"""
+
+    def test_hint_only_for_top_level_select(self):
+        """Hint disisipkan setelah SELECT level teratas saja"""
+        self.assertEqual(add_max_execution_time("SELECT a FROM t", 1.5),
+                         "SELECT /*+ MAX_EXECUTION_TIME(1500) */ a FROM t")
+        self.assertEqual(add_max_execution_time("-- laporan\n select 1", 0.0001),
+                         "-- laporan\n select /*+ MAX_EXECUTION_TIME(1) */ 1")
+        self.assertIsNone(add_max_execution_time("(SELECT 1) UNION (SELECT 2)", 1))
+        self.assertIsNone(add_max_execution_time("UPDATE t SET a = 1", 1))
+        self.assertIsNone(add_max_execution_time("SELECT /*+ MAX_EXECUTION_TIME(10) */ 1", 1))
+
+    def test_hint_merged_into_existing_hint_comment(self):
+        """Hint optimizer milik query tetap berlaku: MAX_EXECUTION_TIME masuk ke blok yang sama"""
+        self.assertEqual(add_max_execution_time("SELECT /*+ BKA(t) */ a FROM t", 1),
+                         "SELECT /*+ BKA(t) MAX_EXECUTION_TIME(1000) */ a FROM t")
+        self.assertEqual(add_max_execution_time("SELECT\n  /*+ NO_ICP(t) JOIN_ORDER(t, u) */ *\nFROM t", 2),
+                         "SELECT /*+ NO_ICP(t) JOIN_ORDER(t, u) MAX_EXECUTION_TIME(2000) */ *\nFROM t")
+
+class TestRunningQueries(unittest.TestCase):
+    """Test cases untuk RunningQueries"""
+
+    def setUp(self):
+        self.killer = mock.MagicMock()
+        self.kill_cursor = self.killer.cursor.return_value.__enter__.return_value
+        self.running = RunningQueries(lambda: self.killer)
+        self.connection = mock.MagicMock()
+        self.connection.thread_id.return_value = 42
+
+    def test_timeout_kills_query(self):
+        """Timer mengirim KILL QUERY ke thread koneksi setelah timeout"""
+        with self.running.track(self.connection, timeout=0.05) as query:
+            time.sleep(0.3)
+        self.assertEqual(query.reason, 'timeout')
+        self.kill_cursor.execute.assert_called_once_with("KILL QUERY %s", (42,))
+        self.killer.close.assert_called_once()
+
+        # Query yang selesai sebelum timeout tidak dihentikan
+        self.kill_cursor.execute.reset_mock()
+        with self.running.track(self.connection, timeout=0.05):
+            pass
+        time.sleep(0.1)
+        self.kill_cursor.execute.assert_not_called()
+
+    def test_cancel_running_queries(self):
+        """cancel() hanya menghentikan query yang masih berjalan, sekali saja"""
+        with self.running.track(self.connection) as query:
+            self.assertEqual(len(self.running), 1)
+            self.assertEqual(self.running.cancel(), 1)
+            self.assertEqual(self.running.cancel(), 0)
+        self.assertEqual(query.reason, 'cancel')
+        self.assertEqual(len(self.running), 0)
+        self.assertEqual(self.running.cancel(), 0)
+
+class TestExecuteQueryTimeout(unittest.TestCase):
+    """Test cases untuk execute_query(timeout=...)"""
+
+    def setUp(self):
+        metrics.get_metrics_registry().reset()
+        self.mysql_ssh = MySQLSSHConnection(
+            {'host': 'test-server.com', 'port': 22, 'username': 'test_user'},
+            {'host': 'localhost', 'port': 3306, 'username': 'user',
+             'password': 'secret', 'database': 'test_database'},
+        )
+        self.mysql_ssh.connection = mock.MagicMock()
+        self.mysql_ssh._last_activity = float('inf')
+        self.cursor = self.mysql_ssh.connection.cursor.return_value.__enter__.return_value
+
+    def test_select_uses_hint(self):
+        """SELECT dikirim dengan hint; error 3024 mengembalikan None tanpa retry"""
+        self.cursor.execute.side_effect = pymysql.err.OperationalError(
+            3024, "maximum statement execution time exceeded")
+        with mock.patch.object(self.mysql_ssh, '_reconnect') as reconnect:
+            self.assertIsNone(self.mysql_ssh.execute_query("SELECT SLEEP(10)", timeout=2))
+            reconnect.assert_not_called()
+        self.cursor.execute.assert_called_once_with(
+            "SELECT /*+ MAX_EXECUTION_TIME(2000) */ SLEEP(10)", None)
+        self.assertEqual(metrics.QUERY_CANCELS_TOTAL.value(reason='timeout'), 1)
+        self.assertEqual(self.mysql_ssh.last_error.args[0], 3024)
+
+        self.cursor.execute.side_effect = None
+        self.cursor.fetchall.return_value = []
+        self.assertEqual(self.mysql_ssh.execute_query("SELECT 1", timeout=2), [])
+        self.assertIsNone(self.mysql_ssh.last_error)
+        with self.assertRaises(ValueError):
+            self.mysql_ssh.execute_query("SELECT 1", timeout=0)
+
+    def test_write_killed_after_timeout(self):
+        """Statement selain SELECT dihentikan dengan KILL QUERY lewat koneksi tambahan"""
+        killer = mock.MagicMock()
+        kill_cursor = killer.cursor.return_value.__enter__.return_value
+
+        def slow_update(query, params):
+            time.sleep(0.3)
+            if kill_cursor.execute.called:
+                raise pymysql.err.OperationalError(1317, "Query execution was interrupted")
+            return 1
+        self.cursor.execute.side_effect = slow_update
+
+        self.mysql_ssh._running.open_connection = lambda: killer
+        self.assertIsNone(self.mysql_ssh.execute_query("UPDATE t SET a = 1", timeout=0.05))
+        kill_cursor.execute.assert_called_once()
+        self.mysql_ssh.connection.rollback.assert_called_once()
+        self.assertEqual(metrics.QUERY_CANCELS_TOTAL.value(reason='timeout'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
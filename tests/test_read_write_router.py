@@ -0,0 +1,124 @@
+"""
+Unit tests untuk read/write router primary + replica
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+import pymysql
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.read_write_router import ReadWriteRouter
+
+SSH_CONFIG = {'host': 'bastion', 'port': 22, 'username': 'user'}
+
+def _mysql_config(host):
+    return {'host': host, 'port': 3306, 'username': 'u', 'password': 'p', 'database': 'app'}
+
+class _FakeNode:
+    """MySQLSSHConnection palsu dengan lag replikasi yang bisa diatur"""
+
+    def __init__(self, ssh_config, mysql_config, query_cache=None, **options):
+        self.name = mysql_config['host']
+        self.connection = None
+        self.in_transaction = False
+        self.lag = 0
+        self.read_error = None
+        self.last_error = None
+        self.executed = []
+
+    def connect(self):
+        self.connection = object()
+        return True
+
+    def execute_query(self, query, params=None, use_cache=True, result_format='dict', timeout=None):
+        if query.startswith('SHOW REPLICA STATUS'):
+            return [{'Seconds_Behind_Source': self.lag}]
+        self.executed.append(query)
+        self.last_error = self.read_error
+        if self.read_error is not None:
+            return None
+        return [{'node': self.name}] if query.startswith('SELECT') else 1
+
+    def close(self):
+        self.connection = None
+
+class TestReadWriteRouter(unittest.TestCase):
+    """Test cases untuk ReadWriteRouter"""
+
+    def setUp(self):
+        patcher = mock.patch('database.read_write_router.MySQLSSHConnection', _FakeNode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReadWriteRouter(SSH_CONFIG, _mysql_config('primary'),
+                                      [_mysql_config('replica-1'), _mysql_config('replica-2')],
+                                      max_replica_lag=5, lag_check_interval=0)
+        self.assertTrue(self.router.connect())
+        self.replica_1, self.replica_2 = (replica.connection for replica in self.router.replicas)
+
+    def _node_for(self, query="SELECT 1"):
+        return self.router.execute_query(query)[0]['node']
+
+    def test_reads_balanced_writes_to_primary(self):
+        """Baca round-robin ke replica, tulis ke primary"""
+        self.assertEqual([self._node_for() for _ in range(4)],
+                         ['replica-1', 'replica-2', 'replica-1', 'replica-2'])
+        self.assertEqual(self.router.execute_query("UPDATE t SET a = 1"), 1)
+        self.assertEqual(self.router.primary.executed, ["UPDATE t SET a = 1"])
+
+    def test_lagging_replica_excluded(self):
+        """Replica yang lag-nya lewat batas atau replikasinya berhenti tidak dipakai"""
+        self.replica_1.lag = 30
+        self.assertEqual({self._node_for() for _ in range(3)}, {'replica-2'})
+        self.replica_2.lag = None
+        self.assertEqual(self._node_for(), 'primary')
+        self.assertEqual([replica['healthy'] for replica in self.router.stats()['replicas']], [False, False])
+
+    def test_transaction_and_pinning_use_primary(self):
+        """Baca di dalam transaction() atau blok use_primary dikirim ke primary"""
+        with self.router.use_primary():
+            self.assertEqual(self._node_for(), 'primary')
+        self.assertEqual(self._node_for(), 'replica-1')
+
+        # transaction() primary: baca di dalamnya ikut ke primary
+        self.router.primary.in_transaction = True
+        self.assertEqual(self._node_for(), 'primary')
+        self.assertTrue(self.router.stats()['in_transaction'])
+        self.router.primary.in_transaction = False
+        self.assertEqual(self._node_for(), 'replica-2')
+
+    def test_read_after_write_window_and_failover(self):
+        """Baca setelah tulis ke primary selama window; koneksi replica putus diulang di primary"""
+        self.router.read_after_write_window = 60
+        self.router.execute_query("INSERT INTO t VALUES (1)")
+        self.assertEqual(self._node_for(), 'primary')
+
+        self.router.read_after_write_window = 0
+        self.replica_1.read_error = pymysql.err.OperationalError(2013, "Lost connection")
+        self.assertEqual(self._node_for(), 'primary')
+        self.assertEqual(self.replica_1.executed, ["SELECT 1"])
+
+    def test_interrupted_read_not_retried(self):
+        """Baca yang dihentikan timeout atau error SQL di replica tidak diulang di primary"""
+        self.router.lag_check_interval = 60
+        self._node_for()
+        self._node_for()
+        replica_1 = self.router.replicas[0]
+        last_check = replica_1.last_check
+
+        self.replica_1.read_error = pymysql.err.OperationalError(3024, "maximum statement execution time exceeded")
+        self.assertIsNone(self.router.execute_query("SELECT SLEEP(10)", timeout=1))
+        self.assertEqual(self.router.primary.executed, [])
+        self.assertEqual(replica_1.last_check, last_check)
+
+        self.replica_2.read_error = pymysql.err.ProgrammingError(1146, "Table 'app.x' doesn't exist")
+        self.assertIsNone(self.router.execute_query("SELECT * FROM x"))
+        self.assertEqual(self.router.primary.executed, [])
+        self.assertEqual(self.router.primary_queries, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Unit tests untuk encoder JSON hasil query
+"""
+
+import datetime
+import decimal
+import json
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database import result_encoder
+from database.result_encoder import dumps, format_timedelta
+
+ROW = {
+    'created_at': datetime.datetime(2025, 8, 1, 10, 30, 0, 250000),
+    'birthday': datetime.date(1990, 5, 17),
+    'opens_at': datetime.time(8, 0),
+    'duration': datetime.timedelta(days=1, hours=2, minutes=3, seconds=4),
+    'price': decimal.Decimal('12345678901234567890.12'),
+    'name': 'Café',
+    'avatar': b'\x89PNG',
+    'token': b'abc',
+    'tags': {'b', 'a'},
+    'deleted_at': None,
+}
+
+EXPECTED = {
+    'created_at': '2025-08-01T10:30:00.250000',
+    'birthday': '1990-05-17',
+    'opens_at': '08:00:00',
+    'duration': '26:03:04',
+    'price': '12345678901234567890.12',
+    'name': 'Café',
+    'avatar': '0x89504e47',
+    'token': 'abc',
+    'tags': ['a', 'b'],
+    'deleted_at': None,
+}
+
+class TestResultEncoder(unittest.TestCase):
+    """Test cases untuk result_encoder"""
+
+    def test_all_column_types(self):
+        """Semua tipe kolom MySQL diserialisasi tanpa mengubah baris"""
+        row = dict(ROW)
+        self.assertEqual(json.loads(dumps({'data': [row]})), {'data': [EXPECTED]})
+        self.assertEqual(row, ROW)
+
+    def test_stdlib_fallback(self):
+        """Tanpa orjson hasilnya sama lewat modul json standar"""
+        with mock.patch.object(result_encoder, '_orjson', None):
+            self.assertEqual(result_encoder.backend(), 'json')
+            self.assertEqual(json.loads(dumps([ROW])), [EXPECTED])
+            self.assertEqual(dumps({'a': 1}), b'{"a":1}')
+
+    def test_negative_time(self):
+        """TIME negatif dan pecahan detik mengikuti format MySQL"""
+        self.assertEqual(format_timedelta(-datetime.timedelta(hours=1, microseconds=5)), '-01:00:00.000005')
+
+    def test_unknown_type(self):
+        """Tipe yang tidak dikenal tetap ditolak"""
+        with self.assertRaises(TypeError):
+            dumps({'x': object()})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Unit tests untuk format hasil query (tuple, columnar, numpy, pandas)
+"""
+
+import importlib.util
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pymysql
+from database.result_formats import (
+    fetch_result, column_names, cursor_class_for, validate_result_format
+)
+from database.mysql_ssh_connection import MySQLSSHConnection
+from database.query_cache import QueryCache
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+ROWS = [(1, 'alice', 10.5), (2, 'bob', 7.25), (3, 'carol', 3.0)]
+
+def _fake_cursor(rows=ROWS, names=('id', 'name', 'score')):
+    """Cursor tuple palsu yang mengembalikan rows lewat fetchmany/fetchall"""
+    cursor = mock.MagicMock()
+    cursor.description = [(name, None, None, None, None, None, None) for name in names]
+    remaining = list(rows)
+
+    def fetchmany(size):
+        chunk = remaining[:size]
+        del remaining[:size]
+        return chunk
+
+    cursor.fetchmany.side_effect = fetchmany
+    cursor.fetchall.side_effect = lambda: tuple(fetchmany(len(remaining)))
+    return cursor
+
+class TestResultFormats(unittest.TestCase):
+    """Test cases untuk fetch_result"""
+
+    def test_tuple_and_columnar(self):
+        """Tuple mengembalikan list baris, columnar dibangun per chunk"""
+        self.assertEqual(fetch_result(_fake_cursor(), 'tuple'), ROWS)
+
+        cursor = _fake_cursor()
+        result = fetch_result(cursor, 'columnar', chunk_size=2)
+        self.assertEqual(result, {
+            'id': [1, 2, 3],
+            'name': ['alice', 'bob', 'carol'],
+            'score': [10.5, 7.25, 3.0],
+        })
+        self.assertEqual(cursor.fetchmany.call_count, 3)
+
+    def test_duplicate_column_names(self):
+        """Kolom kembar (mis. join) tidak saling menimpa"""
+        cursor = _fake_cursor(rows=[(1, 2)], names=('id', 'id'))
+        self.assertEqual(column_names(cursor), ['id', 'id_2'])
+
+    def test_validation_and_cursor_class(self):
+        """Format tidak dikenal ditolak, hanya 'dict' memakai DictCursor"""
+        with self.assertRaises(ValueError):
+            validate_result_format('xml')
+        self.assertIs(cursor_class_for('dict'), pymysql.cursors.DictCursor)
+        self.assertIs(cursor_class_for('columnar'), pymysql.cursors.Cursor)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy tidak terpasang")
+    def test_numpy_structured_array(self):
+        """Structured array dengan dtype per kolom"""
+        result = fetch_result(_fake_cursor(), 'numpy', chunk_size=2)
+        self.assertEqual(result.dtype.names, ('id', 'name', 'score'))
+        self.assertEqual(result['score'].sum(), 20.75)
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas tidak terpasang")
+    def test_pandas_dataframe(self):
+        """DataFrame dibangun dari kolom tanpa dict per baris"""
+        result = fetch_result(_fake_cursor(), 'pandas')
+        self.assertEqual(list(result.columns), ['id', 'name', 'score'])
+        self.assertEqual(len(result), 3)
+
+    @unittest.skipIf(HAS_PANDAS, "pandas terpasang")
+    def test_missing_optional_dependency(self):
+        """Format pandas tanpa pandas terpasang memberi ImportError yang jelas"""
+        with self.assertRaises(ImportError):
+            validate_result_format('pandas')
+
+    def test_execute_query_caches_per_format(self):
+        """execute_query memakai cursor tuple dan cache terpisah per format"""
+        ssh_config = {'host': 'h', 'port': 22, 'username': 'u', 'password': 'p'}
+        mysql_config = {'host': 'localhost', 'port': 3306, 'username': 'u', 'password': 'p', 'database': 'd'}
+        mysql_ssh = MySQLSSHConnection(ssh_config, mysql_config, query_cache=QueryCache())
+        mysql_ssh.connection = mock.MagicMock()
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchmany.side_effect = _fake_cursor().fetchmany
+        cursor.description = _fake_cursor().description
+
+        query = "SELECT id, name, score FROM users"
+        result = mysql_ssh.execute_query(query, result_format='columnar')
+        self.assertEqual(result['id'], [1, 2, 3])
+        mysql_ssh.connection.cursor.assert_called_with(pymysql.cursors.Cursor)
+
+        result['id'].append(4)
+        self.assertEqual(mysql_ssh.execute_query(query, result_format='columnar')['id'], [1, 2, 3])
+        self.assertIsNone(mysql_ssh.query_cache.get(query))
+        self.assertEqual(mysql_ssh.connection.cursor.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
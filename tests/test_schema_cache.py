@@ -0,0 +1,109 @@
+"""
+Unit tests untuk cache metadata skema
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.schema_cache import SchemaCache
+
+CATALOG = {
+    'SCHEMATA': [('app',), ('information_schema',)],
+    'TABLES': [
+        ('orders', 'BASE TABLE', 'InnoDB', 120000, 16384000, 4096000, 'utf8mb4_general_ci', ''),
+        ('users', 'BASE TABLE', 'InnoDB', 500, 65536, 16384, 'utf8mb4_general_ci', 'akun'),
+    ],
+    'COLUMNS': [
+        ('orders', 'id', 'bigint unsigned', 'bigint', 'NO', None, 'PRI', 'auto_increment'),
+        ('orders', 'user_id', 'int', 'int', 'NO', None, 'MUL', ''),
+        ('users', 'id', 'int', 'int', 'NO', None, 'PRI', 'auto_increment'),
+        ('users', 'email', 'varchar(255)', 'varchar', 'YES', None, 'UNI', ''),
+    ],
+    'STATISTICS': [
+        ('orders', 'PRIMARY', 0, 'id', 'BTREE'),
+        ('orders', 'idx_user_created', 1, 'user_id', 'BTREE'),
+        ('orders', 'idx_user_created', 1, 'created_at', 'BTREE'),
+        ('users', 'PRIMARY', 0, 'id', 'BTREE'),
+    ],
+}
+
+def _fake_connection():
+    """MySQLSSHConnection palsu yang menjawab query information_schema dari CATALOG"""
+    mysql_ssh = mock.MagicMock()
+    mysql_ssh.mysql_config = {'database': 'app'}
+
+    def execute_query(query, params=None, use_cache=True, result_format='dict'):
+        for view, rows in CATALOG.items():
+            if f"information_schema.{view} " in query:
+                return list(rows)
+        raise AssertionError(query)
+
+    mysql_ssh.execute_query.side_effect = execute_query
+    return mysql_ssh
+
+class TestSchemaCache(unittest.TestCase):
+    """Test cases untuk SchemaCache"""
+
+    def test_catalog_loaded_with_three_queries(self):
+        """Tabel, kolom dan index semua tabel dimuat sekali lalu dilayani dari memori"""
+        mysql_ssh = _fake_connection()
+        schema = SchemaCache(mysql_ssh)
+
+        self.assertEqual(schema.tables(), ['orders', 'users'])
+        self.assertEqual(mysql_ssh.execute_query.call_count, 3)
+
+        orders = schema.table('ORDERS')
+        self.assertEqual(orders['rows'], 120000)
+        self.assertEqual([column['name'] for column in orders['columns']], ['id', 'user_id'])
+        self.assertEqual(schema.indexes('orders'), [
+            {'name': 'PRIMARY', 'unique': True, 'type': 'BTREE', 'columns': ['id']},
+            {'name': 'idx_user_created', 'unique': False, 'type': 'BTREE',
+             'columns': ['user_id', 'created_at']},
+        ])
+        self.assertTrue(schema.columns('users')[1]['nullable'])
+        self.assertIsNone(schema.table('missing'))
+        self.assertEqual(len(schema.tables(details=True)), 2)
+        self.assertEqual(mysql_ssh.execute_query.call_count, 3)
+
+        # Semua query introspeksi melewati query cache dan memakai tuple
+        for call in mysql_ssh.execute_query.call_args_list:
+            self.assertEqual(call.kwargs, {'use_cache': False, 'result_format': 'tuple'})
+
+    def test_ttl_refresh_and_invalidate(self):
+        """Katalog dimuat ulang setelah TTL, refresh() atau invalidate()"""
+        mysql_ssh = _fake_connection()
+        schema = SchemaCache(mysql_ssh, ttl=60)
+
+        with mock.patch('database.schema_cache.time.monotonic', return_value=1000):
+            schema.tables()
+            self.assertEqual(schema.databases(), ['app', 'information_schema'])
+        with mock.patch('database.schema_cache.time.monotonic', return_value=1059):
+            schema.tables()
+            schema.databases()
+        self.assertEqual(schema.loads, 1)
+        with mock.patch('database.schema_cache.time.monotonic', return_value=1061):
+            schema.tables()
+        self.assertEqual(schema.loads, 2)
+
+        self.assertTrue(schema.refresh())
+        self.assertEqual(schema.loads, 3)
+        schema.invalidate('app')
+        schema.tables()
+        self.assertEqual(schema.loads, 4)
+
+    def test_failure_returns_none(self):
+        """Query introspeksi gagal dilaporkan sebagai None, tidak di-cache"""
+        mysql_ssh = _fake_connection()
+        mysql_ssh.execute_query.side_effect = lambda *args, **kwargs: None
+        schema = SchemaCache(mysql_ssh)
+        self.assertIsNone(schema.tables())
+        self.assertIsNone(schema.databases())
+        self.assertEqual(schema.stats()['schemas'], [])
+
+if __name__ == '__main__':
+    unittest.main()
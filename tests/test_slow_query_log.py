@@ -0,0 +1,133 @@
+"""
+Unit tests untuk slow-query log dan execute hook
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pymysql
+from database.mysql_ssh_connection import MySQLSSHConnection
+from database.slow_query_log import SlowQueryLog, fingerprint, fingerprint_id, server_seconds
+
+def _fake_connection():
+    mysql_ssh = MySQLSSHConnection(
+        {'host': 'test-server.com', 'port': 22, 'username': 'test_user'},
+        {'host': 'localhost', 'port': 3306, 'username': 'user',
+         'password': 'secret', 'database': 'test_database'},
+    )
+    mysql_ssh.connection = mock.MagicMock()
+    mysql_ssh._last_activity = float('inf')
+    return mysql_ssh
+
+class TestFingerprint(unittest.TestCase):
+    """Test cases untuk normalisasi SQL"""
+
+    def test_literals_and_lists_normalized(self):
+        """Literal, placeholder dan daftar IN/VALUES diringkas"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t1  WHERE id = 42 AND name = 'x -- y' -- komentar\n"),
+            "select * from t1 where id = ? and name = ?"
+        )
+        self.assertEqual(
+            fingerprint("select a from t where id IN (1, 2, 3) and b = %s"),
+            "select a from t where id in(?+) and b = ?"
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t (a, b) VALUES (1, 'a'), (2, 'b');"),
+            "insert into t (a, b) values(?+)"
+        )
+        self.assertEqual(fingerprint_id("SELECT 1"), fingerprint_id("select   2"))
+        self.assertNotEqual(fingerprint_id("SELECT 1"), fingerprint_id("SELECT 1 FROM t"))
+
+class TestSlowQueryLog(unittest.TestCase):
+    """Test cases untuk SlowQueryLog"""
+
+    def _event(self, query='SELECT * FROM orders WHERE id = 1', duration=2.0, error=None):
+        return {
+            'query': query, 'params': None, 'statement': query.split()[0].upper(),
+            'result_format': 'dict', 'duration': duration, 'rows': 1, 'attempts': 1, 'error': error,
+        }
+
+    def test_threshold_and_ring_buffer(self):
+        """Hanya query di atas threshold dicatat, entry tertua dibuang"""
+        log = SlowQueryLog(threshold=1.0, capacity=2, explain=False, server_timing=False)
+        mysql_ssh = mock.MagicMock()
+        log._after_execute(mysql_ssh, self._event(duration=0.5))
+        for number in range(3):
+            log._after_execute(mysql_ssh, self._event(f'SELECT * FROM orders WHERE id = {number}'))
+
+        entries = log.entries()
+        self.assertEqual([entry['query'] for entry in entries],
+                         ['SELECT * FROM orders WHERE id = 2', 'SELECT * FROM orders WHERE id = 1'])
+        self.assertEqual(log.stats()['total_recorded'], 3)
+        [group] = log.summary()
+        self.assertEqual(group['count'], 2)
+        self.assertAlmostEqual(group['avg'], 2.0)
+
+        log.clear()
+        self.assertEqual(log.entries(), [])
+        with self.assertRaises(ValueError):
+            SlowQueryLog(capacity=0)
+
+    def test_server_timing_and_explain(self):
+        """Durasi server dari performance_schema lalu EXPLAIN pada koneksi yang sama"""
+        log = SlowQueryLog(threshold=1.0)
+        mysql_ssh = mock.MagicMock()
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [
+            [('COMMIT', 1000000), ('SELECT * FROM orders WHERE id = 1', 1500000000000)],
+            [{'id': 1, 'select_type': 'SIMPLE', 'type': 'const'}],
+        ]
+        log._after_execute(mysql_ssh, self._event())
+
+        [entry] = log.entries()
+        self.assertAlmostEqual(entry['server_seconds'], 1.5)
+        self.assertAlmostEqual(entry['network_seconds'], 0.5)
+        self.assertEqual(entry['explain'], [{'id': 1, 'select_type': 'SIMPLE', 'type': 'const'}])
+        self.assertTrue(cursor.execute.call_args_list[1][0][0].startswith('EXPLAIN SELECT'))
+
+    def test_server_seconds_falls_back_to_show_profiles(self):
+        """Tanpa performance_schema dipakai SHOW PROFILES"""
+        connection = mock.MagicMock()
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.side_effect = [pymysql.err.OperationalError(1142, "denied"), None]
+        cursor.fetchall.return_value = [(1, 0.25, 'SELECT SLEEP(1)'), (2, 0.001, 'SHOW PROFILES')]
+        self.assertEqual(server_seconds(connection), 0.25)
+
+class TestExecuteHooks(unittest.TestCase):
+    """Test cases untuk before/after execute hook"""
+
+    def test_hooks_receive_event(self):
+        """Hook dipanggil dengan event lengkap, error hook tidak menggagalkan query"""
+        mysql_ssh = _fake_connection()
+        cursor = mysql_ssh.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [{'id': 1}, {'id': 2}]
+        events = []
+        before = mock.Mock(side_effect=RuntimeError("hook rusak"))
+        after = lambda conn, event: events.append(dict(event))
+        mysql_ssh.add_execute_hook(before=before, after=after)
+
+        self.assertEqual(mysql_ssh.execute_query("SELECT id FROM t"), [{'id': 1}, {'id': 2}])
+        before.assert_called_once()
+        [event] = events
+        self.assertEqual(event['statement'], 'SELECT')
+        self.assertEqual(event['rows'], 2)
+        self.assertEqual(event['attempts'], 1)
+        self.assertIsNone(event['error'])
+
+        cursor.execute.side_effect = pymysql.err.ProgrammingError(1064, "syntax error")
+        mysql_ssh.execute_query("SELEC 1")
+        self.assertIn('syntax error', events[-1]['error'])
+
+        mysql_ssh.remove_execute_hook(before=before, after=after)
+        cursor.execute.side_effect = None
+        mysql_ssh.execute_query("SELECT id FROM t")
+        self.assertEqual(len(events), 2)
+
+if __name__ == '__main__':
+    unittest.main()
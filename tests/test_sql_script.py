@@ -0,0 +1,170 @@
+"""
+Unit tests untuk pemecah dan eksekutor script SQL
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pymysql
+from database.mysql_ssh_connection import MySQLSSHConnection
+from database.sql_script import iter_script_lines, run_script, split_statements
+
+SCRIPT = """-- migrasi 001
+/*!40101 SET NAMES utf8mb4 */;
+CREATE TABLE `log;s` (id INT, pesan TEXT); # komentar ; diabaikan
+INSERT INTO `log;s` VALUES (1, 'a;b'), (2, "it\\"s;"), /* c ; */ (3, 'x''y;');
+DELIMITER $$
+CREATE TRIGGER t1 BEFORE INSERT ON a FOR EACH ROW BEGIN SET @n = 1; SET @m = 2; END$$
+DELIMITER ;
+SELECT '
+baris;baru' FROM dual;
+UPDATE a SET b = 1 -- tanpa delimiter penutup
+"""
+
+class _FakeCursor:
+    """Cursor multi-statement: satu result per statement, berhenti di statement yang gagal"""
+
+    def __init__(self, server):
+        self.server = server
+        self.results = []
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        self.server.packets.append(query)
+        self.results = iter(query.split(';\n'))
+        self._advance()
+
+    def nextset(self):
+        try:
+            self._advance()
+        except StopIteration:
+            return None
+        return True
+
+    def _advance(self):
+        statement = next(self.results)
+        self.server.executed.append(statement)
+        if 'gagal' in statement:
+            self.results = iter(())
+            raise pymysql.err.ProgrammingError(1064, "syntax error")
+        self.rowcount = 1
+
+class _FakeServer:
+    def __init__(self):
+        self.packets = []
+        self.executed = []
+
+    def cursor(self, cursor_class=None):
+        return _FakeCursor(self)
+
+class TestSplitStatements(unittest.TestCase):
+    """Test cases untuk split_statements"""
+
+    def test_quotes_comments_and_delimiter(self):
+        """Delimiter di string, identifier dan komentar tidak memecah statement"""
+        statements = list(split_statements(iter_script_lines(SCRIPT)))
+        self.assertEqual(statements, [
+            "/*!40101 SET NAMES utf8mb4 */",
+            "CREATE TABLE `log;s` (id INT, pesan TEXT)",
+            "INSERT INTO `log;s` VALUES (1, 'a;b'), (2, \"it\\\"s;\"),  (3, 'x''y;')",
+            "CREATE TRIGGER t1 BEFORE INSERT ON a FOR EACH ROW BEGIN SET @n = 1; SET @m = 2; END",
+            "SELECT '\nbaris;baru' FROM dual",
+            "UPDATE a SET b = 1",
+        ])
+
+    def test_reads_file_path(self):
+        """Path file dibaca per baris"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'seed.sql')
+            with open(path, 'w', encoding='utf-8') as script_file:
+                script_file.write("INSERT INTO a VALUES (1);\nINSERT INTO a VALUES (2);\n")
+            self.assertEqual(list(split_statements(iter_script_lines(path))),
+                             ["INSERT INTO a VALUES (1)", "INSERT INTO a VALUES (2)"])
+
+class TestRunScript(unittest.TestCase):
+    """Test cases untuk run_script"""
+
+    def test_batches_by_count_size_and_call(self):
+        """Statement dikelompokkan per round trip, CALL dikirim sendiri"""
+        server = _FakeServer()
+        statements = [f"INSERT INTO a VALUES ({number})" for number in range(5)]
+        statements.insert(2, "CALL proses()")
+        outcomes = list(run_script(server, statements, max_size=10 ** 6, max_statements=2))
+
+        self.assertEqual([outcome['index'] for outcome in outcomes], list(range(6)))
+        self.assertEqual(len(server.packets), 4)
+        self.assertEqual(server.packets[1], "CALL proses()")
+        self.assertTrue(all(outcome['rows'] == 1 and outcome['error'] is None for outcome in outcomes))
+
+        server = _FakeServer()
+        list(run_script(server, statements, max_size=30))
+        self.assertEqual(len(server.packets), 6)
+
+    def test_error_stops_or_resends_rest(self):
+        """Statement gagal menghentikan script, atau sisa kelompok dikirim ulang"""
+        statements = ["INSERT INTO a VALUES (1)", "INSERT gagal", "INSERT INTO a VALUES (2)"]
+        server = _FakeServer()
+        outcomes = list(run_script(server, statements, max_size=10 ** 6))
+        self.assertEqual(len(outcomes), 2)
+        self.assertIn('syntax error', outcomes[-1]['error'])
+
+        server = _FakeServer()
+        outcomes = list(run_script(server, statements, max_size=10 ** 6, stop_on_error=False))
+        self.assertEqual([outcome['error'] is None for outcome in outcomes], [True, False, True])
+        self.assertEqual(server.packets[-1], "INSERT INTO a VALUES (2)")
+
+class TestExecuteScript(unittest.TestCase):
+    """Test cases untuk MySQLSSHConnection.execute_script"""
+
+    def setUp(self):
+        self.mysql_ssh = MySQLSSHConnection(
+            {'host': 'test-server.com', 'port': 22, 'username': 'test_user'},
+            {'host': 'localhost', 'port': 3306, 'username': 'user',
+             'password': 'secret', 'database': 'test_database'},
+        )
+
+    def test_execute_script_report(self):
+        """Script dijalankan di koneksi multi-statement tambahan dan dilaporkan per statement"""
+        server = _FakeServer()
+        side = mock.MagicMock()
+        side.cursor.side_effect = server.cursor
+        self.mysql_ssh.query_cache = mock.MagicMock()
+        with mock.patch.object(self.mysql_ssh, 'open_side_connection', return_value=side) as open_side, \
+                mock.patch('database.mysql_ssh_connection._max_packet_size', return_value=10 ** 6):
+            report = self.mysql_ssh.execute_script(SCRIPT)
+
+        options = open_side.call_args[1]
+        self.assertTrue(options['client_flag'] & pymysql.constants.CLIENT.MULTI_STATEMENTS)
+        self.assertTrue(options['autocommit'])
+        self.assertEqual(len(server.packets), 1)
+        self.assertEqual(report['executed'], 6)
+        self.assertEqual(report['failed'], 0)
+        self.assertEqual(report['rows'], 6)
+        self.assertEqual(report['statements'][-1]['statement'], 'UPDATE')
+        # Cache diinvalidasi untuk tulis, tidak untuk SELECT
+        self.assertEqual(self.mysql_ssh.query_cache.invalidate_for_write.call_count, 5)
+        side.close.assert_called_once()
+
+    def test_execute_script_rejected_in_transaction(self):
+        """Script autocommit tidak boleh dicampur dengan transaksi koneksi utama"""
+        self.mysql_ssh.connection = mock.MagicMock()
+        with self.assertRaises(RuntimeError):
+            with self.mysql_ssh.transaction():
+                self.mysql_ssh.execute_script("SELECT 1")
+        with self.assertRaises(ValueError):
+            self.mysql_ssh.execute_script("SELECT 1", max_statements=0)
+
+if __name__ == '__main__':
+    unittest.main()
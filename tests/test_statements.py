@@ -0,0 +1,44 @@
+"""
+Unit tests untuk klasifikasi statement SQL
+"""
+
+import unittest
+import sys
+import os
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.statements import (
+    statement_type, is_read_statement, statement_cache_info, clear_statement_cache
+)
+
+class TestStatements(unittest.TestCase):
+    """Test cases untuk klasifikasi statement"""
+
+    def test_statement_type(self):
+        """Keyword pertama dikenali, termasuk setelah komentar dan kurung"""
+        self.assertEqual(statement_type("  select * from t"), 'SELECT')
+        self.assertEqual(statement_type("/* report */ SELECT 1"), 'SELECT')
+        self.assertEqual(statement_type("-- note\nUPDATE t SET a = 1"), 'UPDATE')
+        self.assertEqual(statement_type("(SELECT 1) UNION (SELECT 2)"), 'SELECT')
+        self.assertEqual(statement_type(""), '')
+
+    def test_is_read_statement(self):
+        """Klasifikasi baca/tulis sama dengan daftar SELECT/SHOW/DESCRIBE/EXPLAIN"""
+        for query in ["SELECT 1", "SHOW TABLES", "DESC users", "DESCRIBE users", "EXPLAIN SELECT 1"]:
+            self.assertTrue(is_read_statement(query), query)
+        for query in ["INSERT INTO t VALUES (1)", "DELETE FROM t", "SHOWCASE", "CREATE TABLE t (id INT)"]:
+            self.assertFalse(is_read_statement(query), query)
+
+    def test_classification_is_memoized(self):
+        """Template yang sama hanya diparse sekali"""
+        clear_statement_cache()
+        for _ in range(100):
+            is_read_statement("SELECT * FROM users WHERE id = %s")
+        info = statement_cache_info()['is_read_statement']
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 99)
+
+if __name__ == '__main__':
+    unittest.main()
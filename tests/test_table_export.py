@@ -0,0 +1,180 @@
+"""
+Unit tests untuk export tabel paralel
+"""
+
+import csv
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import sys
+from contextlib import contextmanager
+from decimal import Decimal
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.table_export import TableExporter, _plan_chunks, encode_csv, encode_jsonl
+
+# Tabel palsu: id 1..25 dengan lubang di id 13
+TABLE = [(i, f"user{i}") for i in range(1, 26) if i != 13]
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+class _FakeKeyConnection:
+    """Koneksi palsu yang menjawab query batas chunk (LIMIT 1 OFFSET n) dari daftar key"""
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.queries = 0
+
+    @contextmanager
+    def cursor(self, cursor_class=None):
+        cursor = mock.MagicMock()
+
+        def execute(query, params):
+            self.queries += 1
+            start, offset = params
+            following = [key for key in self.keys if key >= start]
+            cursor.fetchone.return_value = (following[offset],) if offset < len(following) else None
+        cursor.execute.side_effect = execute
+        yield cursor
+
+class _FakePool:
+    """Pool palsu yang meminjamkan koneksi palsu dan mencatat jumlah pinjaman"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        with self._lock:
+            self.checkouts += 1
+        yield _FakeKeyConnection(row[0] for row in TABLE)
+
+def _fake_stream(fail_ranges=(), table=TABLE):
+    """_stream_query palsu yang memfilter tabel berdasarkan rentang key"""
+    calls = []
+
+    def stream(conn, query, params=None, chunk_size=1000, as_dict=True, chunked=False):
+        calls.append(params)
+        if params in fail_ranges:
+            raise ConnectionError("tunnel putus")
+        low, high = params if len(params) == 2 else (params[0], float('inf'))
+        rows = [row for row in table if low <= row[0] < high]
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    return stream, calls
+
+class TestTableExporter(unittest.TestCase):
+    """Test cases untuk TableExporter"""
+
+    def setUp(self):
+        """Direktori output sementara dan metadata tabel palsu"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        patcher = mock.patch('database.table_export._fetch_metadata',
+                             return_value=(['id', 'name'], 'id', 1, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_plan_chunks(self):
+        """Batas chunk diambil dari data: chunk_size baris per chunk, chunk terakhir terbuka"""
+        connection = _FakeKeyConnection(row[0] for row in TABLE)
+        self.assertEqual(_plan_chunks(connection, 'users', 'id', 1, 10), [[1, 11], [11, 22], [22, None]])
+        self.assertEqual(_plan_chunks(connection, 'users', 'id', None, 10), [])
+
+    def test_plan_chunks_sparse_key(self):
+        """Key jarang (snowflake/BIGINT besar) tidak menghasilkan chunk kosong per celah nilai"""
+        keys = [1, 2, 10 ** 12, 10 ** 15, 2 ** 62, 2 ** 63 - 1]
+        connection = _FakeKeyConnection(keys)
+        chunks = _plan_chunks(connection, 'events', 'id', 1, 2)
+        self.assertEqual(chunks, [[1, 10 ** 12], [10 ** 12, 2 ** 62], [2 ** 62, None]])
+        self.assertEqual(connection.queries, 3)
+
+        # Jumlah chunk dibatasi; sisa tabel masuk chunk terakhir
+        connection = _FakeKeyConnection(range(1, 1001))
+        with self.assertLogs('database.table_export', level='WARNING'):
+            chunks = _plan_chunks(connection, 'events', 'id', 1, 1, max_chunks=5)
+        self.assertEqual(chunks, [[1, 2], [2, 3], [3, 4], [4, 5], [5, None]])
+
+    def test_csv_export_in_key_order(self):
+        """Chunk paralel digabung berurutan dengan satu header"""
+        path = os.path.join(self.tmpdir, 'users.csv')
+        stream, calls = _fake_stream()
+        with mock.patch('database.table_export._stream_query', side_effect=stream):
+            stats = TableExporter(_FakePool(), 'users', path, chunk_size=5, workers=3, fetch_size=2).export()
+
+        self.assertEqual(stats['rows'], 24)
+        self.assertEqual(stats['chunks'], 5)
+        with open(path, newline='') as handle:
+            rows = list(csv.reader(handle))
+        self.assertEqual(rows[0], ['id', 'name'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [row[0] for row in TABLE])
+        self.assertFalse(os.path.exists(path + '.manifest.json'))
+        self.assertFalse(os.path.exists(path + '.parts'))
+
+    def test_resume_after_failure(self):
+        """Chunk yang sudah selesai tidak dibaca ulang saat export dilanjutkan"""
+        path = os.path.join(self.tmpdir, 'users.jsonl')
+        stream, calls = _fake_stream(fail_ranges={(11, 17)})
+        with mock.patch('database.table_export._stream_query', side_effect=stream):
+            self.assertIsNone(TableExporter(_FakePool(), 'users', path, format='jsonl', chunk_size=5).export())
+        self.assertTrue(os.path.exists(path + '.manifest.json'))
+
+        stream, calls = _fake_stream()
+        with mock.patch('database.table_export._stream_query', side_effect=stream):
+            stats = TableExporter(_FakePool(), 'users', path, format='jsonl', chunk_size=5).export()
+
+        self.assertEqual(calls, [(11, 17)])
+        self.assertEqual(stats['resumed_chunks'], 4)
+        with open(path) as handle:
+            records = [json.loads(line) for line in handle]
+        self.assertEqual([record['id'] for record in records], [row[0] for row in TABLE])
+        self.assertEqual(records[0], {'id': 1, 'name': 'user1'})
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow tidak terpasang")
+    def test_parquet_uses_table_schema(self):
+        """Semua part memakai skema dari tipe kolom, walau chunk pertama seluruhnya NULL"""
+        import pyarrow
+        from pyarrow import parquet
+
+        # Kolom name baru diisi mulai id 11; presisi DECIMAL hasil berbeda per chunk
+        table = [(i, None if i < 11 else f"user{i}", Decimal(i) * 1000 + Decimal('0.25'))
+                 for i, _ in TABLE]
+        column_types = [['bigint', 'bigint unsigned', 20, 0], ['varchar', 'varchar(50)', None, None],
+                        ['decimal', 'decimal(12,2)', 12, 2]]
+        path = os.path.join(self.tmpdir, 'users.parquet')
+        stream, calls = _fake_stream(table=table)
+        with mock.patch('database.table_export._fetch_metadata',
+                        return_value=(['id', 'name', 'score'], 'id', 1, column_types)), \
+                mock.patch('database.table_export._stream_query', side_effect=stream):
+            stats = TableExporter(_FakePool(), 'users', path, format='parquet', chunk_size=5).export()
+
+        self.assertEqual(stats['chunks'], 5)
+        result = parquet.read_table(path)
+        self.assertEqual(result.schema, pyarrow.schema([('id', pyarrow.uint64()), ('name', pyarrow.string()),
+                                                        ('score', pyarrow.decimal128(12, 2))]))
+        self.assertEqual(result.column('name').to_pylist(), [row[1] for row in table])
+        self.assertEqual(result.column('score').to_pylist()[-1], Decimal('25000.25'))
+
+    def test_encoders_yield_per_batch(self):
+        """Encoder menghasilkan satu potong teks per batch untuk response streaming"""
+        batches = [[(1, 'a,b'), (2, None)], [(3, b'\xff')]]
+        self.assertEqual(list(encode_csv(('id', 'name'), iter(batches))),
+                         ['id,name\r\n1,"a,b"\r\n2,\r\n', '3,0xff\r\n'])
+        self.assertEqual(list(encode_jsonl(('id',), [[(1,)], [(2,)]])), ['{"id":1}\n', '{"id":2}\n'])
+
+    def test_invalid_format(self):
+        """Format tidak dikenal ditolak"""
+        with self.assertRaises(ValueError):
+            TableExporter(_FakePool(), 'users', 'out.xml', format='xml')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Unit tests untuk registry SSH tunnel bersama
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.tunnel_manager import TunnelManager, _create_tunnel
+from database.mysql_ssh_connection import MySQLSSHConnection
+
+def _fake_tunnel(*args, **kwargs):
+    """Tunnel palsu yang aktif setelah start() dan mati setelah stop()"""
+    tunnel = mock.MagicMock()
+    tunnel.is_active = False
+    tunnel.local_bind_port = 40000
+    tunnel.start.side_effect = lambda: setattr(tunnel, 'is_active', True)
+    tunnel.stop.side_effect = lambda **kwargs: setattr(tunnel, 'is_active', False)
+    return tunnel
+
+class TestTunnelManager(unittest.TestCase):
+    """Test cases untuk TunnelManager"""
+
+    def setUp(self):
+        """Setup test fixtures"""
+        self.ssh_config = {
+            'host': 'test-server.com',
+            'port': 22,
+            'username': 'test_user',
+            'password': 'test_password',
+        }
+
+        self.mysql_config = {
+            'host': 'localhost',
+            'port': 3306,
+            'username': 'test_mysql_user',
+            'password': 'test_mysql_password',
+            'database': 'test_database',
+        }
+
+        patcher = mock.patch('database.tunnel_manager._create_tunnel', side_effect=_fake_tunnel)
+        self.create_tunnel = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reuse_and_refcount(self):
+        """Endpoint yang sama memakai satu tunnel sampai pemakai terakhir melepas"""
+        manager = TunnelManager()
+        first = manager.acquire(self.ssh_config, self.mysql_config)
+        second = manager.acquire(dict(self.ssh_config), dict(self.mysql_config, database='other'))
+
+        self.assertIs(first, second)
+        self.assertEqual(self.create_tunnel.call_count, 1)
+        self.assertEqual(manager.stats()[0]['refcount'], 2)
+
+        manager.release(first)
+        first.stop.assert_not_called()
+        manager.release(second)
+        first.stop.assert_called_once()
+        self.assertEqual(manager.stats(), [])
+
+    def test_different_credentials_get_separate_tunnels(self):
+        """Password berbeda tidak boleh menumpang tunnel orang lain"""
+        manager = TunnelManager()
+        first = manager.acquire(self.ssh_config, self.mysql_config)
+        second = manager.acquire(dict(self.ssh_config, password='other'), self.mysql_config)
+        self.assertIsNot(first, second)
+
+    def test_compressed_tunnel_is_separate(self):
+        """Tunnel terkompresi, tidak terkompresi dan tanpa pengaturan tidak dipakai bersama"""
+        manager = TunnelManager()
+        default = manager.acquire(self.ssh_config, self.mysql_config)
+        plain = manager.acquire(dict(self.ssh_config, compression=False), self.mysql_config)
+        compressed = manager.acquire(dict(self.ssh_config, compression=True), self.mysql_config)
+        self.assertEqual(len({id(default), id(plain), id(compressed)}), 3)
+        self.assertIs(manager.acquire(self.ssh_config, self.mysql_config, compression=True), compressed)
+        # Mode 'auto' mulai di tunnel tanpa kompresi yang eksplisit
+        self.assertIs(manager.acquire(dict(self.ssh_config, compression='auto'), self.mysql_config), plain)
+        self.assertEqual([call[1]['compression'] for call in self.create_tunnel.call_args_list],
+                         [None, False, True])
+
+    def test_explicit_compression_off_reaches_forwarder(self):
+        """compression=False diteruskan apa adanya; None hanya jika tidak diatur (~/.ssh/config)"""
+        with mock.patch('database.tunnel_manager.SSHTunnelForwarder') as forwarder:
+            for compression in (None, False, True):
+                _create_tunnel(self.ssh_config, self.mysql_config, compression=compression)
+        self.assertEqual([call[1]['compression'] for call in forwarder.call_args_list],
+                         [None, False, True])
+
+    def test_inactive_tunnel_is_rebuilt_in_place(self):
+        """Tunnel yang sudah mati dibangun ulang pada objek yang sama saat acquire"""
+        manager = TunnelManager()
+        first = manager.acquire(self.ssh_config, self.mysql_config)
+        first.is_active = False
+        second = manager.acquire(self.ssh_config, self.mysql_config)
+        self.assertIs(first, second)
+        self.assertTrue(second.is_active)
+        self.assertEqual(first.start.call_count, 2)
+        self.assertEqual(manager.stats()[0]['refcount'], 2)
+
+    def test_failed_start_does_not_leak_refcount(self):
+        """Kegagalan start tidak meninggalkan entry di registry"""
+        manager = TunnelManager()
+        broken = _fake_tunnel()
+        broken.start.side_effect = RuntimeError("auth failed")
+        self.create_tunnel.side_effect = [broken]
+        with self.assertRaises(RuntimeError):
+            manager.acquire(self.ssh_config, self.mysql_config)
+        self.assertEqual(manager.stats(), [])
+
+    def test_connections_share_default_manager(self):
+        """Dua MySQLSSHConnection ke bastion yang sama memakai satu tunnel"""
+        with mock.patch('database.tunnel_manager._default_manager', TunnelManager()), \
+                mock.patch('database.mysql_ssh_connection._connect_mysql'):
+            first = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+            second = MySQLSSHConnection(self.ssh_config, self.mysql_config)
+            self.assertTrue(first.connect())
+            self.assertTrue(second.connect())
+            tunnel = first.tunnel
+            self.assertIs(tunnel, second.tunnel)
+
+            first.close()
+            self.assertTrue(tunnel.is_active)
+            second.close()
+            self.assertFalse(tunnel.is_active)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests untuk monitor kesehatan SSH tunnel
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Tambahkan path src ke Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database.tunnel_monitor import TunnelMonitor, is_tunnel_healthy, restart_tunnel
+from database.mysql_ssh_connection import MySQLSSHConnection
+
+def _fake_tunnel(active=True):
+    """Tunnel palsu dengan transport yang bisa dimatikan"""
+    tunnel = mock.MagicMock()
+    tunnel.is_active = active
+    tunnel.local_bind_port = 40000
+
+    def start():
+        tunnel.is_active = True
+        tunnel._transport.send_ignore.side_effect = None
+        tunnel.local_bind_port += 1
+
+    tunnel.start.side_effect = start
+    tunnel._transport.is_active.side_effect = lambda: tunnel.is_active
+    return tunnel
+
+class TestTunnelMonitor(unittest.TestCase):
+    """Test cases untuk TunnelMonitor"""
+
+    def test_health_check_detects_broken_socket(self):
+        """Transport yang gagal mengirim paket dianggap mati"""
+        tunnel = _fake_tunnel()
+        self.assertTrue(is_tunnel_healthy(tunnel))
+        tunnel._transport.send_ignore.side_effect = EOFError()
+        self.assertFalse(is_tunnel_healthy(tunnel))
+        self.assertFalse(is_tunnel_healthy(None))
+
+    def test_restart_skips_healthy_tunnel(self):
+        """restart_tunnel tidak menyentuh tunnel yang masih sehat"""
+        tunnel = _fake_tunnel()
+        self.assertFalse(restart_tunnel(tunnel))
+        tunnel.start.assert_not_called()
+
+        tunnel.is_active = False
+        self.assertTrue(restart_tunnel(tunnel))
+        tunnel.stop.assert_called_once_with(force=True)
+        self.assertEqual(tunnel.local_bind_port, 40001)
+
+    def test_check_restarts_and_notifies_listeners(self):
+        """Tunnel mati dibangun ulang lalu listener dipanggil"""
+        tunnel = _fake_tunnel()
+        monitor = TunnelMonitor(tunnel, interval=1)
+        listener = mock.MagicMock()
+        monitor.add_listener(listener)
+
+        self.assertTrue(monitor.check())
+        listener.assert_not_called()
+
+        tunnel._transport.send_ignore.side_effect = OSError("broken pipe")
+        self.assertTrue(monitor.check())
+        listener.assert_called_once()
+        self.assertEqual(monitor.restarts, 1)
+
+    def test_exponential_backoff(self):
+        """Percobaan restart yang gagal memperpanjang jeda sampai max_backoff"""
+        tunnel = _fake_tunnel(active=False)
+        tunnel.start.side_effect = RuntimeError("bastion down")
+        monitor = TunnelMonitor(tunnel, interval=1, max_backoff=5)
+        delays = []
+
+        def fake_wait(delay):
+            delays.append(delay)
+            return len(delays) > 5
+
+        with mock.patch.object(monitor._stop_event, 'wait', side_effect=fake_wait):
+            monitor._run()
+        self.assertEqual(delays, [1, 2, 4, 5, 5, 5])
+        self.assertEqual(monitor.failures, 5)
+
+    def test_connection_reconnects_after_tunnel_restart(self):
+        """Koneksi ditandai reconnect oleh monitor dan _reconnect memakai port baru"""
+        ssh_config = {'host': 'h', 'port': 22, 'username': 'u', 'password': 'p'}
+        mysql_config = {'host': 'localhost', 'port': 3306, 'username': 'u', 'password': 'p', 'database': 'd'}
+        mysql_ssh = MySQLSSHConnection(ssh_config, mysql_config)
+        mysql_ssh.tunnel = _fake_tunnel(active=False)
+        mysql_ssh.connection = mock.MagicMock()
+
+        with mock.patch('database.mysql_ssh_connection._connect_mysql') as connect_mysql:
+            mysql_ssh._on_tunnel_restarted()
+            mysql_ssh._ensure_connection()
+            connect_mysql.assert_called_once_with(mysql_config, 40001)
+        self.assertFalse(mysql_ssh._tunnel_restarted)
+
+if __name__ == '__main__':
+    unittest.main()